@@ -2,8 +2,12 @@
 
 import sqlite3 as sql
 import os
-from typing import Any, List
+import asyncio
+import threading
+import queue
+from typing import Any, List, Callable, Type, Iterable, Tuple, Optional
 from contextlib import contextmanager
+from functools import wraps
 
 
 class DBWriter:
@@ -19,25 +23,52 @@ class DBWriter:
     cursor: sqlite3.Cursor
         The cursor for connection.
         Used to execute queries.
+    deferCommits: bool
+        Whether doQuery should leave its changes uncommitted
+        until flush is called or maxPending writes have built up.
+    maxPending: int
+        The number of deferred writes that triggers a commit.
+    _pending: int
+        The number of writes that haven't been committed yet.
+    _depth: int
+        How many transaction blocks are currently open.
     """
 
-    def __init__(self, name: str, useRow: bool = False, use16Bit: bool = False):
+    def __init__(self, name: str, useRow: bool = False, use16Bit: bool = False,
+                 deferCommits: bool = False, maxPending: int = 500,
+                 integrityCheck: Optional[str] = "quick"):
         """Create sqlite3 Connection and Cursor to the database called `name`.
         If said DB doesn't exist, it'll be created at .../Databases/`name`.db
 
         name:
             The name describing what the database contains.
+            Pass ":memory:" to use a temporary in-memory database.
         useRow:
             Whether to output tuples that can be accessed like dicts (True),
             or to output tuples (False).
         use16Bit:
-            Whether to use UTF-8 (False) or UTF-16 (True) encoding"""
+            Whether to use UTF-8 (False) or UTF-16 (True) encoding
+        deferCommits:
+            Whether to group the commits of doQuery (True)
+            or commit after every query (False).
+            Call flush to commit the deferred writes.
+        maxPending:
+            The number of deferred writes to allow before committing anyway.
+        integrityCheck:
+            Which check to run on the database when connecting.
+            "quick" = PRAGMA quick_check, which skips checking that the indexes match their tables
+            "full" = PRAGMA integrity_check, which reads the whole database
+            None = don't check. Use this if checkIntegrity is scheduled elsewhere."""
 
         # these could be class attributes
         # but putting them here allows an instance
         # to be reset by re-instantiating it
         self.path = ""
         self.connection = None
+        self.deferCommits = False
+        self.maxPending = maxPending
+        self._pending = 0
+        self._depth = 0
 
         self.createDB(name)
         self.createConnection()
@@ -56,13 +87,22 @@ class DBWriter:
             self.doQuery("PRAGMA encoding = 'UTF-8';")
 
         # check if there's any problems with the database
-        errors = self.doQuery("PRAGMA integrity_check;")
-        if errors[0][0] != "ok":
-            print(f"Database integrity check failed. Errors: {errors}")
+        if integrityCheck is not None:
+            errors = self.checkIntegrity(quick=integrityCheck == "quick")
+            if errors:
+                print(f"Database integrity check failed. Errors: {errors}")
+
+        # only start deferring once the set up queries have been done
+        self.deferCommits = deferCommits
 
     def createDB(self, name: str):
         """Create a directory and a DB if not exists. Return the path to self.path."""
 
+        # in-memory databases don't need a file
+        if name == ":memory:":
+            self.path = name
+            return
+
         # get current directory
         currentDirectory = os.path.dirname(__file__)
 
@@ -93,7 +133,8 @@ class DBWriter:
 
     def doQuery(self, query: str, vars: tuple = (), many: bool = False) -> List[Any]:
         """Do one or many queries to the connection and commit the changes.
-        Only use for safe queries or a mistake would be committed."""
+        Only use for safe queries or a mistake would be committed.
+        Inside a transaction block, the changes are committed with the transaction instead."""
 
         # NOTE
         # the changes will be committed no matter what
@@ -108,8 +149,110 @@ class DBWriter:
             else:
                 cursor.executemany(query, vars)
 
+            rows = cursor.fetchall()
+
+        # the transaction block will commit
+        if self._depth:
+            return rows
+
+        if self.deferCommits:
+            self._pending += 1
+            if self._pending >= self.maxPending:
+                self.flush()
+
+        else:
+            self.connection.commit()
+
+        return rows
+
+    def checkIntegrity(self, quick: bool = False) -> List[str]:
+        """Check the database for corruption.
+
+        ARGUMENTS
+        quick:
+            Whether to use PRAGMA quick_check (True)
+            or the slower PRAGMA integrity_check (False).
+
+        RETURNS
+            The problems that were found. Empty if the database is ok."""
+
+        rows = self.doQuery(f"PRAGMA {'quick_check' if quick else 'integrity_check'};")
+        return [] if rows[0][0] == "ok" else [row[0] for row in rows]
+
+    def flush(self):
+        """Commit any writes that were deferred by deferCommits."""
+
+        if self._pending and not self._depth:
             self.connection.commit()
-            return cursor.fetchall()
+            self._pending = 0
+
+    @contextmanager
+    def transaction(self) -> sql.Cursor:
+        """Group every query inside the with block into one commit.
+        The changes are rolled back if an exception is raised.
+        Blocks can be nested; only the outermost one commits.
+        A nested block is a savepoint, so if its exception is caught
+        only its own changes are rolled back and the outer block carries on.
+
+        Example:
+            with writer.transaction() as cursor:
+                cursor.execute(...)
+                writer.doQuery(...)"""
+
+        savepoint = f"nested{self._depth}"
+        if not self._depth:
+            # deferred writes shouldn't be lost if this transaction is rolled back
+            self.flush()
+            # begin now so that releasing a savepoint can't commit the outer block
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN;")
+        else:
+            self.connection.execute(f"SAVEPOINT {savepoint};")
+
+        self._depth += 1
+        try:
+            with self.cursor() as cursor:
+                yield cursor
+
+        except BaseException:
+            self._depth -= 1
+            if not self._depth:
+                self.connection.rollback()
+            else:
+                self.connection.execute(f"ROLLBACK TO {savepoint};")
+                self.connection.execute(f"RELEASE {savepoint};")
+            self._onRollback()
+            raise
+
+        else:
+            self._depth -= 1
+            if not self._depth:
+                self.connection.commit()
+            else:
+                self.connection.execute(f"RELEASE {savepoint};")
+
+    def _onRollback(self):
+        """Called after a transaction or a nested block is rolled back.
+        Override this to drop any state cached from the rolled back changes."""
+        pass
+
+    def executeBatch(self, statements: Iterable[Tuple[str, Iterable]]) -> List[List[Any]]:
+        """Execute many different queries in one transaction.
+
+        ARGUMENTS
+        statements:
+            Pairs of (query, vars).
+
+        RETURNS
+            The rows returned by each query."""
+
+        results = []
+        with self.transaction() as cursor:
+            for query, vars in statements:
+                cursor.execute(query, vars)
+                results.append(cursor.fetchall())
+
+        return results
 
     def _executeFromFile(self, path: str):
         """Execute all commands in a file located at path.
@@ -124,6 +267,120 @@ class DBWriter:
             cursor.executescript(scriptLines)
             self.connection.commit()
 
+    def migrate(self, directory: str) -> int:
+        """Apply the migration files in directory that haven't been applied yet.
+        Applied versions are recorded in the schema_version table.
+
+        Migration files must be named `{version}_{description}.sql`, e.g. 001_create_tables.sql.
+        They're applied in order of version, each in its own transaction.
+        Foreign keys are disabled while a migration runs so that tables can be rebuilt,
+        then checked before committing.
+        Don't put BEGIN or COMMIT statements in the files.
+
+        RETURNS
+            The schema version after migrating."""
+
+        self.flush()
+        self.doQuery("""CREATE TABLE IF NOT EXISTS schema_version(
+            version INTEGER PRIMARY KEY,
+            appliedAt TEXT DEFAULT CURRENT_TIMESTAMP);""")
+        current = self.doQuery("SELECT MAX(version) FROM schema_version;")[0][0] or 0
+
+        # get the versions that haven't been applied, in order
+        migrations = sorted(
+            (int(fileName.split("_")[0]), os.path.join(directory, fileName))
+            for fileName in os.listdir(directory) if fileName.endswith(".sql")
+        )
+
+        for version, path in migrations:
+            if version <= current:
+                continue
+
+            with open(path) as f:
+                script = f.read()
+
+            # this must be done outside of a transaction
+            self.connection.execute("PRAGMA foreign_keys = 0;")
+            try:
+                with self.cursor() as cursor:
+                    # executescript doesn't start a transaction by itself
+                    cursor.executescript(f"BEGIN;\n{script}\n" +
+                                         f"INSERT INTO schema_version(version) VALUES({version});")
+                    violations = cursor.execute("PRAGMA foreign_key_check;").fetchall()
+                    if violations:
+                        raise sql.IntegrityError(f"Migration {path} broke foreign keys: {violations}")
+
+                self.connection.commit()
+
+            except BaseException:
+                self.connection.rollback()
+                raise
+
+            finally:
+                self.connection.execute("PRAGMA foreign_keys = 1;")
+
+            current = version
+
+        return current
+
+    @contextmanager
+    def recordQueries(self) -> List[str]:
+        """Collect the SQL of every statement executed in the with block,
+        with the parameters filled in. Used to check query plans.
+
+        Example:
+            with writer.recordQueries() as statements:
+                writer.doQuery(...)"""
+
+        statements = []
+        self.connection.set_trace_callback(statements.append)
+        try:
+            yield statements
+
+        finally:
+            self.connection.set_trace_callback(None)
+
+    def explainQueryPlan(self, query: str, vars: tuple = ()) -> List[str]:
+        """Get the steps SQLite plans to take to execute the query."""
+
+        with self.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", vars)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def findFullScans(self, statements: Iterable[str]) -> List[Tuple[str, List[str]]]:
+        """Get the statements that filter rows but have to scan a whole table (or index) to do so.
+        Statements without a WHERE clause are ignored because they're meant to read everything.
+        Scans of temporary tables are ignored too because they only hold staged rows.
+
+        RETURNS
+            Pairs of (statement, its query plan)."""
+
+        tempTables = {row[0] for row in
+                      self.doQuery("SELECT name FROM temp.sqlite_master WHERE type = 'table';")}
+
+        def isFullScan(step: str) -> bool:
+            words = step.split()
+            if words[0] != "SCAN" or "CONSTANT ROW" in step:
+                return False
+
+            # older versions of SQLite write "SCAN TABLE {name}"
+            table = words[2] if words[1] == "TABLE" else words[1]
+            return table.split(".")[-1] not in tempTables
+
+        scans = []
+        for statement in statements:
+            keyword = statement.lstrip().split(None, 1)[0].upper()
+            if keyword not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") \
+                    or "WHERE" not in statement.upper():
+                continue
+
+            # "SCAN CONSTANT ROW" is a VALUES clause, not a table
+            plan = self.explainQueryPlan(statement)
+            if any(isFullScan(step) for step in plan):
+                scans.append((statement, plan))
+
+        return scans
+
     @contextmanager
     def cursor(self) -> sql.Cursor:
         """Get a Cursor from the active connection.
@@ -137,3 +394,171 @@ class DBWriter:
             yield cursor
         finally:
             cursor.close()
+
+
+class AsyncDBWriter:
+    """
+    Runs a DBWriter on its own thread so that queries don't block the event loop.
+    Every call is put on a queue and executed in order by that thread,
+    so statements never interleave and the connection is only touched by one thread.
+
+    Any method of writerClass can be awaited through this object:
+        `rows = await asyncDB.doQuery("SELECT 1;")`
+
+    If the writer defers its commits, they're flushed whenever the queue runs dry
+    so a burst of queued writes shares one commit.
+
+    ATTRIBUTES
+    writerClass: Type[DBWriter]
+        The class to instantiate on the writer thread.
+    _args: tuple
+        The positional arguments for writerClass.
+    _kwargs: dict
+        The keyword arguments for writerClass.
+    _writer: DBWriter
+        The wrapped instance. Only use it on the writer thread.
+    _queue: queue.Queue
+        The jobs waiting to be executed.
+    _thread: threading.Thread
+        The writer thread. It's started by the first call.
+    _closing: bool
+        Whether close has been called and the writer thread hasn't stopped yet.
+        Calls are rejected until it has.
+    _lock: threading.Lock
+        Guards starting and closing the writer thread and queueing jobs.
+    """
+
+    def __init__(self, writerClass: Type[DBWriter], *args, **kwargs):
+        """
+        ARGUMENTS
+        writerClass:
+            The DBWriter (sub)class to wrap.
+            It will be instantiated on the writer thread.
+        *args, **kwargs:
+            The arguments for writerClass.
+        """
+
+        self.writerClass = writerClass
+        self._args = args
+        self._kwargs = kwargs
+        self._writer = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def _submit(self, job: tuple):
+        """Queue a job, starting the writer thread if it isn't running.
+
+        RAISES
+            RuntimeError: the writer is closing, so the job would never be executed."""
+
+        with self._lock:
+            if self._closing:
+                raise RuntimeError(f"{self.writerClass.__name__} is closing")
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True,
+                                                name=f"{self.writerClass.__name__}-writer")
+                self._thread.start()
+
+            # queued under the lock so that it can't end up behind close's None
+            self._queue.put(job)
+
+    def _work(self):
+        """Execute the queued jobs until a None job is received.
+        This is the body of the writer thread."""
+
+        # the connection must be created on the thread that uses it
+        try:
+            self._writer = self.writerClass(*self._args, **self._kwargs)
+            startupError = None
+
+        except Exception as error:
+            startupError = error
+
+        while True:
+            job = self._queue.get()
+            # None means close
+            if job is None:
+                if self._writer is not None:
+                    self._writer.flush()
+                    self._writer.connection.close()
+                break
+
+            func, args, kwargs, future, loop = job
+            result, error = None, startupError
+            if error is None:
+                try:
+                    result = func(self._writer, *args, **kwargs)
+
+                    # group commit: deferred writes are committed
+                    # once there's nothing else queued behind them
+                    if self._queue.empty():
+                        self._writer.flush()
+
+                except Exception as e:
+                    error = e
+
+            loop.call_soon_threadsafe(self._resolve, future, result, error)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any, error: Exception):
+        """Pass the outcome of a job to its Future. Runs on the event loop."""
+
+        # the awaiting coroutine may have been cancelled
+        if future.cancelled():
+            return
+
+        if error is not None:
+            future.set_exception(error)
+
+        else:
+            future.set_result(result)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call `func(writer, *args, **kwargs)` on the writer thread and return its result.
+        Use this to run several statements without other jobs running in between."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._submit((func, args, kwargs, future, loop))
+        return await future
+
+    async def close(self):
+        """Finish the queued jobs, then close the connection and stop the writer thread.
+        Calls made while it's closing raise RuntimeError.
+        Calls made after it has closed start a new writer thread."""
+
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+
+            if not self._closing:
+                self._closing = True
+                self._queue.put(None)
+
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+        with self._lock:
+            if self._thread is thread:
+                self._thread = None
+                self._closing = False
+
+    def __getattr__(self, name: str) -> Callable:
+        """Get an awaitable version of a method of writerClass."""
+
+        # avoid recursion before __init__ has finished
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        method = getattr(self.writerClass, name)
+        if not callable(method):
+            raise AttributeError(f"{name} is not a method of {self.writerClass.__name__}")
+
+        @wraps(method)
+        async def proxy(*args, **kwargs):
+            return await self.run(lambda writer: getattr(writer, name)(*args, **kwargs))
+
+        return proxy
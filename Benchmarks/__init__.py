@@ -0,0 +1,22 @@
+"""Benchmarks for the slow paths of the bot.
+
+They aren't unit tests so they're kept out of Unit Tests.
+Run one from the repo's root with `python -m Benchmarks.<module name>`."""
+
+from typing import *
+from time import perf_counter
+
+
+def best_of(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Call func repeat times and return the fastest time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def report(label: str, seconds: float):
+    """Print a benchmark result in milliseconds."""
+    print(f"{label:<40}{seconds * 1000:>12.2f} ms")
@@ -0,0 +1,65 @@
+"""Compare the SQL and numpy backends of the attendance reports.
+
+Usage: python -m Benchmarks.bench_analytics [--members 5000] [--years 3]"""
+
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from Utils.AttendanceDB import AttendanceDBWriter, day_number
+from Benchmarks import best_of, report
+
+EVENT_TYPES = ("AIR", "ARMOUR", "INFANTRY", "CO-OPS1", "CO-OPS2", "INTERNAL_OPS")
+
+
+def populate(writer: AttendanceDBWriter, members: int, years: int, seed: int = 0):
+    """Fill the DB with a roll call every day for years, ending today."""
+    rng = Random(seed)
+    writer.add_members([f"member{i}" for i in range(members)])
+    member_ids = [row[0] for row in writer.get_all_members()]
+    today = day_number()
+    days = [(today - i, EVENT_TYPES[(today - i) % len(EVENT_TYPES)])
+            for i in range(years * 365)]
+    # each member has their own chance of attending
+    chances = [rng.random() for _ in member_ids]
+
+    with writer.transaction() as cursor:
+        cursor.executemany("INSERT INTO Days(date, eventType) VALUES(?, ?);", days)
+        for day, _ in days:
+            cursor.executemany("INSERT INTO Attendees(date, memberID, attended) VALUES(?, ?, ?);",
+                               [(day, member_id, rng.random() < chance)
+                                for member_id, chance in zip(member_ids, chances)])
+    writer.rebuild_monthly_attendance()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    writer = AttendanceDBWriter(":memory:", integrityCheck=None)
+    start = perf_counter()
+    populate(writer, args.members, args.years)
+    report(f"populate {args.members} members x {args.years * 365} days",
+           perf_counter() - start)
+
+    # the first numpy call includes loading the matrix
+    start = perf_counter()
+    writer.get_attendance_matrix()
+    report("load the matrix", perf_counter() - start)
+
+    for method in ("get_att_per_member", "get_att_per_event", "suggest_kicks"):
+        for backend in ("sql", "numpy"):
+            func = getattr(writer, method)
+            report(f"{method} ({backend})",
+                   best_of(lambda: func(backend=backend), args.repeat))
+
+    matrix = writer.get_attendance_matrix()
+    report("per_week over all days (numpy)", best_of(matrix.per_week, args.repeat))
+    report("3 month rolling per member (numpy)", best_of(matrix.rolling, args.repeat))
+    writer.connection.close()
+
+
+if __name__ == "__main__":
+    main()
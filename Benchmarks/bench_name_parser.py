@@ -0,0 +1,45 @@
+"""Time NameParser on a roll call's worth of display names.
+
+Usage: python -m Benchmarks.bench_name_parser [--names 200] [--repeat 5]"""
+
+from argparse import ArgumentParser
+from random import Random
+from Utils.memtils import NameParser, reload_delimiters
+from Benchmarks import best_of, report
+
+TAGS = ("[DTWM] ", "[TAG] ", "")
+TITLES = (" - Tech Priest", " (Champion)", ": away", "")
+
+
+def create_names(count: int, seed: int = 0):
+    """Create display names with tags, titles, and accents."""
+    rng = Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyzéöñ0123456789"
+    return [rng.choice(TAGS) + "".join(rng.choice(letters) for _ in range(rng.randint(4, 16)))
+            + rng.choice(TITLES) for _ in range(count)]
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    names = create_names(args.names)
+
+    def cold():
+        reload_delimiters()
+        for name in names:
+            NameParser(name)._parse()
+
+    def memoised():
+        for name in names:
+            NameParser(name).parsed
+
+    report(f"_parse x {args.names} (no memo)", best_of(cold, args.repeat))
+    report(f"parsed x {args.names} (memoised)", best_of(memoised, args.repeat))
+    report(f"parse_many x {args.names} (memoised)",
+           best_of(lambda: NameParser.parse_many(names), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time how long a ReactMenu takes to respond to clicks, against a fake channel
+that takes --latency seconds per request.
+
+The old setup is replayed for comparison: it sent the message, added each reaction in turn,
+slept for a second, then fetched the message to read its reactions.
+
+Usage: python -m Benchmarks.bench_react_menu [--latency 0.1] [--repeat 3]"""
+
+from argparse import ArgumentParser
+from typing import *
+from types import SimpleNamespace
+from time import perf_counter
+import asyncio
+from Utils.react_menu import ReactMenu
+from Benchmarks import report
+
+EMOTE_IDS = (1, 2, 3, 4)
+
+
+class FakeMessage:
+    def __init__(self, latency: float):
+        self.id = 1
+        self.latency = latency
+
+    async def add_reaction(self, emoji):
+        await asyncio.sleep(self.latency)
+
+
+class FakeChannel:
+    """Each request takes latency seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def send(self, content=None, embed=None):
+        await asyncio.sleep(self.latency)
+        return FakeMessage(self.latency)
+
+    async def fetch_message(self, id):
+        await asyncio.sleep(self.latency)
+        return FakeMessage(self.latency)
+
+
+async def old_setup(channel: FakeChannel):
+    """The setup that ReactMenu used to do before it responded to clicks."""
+    msg = await channel.send()
+    for id_ in EMOTE_IDS:
+        await msg.add_reaction(id_)
+    await asyncio.sleep(1)
+    await channel.fetch_message(msg.id)
+
+
+async def new_setup(channel: FakeChannel) -> Tuple[float, float]:
+    """Create a ReactMenu with all 4 reactions.
+
+    RETURNS
+        How long it took to become interactive and to add all of the reactions, in seconds."""
+    handler = SimpleNamespace(bind=lambda menu: None)
+    bot = SimpleNamespace(get_cog=lambda name: handler, get_emoji=lambda id: id)
+    start = perf_counter()
+    menu = ReactMenu(["a", "b"], bot, channel, on_select=print, on_reject=print,
+                     last_emote_id=1, next_emote_id=2, select_emote_id=3, reject_emote_id=4)
+    await menu.wait_until_ready()
+    ready = perf_counter() - start
+    await menu.wait_until_ready(reactions=True)
+    return ready, perf_counter() - start
+
+
+async def run(latency: float, repeat: int):
+    channel = FakeChannel(latency)
+    old = []
+    for _ in range(repeat):
+        start = perf_counter()
+        await old_setup(channel)
+        old.append(perf_counter() - start)
+    new = [await new_setup(channel) for _ in range(repeat)]
+
+    report("old setup until interactive", min(old))
+    report("new setup until interactive", min(ready for ready, _ in new))
+    report("new setup until all reactions added", min(done for _, done in new))
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(run(args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
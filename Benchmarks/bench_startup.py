@@ -0,0 +1,37 @@
+"""Time importing the modules that every cog imports, in a fresh interpreter each time.
+
+Usage: python -m Benchmarks.bench_startup [--repeat 5]"""
+
+from argparse import ArgumentParser
+import subprocess
+import sys
+from Benchmarks import report
+
+MODULES = ("Utils.mestils", "Utils.rendering", "matplotlib.pyplot")
+
+
+def time_import(module: str) -> float:
+    """Import module in a new interpreter and return how long the import took in seconds."""
+    code = ("from time import perf_counter; start = perf_counter(); "
+            f"import {module}; print(perf_counter() - start)")
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True).stdout
+    return float(output)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        report(f"import {module}", min(time_import(module) for _ in range(args.repeat)))
+    # mestils used to import pyplot itself
+    check = "import sys, Utils.mestils; print('matplotlib' in sys.modules)"
+    print("mestils imports matplotlib:",
+          subprocess.run([sys.executable, "-c", check], check=True,
+                         capture_output=True, text=True).stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare the latency and peak memory of the table rendering backends.
+
+Peak memory is measured with tracemalloc, so it only counts memory allocated by Python,
+which includes numpy's arrays but not the renderers' native buffers.
+
+Usage: python -m Benchmarks.bench_tables [--rows 10 100 1000] [--repeat 3]"""
+
+from argparse import ArgumentParser
+from random import Random
+import tracemalloc
+from Utils.rendering import BACKENDS
+from Benchmarks import best_of, report
+
+
+def create_rows(count: int, seed: int = 0):
+    """Create rows like get_att_per_member's: name, ratio, away."""
+    rng = Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz0123456789"
+    return [["".join(rng.choice(letters) for _ in range(rng.randint(4, 16))),
+             f"{rng.random() * 100:.0f}%", str(rng.random() < 0.1)] for _ in range(count)]
+
+
+def peak_memory(func) -> int:
+    """Call func and return the most memory that Python had allocated during it, in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    for count in args.rows:
+        rows = create_rows(count)
+        for backend in args.backends:
+            def render():
+                BACKENDS[backend](rows, ["Name", "Ratio", "Away"])
+
+            # warm up the imports and caches so that only rendering is timed
+            render()
+            report(f"{backend} x {count} rows", best_of(render, args.repeat))
+            print(f"{'':<40}{peak_memory(render) / 2 ** 20:>12.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
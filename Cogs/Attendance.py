@@ -1,12 +1,15 @@
 """The database interface."""
 
-from discord import Member, Forbidden, Embed
+from discord import Member, HTTPException, Embed, VoiceState
 from discord.ext import commands
 from typing import *
 import datetime as D
-from Utils import common, memtils, AttendanceDB as db, react_menu
+from Utils import common, memtils, config, presence, reconciliation, AttendanceDB as db, react_menu
+from Utils.voice_sessions import VoiceSessionTracker
+from BenUtils.db import AsyncDBWriter
 from asyncio import sleep as async_sleep
-from Utils.mestils import send_as_chunks, shuffle
+import asyncio
+from Utils.mestils import send_as_chunks, shuffle, pack_mentions, sender
 
 
 class KickSuggestionMenu(react_menu.ReactTable):
@@ -42,7 +45,7 @@ class KickSuggestionMenu(react_menu.ReactTable):
         when the yes button is clicked."""
         # get the Member instance
         name = self.content[self._content_index][0]
-        person = await memtils.search_member(self.channel.guild, name)
+        person = (await self._att_cog.find_members([name])).get(name)
 
         # kick them
         if person:
@@ -69,8 +72,7 @@ class KickSuggestionMenu(react_menu.ReactTable):
             await self.msg.edit(embed=embed)
 
             # remove all the reactions
-            for reaction in self.msg.reactions:
-                await reaction.remove(self._bot.user)
+            await self.remove_reactions()
 
             # remove self from the tracked instances
             self.unregister()
@@ -81,6 +83,8 @@ class Attendance(commands.Cog):
 
     Commands and their alias:
         add_all_members, AAM
+        check_roster, RR
+        in_game, IG
         add_member, AM
         remove_member, RM
         remove_member_by_id, RMI
@@ -90,12 +94,65 @@ class Attendance(commands.Cog):
         get_event_att, Eatt
         joined_at, JA
         joined_at_by_ID, JAI
-
-    New Scouts are automatically registered to the database."""
+        bulk_kick, BK
+
+    New Scouts are automatically registered to the database.
+
+    ATTRIBUTES
+    db: BenUtils.db.AsyncDBWriter
+        The attendance database shared by every cog. Its queries run on a separate thread
+        so every method must be awaited.
+    voice: Utils.voice_sessions.VoiceSessionTracker
+        Records who is in the event channels while attendance is being taken."""
+
+    # the roles that only outfit members can have
+    MEMBER_ROLE_IDS = frozenset((
+        588061401617268746,  # Custodes
+        564827583540363264,  # Ogryn
+        729040717636304948,  # Null Maiden
+        702914817157234708,  # Noise Marine
+        564827583540363264,  # Remembrancer
+        696160922439385091,  # Arbites
+        696160804940152982,  # Chrono-gladiator
+        545804189180231691,  # Keeper
+        545807109774770187,  # Astartes
+        545804149821014036,  # Scout
+        545804220763340810,  # Champion,
+        545819032868356395,  # Chaplain
+    ))
+    GUARDSMAN_ROLE_ID = 545803265741291521
+    KICK_MESSAGE = ("You've been kicked from the chapter because you haven't" +
+                    " attended enough events this month." +
+                    " You can return in 2 weeks if you have more time :)")
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = db.AttendanceDBWriter()
+
+        self.voice = VoiceSessionTracker(config.channel_ids())
+        config.store.on_reload("channels.txt", self._reload_channels)
+
+    def _reload_channels(self):
+        """Track the new event channels after channels.txt is edited."""
+        self.voice.channel_ids = set(config.channel_ids())
+
+    @property
+    def db(self) -> AsyncDBWriter:
+        """Get the database service shared by every cog.
+        It's closed when the bot shuts down, not when this cog is unloaded."""
+        return db.get_shared_db()
+
+    def cog_unload(self):
+        """Stop following channels.txt when the Cog is removed."""
+        config.store.remove_listener("channels.txt", self._reload_channels)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: Member, before: VoiceState, after: VoiceState):
+        """Record people joining and leaving the event channels while attendance is being taken."""
+        if not self.voice.tracking:
+            return
+        self.voice.update(member.id, memtils.NameParser(member.display_name).parsed,
+                          before.channel and before.channel.id,
+                          after.channel and after.channel.id)
 
     @commands.Cog.listener()
     @commands.has_any_role(*common.leader_roles)
@@ -109,9 +166,8 @@ class Attendance(commands.Cog):
             name = memtils.NameParser(after.display_name).parsed
 
             # only register them if they're not already registered
-            if not await memtils.is_member(name,
-                                           [r[1] for r in self.db.get_all_members()]):
-                self.db.add_member(name)
+            if not await self.db.is_registered(name):
+                await self.db.add_member(name)
                 print(f"New member detected: {name}")
 
     @commands.command(aliases=["AAM"])
@@ -121,17 +177,26 @@ class Attendance(commands.Cog):
         """Add all current members to the Members table."""
         async with ctx.typing():
             in_outfit = await memtils.get_in_outfit()
-            registered = [r[1] for r in self.db.get_all_members()]
+            registered = [r[1] for r in await self.db.get_all_members()]
 
             # register them if they're not already in the DB
-            count = 0  # count every person added to the DB
-            for name in in_outfit:
-                if not await memtils.is_member(name, registered):
-                    self.db.add_member(name)
-                    count += 1
+            to_add = memtils.MemberNameIndex(registered).missing(in_outfit)
+            await self.db.add_members(to_add)
 
             # give feedback
-            await ctx.send(f"{count} new brothers have been registered, my lord.")
+            await ctx.send(f"{len(to_add)} new brothers have been registered, my lord.")
+
+    @commands.command(aliases=["RR"])
+    @commands.has_any_role(*common.leader_roles)
+    @commands.cooldown(1, 10, commands.BucketType.user)
+    async def check_roster(self, ctx):
+        """Show what the automatic roster check would change without changing anything."""
+        async with ctx.typing():
+            registered = [r[1] for r in await self.db.get_all_members()]
+            in_outfit = await memtils.get_in_outfit()
+            diff = await self.bot.loop.run_in_executor(None, reconciliation.reconcile,
+                                                       registered, in_outfit)
+        await send_as_chunks(diff.report(), ctx)
 
     @commands.command(aliases=["AM"])
     @commands.has_any_role(*common.leader_roles)
@@ -140,9 +205,8 @@ class Attendance(commands.Cog):
         """Register a member with their name."""
 
         # check that the name isn't registered
-        if not await memtils.is_member(name,
-                                       [r[1] for r in self.db.get_all_members()]):
-            self.db.add_member(name)
+        if not await self.db.is_registered(name):
+            await self.db.add_member(name)
             await ctx.send(f"Welcome to the chapter, brother {name}!")
         else:
             await ctx.send(f"{name} is already registered!")
@@ -156,10 +220,10 @@ class Attendance(commands.Cog):
         name = memtils.NameParser(name).parsed
 
         # validate the name
-        if not await memtils.is_member(name, [r[1] for r in self.db.get_all_members()]):
+        if not await self.db.is_registered(name):
             return await ctx.send("That person is not in our chapter!")
 
-        self.db.delete_member(name)
+        await self.db.delete_member(name)
         await ctx.send("Another brother lost to the warp...")
 
     @commands.command(aliases=["RMI"])
@@ -168,10 +232,10 @@ class Attendance(commands.Cog):
     async def remove_member_by_id(self, ctx, id: int):
         """Unregister a member by their id"""
         # validate the id
-        if id not in [r[0] for r in self.db.get_all_members()]:
+        if await self.db.get_member_by_id(id) is None:
             return await ctx.send("I cannot find a brother of that number, my lord")
 
-        self.db.delete_member_by_id(id)
+        await self.db.delete_member_by_id(id)
         await ctx.send("Another brother lost to the warp...")
 
     @commands.command(aliases=["DATT"])
@@ -180,6 +244,9 @@ class Attendance(commands.Cog):
     async def do_attendance(self, ctx):
         """Get the names of all people in the event voice channels
         then send it to the DB in 90 minutes."""
+        if self.voice.tracking:
+            return await ctx.send("Our men are already being counted, my lord")
+
         # calculate when attendance_inner will finish
         return_time = (D.datetime.today() +
                        D.timedelta(minutes=90)).strftime("%H:%M")
@@ -188,37 +255,28 @@ class Attendance(commands.Cog):
         return await ctx.send(f"Our men have been counted.\nAttendees: {list(attendees)}")
 
     async def attendance_inner(self) -> List[str]:
-        """Get the names of all people in the event voice channels,
-        then send it to the Attendees table in 90 minutes,
+        """Track who is in the event voice channels for 90 minutes,
+        then send it to the Attendees table with how many minutes each person stayed,
         and return the attendees' names"""
         PERIOD = 5400 if not common.DEV_VERSION else 300  # the total period in seconds
-        STEP = PERIOD // 4  # how long to wait per scan
-
-        # get the event channels
-        with open("./Text Files/channels.txt") as f:
-            channel_ids = [int(line.strip("\n")) for line in f.readlines()]
-
-        channels = [self.bot.get_channel(id) for id in channel_ids]
-
-        # repeat every `STEP` minutes
-        attendees = set()  # ensure no duplicates
-        for i in range(4):
-            # add each person in each event channel to attendees
-            for channel in channels:
-                for name in [person.display_name for person in channel.members]:
-                    attendees.add(memtils.NameParser(name).parsed)
-
-            # sleep for 30 minutes
-            # but don't wait a fourth time
-            print(f"({D.datetime.now()}): {attendees} at roll call {i}")
-            if i == 3:
-                break
-            else:
-                await async_sleep(STEP)
+
+        # the people already in the channels are counted from the start
+        # on_voice_state_update records everyone else
+        channels = [self.bot.get_channel(id) for id in self.voice.channel_ids]
+        self.voice.start((person.id, memtils.NameParser(person.display_name).parsed)
+                         for channel in channels if channel
+                         for person in channel.members)
+        try:
+            await async_sleep(PERIOD)
+        finally:
+            minutes = self.voice.stop()
 
         # record the attendance
-        print(f"Recording attendees: {attendees}")
-        self.db.record_att(attendees)
+        attendees = list(minutes)
+        print(f"({D.datetime.now()}): Recording attendees: {minutes}")
+        unregistered = await self.db.record_att(attendees, minutes)
+        if unregistered:
+            print(f"These attendees aren't registered: {unregistered}")
         return attendees
 
     @commands.command(aliases=["LM"])
@@ -229,7 +287,7 @@ class Attendance(commands.Cog):
         async def wrap(self) -> Tuple[int, str]:
             """Get the memberID and name of all members."""
             rows = [(row[0], row[1])
-                    for row in self.db.get_all_members()]
+                    for row in await self.db.get_all_members()]
             # handle no registered members
             if not rows:
                 raise ValueError("No members are registered")
@@ -252,17 +310,10 @@ class Attendance(commands.Cog):
     @commands.cooldown(1, 20, commands.BucketType.user)
     async def get_attendance(self, ctx):
         """Get the average attendance per member for this month."""
-        # this is necessary to cede control to the event loop
-        # while not making the query itself async
-        # if the query was async, it could cause the DB to be locked
-        async def wrap(self) -> str:
-            return self.db.get_att_per_member()
-
         async with ctx.typing():
             try:
-                table_path = await wrap(self)
                 react_menu.ReactTable(("Name", "Attendance (%)", "Away (yes or no)"),
-                                      await wrap(self),
+                                      await self.db.get_att_per_member(),
                                       self.bot,
                                       ctx,
                                       elements_per_page=3,
@@ -277,13 +328,10 @@ class Attendance(commands.Cog):
     @commands.cooldown(1, 20, commands.BucketType.user)
     async def get_event_attendance(self, ctx):
         """Get the average attendance per event type for this month"""
-        async def wrap(self) -> str:
-            return self.db.get_att_per_event()
-
         async with ctx.typing():
             try:
                 react_menu.ReactTable(("Event type", "Attendance %"),
-                                      await wrap(self),
+                                      await self.db.get_att_per_event(),
                                       self.bot,
                                       ctx,
                                       elements_per_page=2,
@@ -299,7 +347,7 @@ class Attendance(commands.Cog):
         """Get the join date of a member by their name."""
         # parse the name
         name = memtils.NameParser(name).parsed
-        joined_at = self.db.get_join_date_by_name(name)
+        joined_at = await self.db.get_join_date_by_name(name)
         # handle no member found
         if not joined_at:
             await ctx.send(f'Our archives do not know this "{name}"')
@@ -311,7 +359,7 @@ class Attendance(commands.Cog):
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def joined_at_by_id(self, ctx, id: int):
         """Get the join date of a member by their ID."""
-        joined_at = self.db.get_join_date_by_id(id)
+        joined_at = await self.db.get_join_date_by_id(id)
         # handle no member found
         if not joined_at:
             await ctx.send(f'Our archives do not know this "{id}"')
@@ -329,16 +377,25 @@ class Attendance(commands.Cog):
         if event_type not in ("AIR", "ARMOUR", "INFANTRY", "CO-OPS1", "CO-OPS2", "INTERNAL_OPS"):
             return await ctx.send("We don't do that kind of event!")
         else:
-            self.db.new_day(event_type)
+            await self.db.new_day(event_type)
             await ctx.send("A new day has begun")
 
+    @commands.command(aliases=["RAT"])
+    @commands.is_owner()
+    async def rebuild_attendance_totals(self, ctx):
+        """Recalculate the monthly attendance totals from every roll call.
+        Use this after editing the roll calls by hand."""
+        async with ctx.typing():
+            await self.db.rebuild_monthly_attendance()
+            await ctx.send("Our archives have been recounted, my lord")
+
     @commands.command(aliases=["MATT", "MY_ATT"])
     @commands.has_any_role(*common.member_roles)
     @commands.cooldown(1, 20, commands.BucketType.user)
     async def get_my_attendance(self, ctx):
         """Get your attendance %"""
         name = memtils.NameParser(ctx.author.display_name).parsed
-        ratio = self.db.get_member_att(name)
+        ratio = await self.db.get_member_att(name)
         if ratio is None:
             await ctx.send("You haven't attended any events, brother. Please join our future wars!")
         else:
@@ -356,35 +413,31 @@ class Attendance(commands.Cog):
         """See the parent method.
         This exists so that it can be called outside of the bot command"""
         async with common.bot_channel.typing():
-            # get all the outfit members
-            in_outfit = await memtils.get_in_outfit(True)
-
-            # get people playing PS2
-            in_game = [person for person in in_outfit
-                       if "Planetside 2" in [
-                           act.name for act in person.activities
-                       ]
-                       ]
+            # get the outfit members playing PS2
+            in_game = presence.get_in_game()
 
-            # get the event voice channel ids
-            with open("./Text Files/channels.txt") as f:
-                ids = [int(row.strip("\n")) for row in f.readlines()]
-
-            channels = [self.bot.get_channel(id) for id in ids]
+            # get everyone in the event voice channels
+            channels = [self.bot.get_channel(id) for id in self.voice.channel_ids]
+            in_channels = {person.id for channel in channels if channel
+                           for person in channel.members}
 
             # ping them if they're not in those channels
-            for person in in_game:
-                # search for them in the channels
-                found = False
-                for channel in channels:
-                    if person in channel.members:
-                        found = True
-                        break
-
-                # ping them if they weren't found
-                if not found:
-                    await common.bot_channel.send(
-                        f"Come quickly, brother, an event is starting {person.mention}!")
+            missing = [person.mention for person in in_game if person.id not in in_channels]
+            await sender.send_all(common.bot_channel, pack_mentions(
+                missing, prefix="Come quickly, brothers, an event is starting! "))
+
+    @commands.command(aliases=["IG"])
+    @commands.has_any_role(*common.member_roles)
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def in_game(self, ctx):
+        """Show who is playing Planetside 2 right now and today's peak."""
+        roster = memtils.get_roster()
+        names = [roster.names[person.id][1] for person in presence.get_in_game()]
+        peak, peak_at = presence.in_game.get_peak()
+        summary = f"{len(names)} brothers are fighting, {memtils.get_title(ctx.author)}"
+        if peak_at:
+            summary += f". Today's peak was {peak} at {peak_at:%H:%M} UTC"
+        await send_as_chunks(summary + (": " + ", ".join(names) if names else ""), ctx)
 
     @commands.command(aliases=["away", "A"])
     @commands.has_any_role(*common.leader_roles)
@@ -393,7 +446,7 @@ class Attendance(commands.Cog):
         """Mark the target as away in the database."""
         # parse the name
         name = memtils.NameParser(name).parsed
-        member_found = self.db.mark_away(name)
+        member_found = await self.db.mark_away(name)
 
         # report whether the query was successful
         if member_found:
@@ -408,53 +461,90 @@ class Attendance(commands.Cog):
         """Get whether the person is away."""
         # parse the name
         name = memtils.NameParser(name).parsed
-        row = self.db.get_member_by_name(name)
+        row = await self.db.get_member_by_name(name)
         if row:
             await ctx.send(f'''{name} is marked as {"not" if not row[2] else ""} away in our archives, my lord.''')
         else:
             await ctx.send(f'''Our archives don't know of this "{name}", my lord.''')
 
-    async def kick_member(self, person: Member):
+    async def find_members(self, names: Iterable[str]) -> Dict[str, Member]:
+        """Get the outfit members with the parsed names.
+
+        RETURNS
+            The Members by their parsed name. Names that weren't found are left out."""
+        roster = memtils.get_roster()
+        found = {name: roster.get_by_name(name) for name in names}
+        return {name: person for name, person in found.items() if person is not None}
+
+    async def kick_member(self, person: Member) -> bool:
         """Remove the person from the outfit, move them to Guardsman,
            and DM them about it.
 
            This is its own method so that get_attendance can be
-           extended to auto-kick people."""
-        # remove them from the DB
-        self.db.delete_member(memtils.NameParser(person.display_name).parsed)
-
-        # get the member-only roles roles
-        member_role_ids = [
-            588061401617268746,  # Custodes
-            564827583540363264,  # Ogryn
-            729040717636304948,  # Null Maiden
-            702914817157234708,  # Noise Marine
-            564827583540363264,  # Remembrancer
-            696160922439385091,  # Arbites
-            696160804940152982,  # Chrono-gladiator
-            545804189180231691,  # Keeper
-            545807109774770187,  # Astartes
-            545804149821014036,  # Scout
-            545804220763340810,  # Champion,
-            545819032868356395,  # Chaplain
-        ]
-        guild = person.guild
-        member_roles = [guild.get_role(id) for id in member_role_ids]
-
-        # move them to Guardsman
-        await person.remove_roles(*member_roles, reason="Kicked from the outfit")
-        await person.add_roles(guild.get_role(545803265741291521), reason="Kicked from the outfit")
-
-        # DM them
-        try:
-            await person.send("You've been kicked from the chapter because you haven't" +
-                              " attended enough events this month." +
-                              " You can return in 2 weeks if you have more time :)")
-        # ping them in the bot channel if they can't be DMed
-        except Forbidden:
-            await common.bot_channel.send(f"{person.mention} You've been kicked from the chapter " +
-                                          "because you haven't attended enough events this month." +
-                                          " You can return in 2 weeks if you have more time :)")
+           extended to auto-kick people.
+
+           RETURNS
+               Whether their roles could be changed. They stay registered if not."""
+        _, not_kicked = await self.kick_members([person])
+        return not not_kicked
+
+    async def kick_members(self, people: Iterable[Member],
+                           concurrency: int = 5) -> Tuple[List[Member], List[Member]]:
+        """Remove the people from the outfit, move them to Guardsman,
+        and DM them about it.
+
+        ARGUMENTS
+        people:
+            The people to kick. They must be in the same guild.
+        concurrency:
+            How many role edits and DMs can be in progress at once.
+
+        RETURNS
+            The people that couldn't be DMed. They're pinged in the bot channel instead.
+            The people whose roles couldn't be changed. They aren't unregistered."""
+        people = list(people)
+        if not people:
+            return [], []
+
+        guardsman = people[0].guild.get_role(self.GUARDSMAN_ROLE_ID)
+        limit = asyncio.Semaphore(concurrency)
+        kicked = []
+        not_dmed = []
+        not_kicked = []
+
+        async def kick_one(person: Member):
+            # swap the member-only roles for Guardsman in one request
+            roles = [role for role in person.roles
+                     if role.id not in self.MEMBER_ROLE_IDS and not role.is_default()]
+            if guardsman and guardsman not in roles:
+                roles.append(guardsman)
+            async with limit:
+                try:
+                    await person.edit(roles=roles, reason="Kicked from the outfit")
+                # the role hierarchy or Discord stopped us, so leave them be
+                except HTTPException as error:
+                    print(f"Couldn't kick {person.display_name}: {error}")
+                    not_kicked.append(person)
+                    return
+                kicked.append(person)
+                try:
+                    await person.send(self.KICK_MESSAGE)
+                # ping them in the bot channel if they can't be DMed
+                except HTTPException:
+                    not_dmed.append(person)
+
+        await asyncio.gather(*[kick_one(person) for person in people])
+
+        # only unregister the people that were actually moved to Guardsman
+        if kicked:
+            await self.db.delete_members(memtils.NameParser.parse_many(
+                person.display_name for person in kicked))
+
+        if not_dmed:
+            await sender.send_all(common.bot_channel,
+                                  pack_mentions((person.mention for person in not_dmed),
+                                                prefix=self.KICK_MESSAGE + " "))
+        return not_dmed, not_kicked
 
     @commands.command(aliases=["K"])
     @commands.has_any_role(*common.leader_roles)
@@ -471,17 +561,57 @@ class Attendance(commands.Cog):
                     return await ctx.send("I can't find that person, my lord")
 
             # validate the person
-            if not await memtils.is_member(person.display_name,
-                                           [r[1] for r in self.db.get_all_members()]):
+            if not await self.db.is_registered(person.display_name):
                 await ctx.send("That person is not in our chapter!")
             else:
                 # easter-egg
-                if memtils.check_roles(person, common.leader_roles):
+                if memtils.is_leader(person):
                     return await ctx.send("You know that regicide is illegal," +
                                           f" {memtils.get_title(person)}")
 
-                await self.kick_member(person)
-                await ctx.send("He has been expelled, my lord")
+                if await self.kick_member(person):
+                    await ctx.send("He has been expelled, my lord")
+                else:
+                    await ctx.send("He resists expulsion, my lord. I couldn't change his roles")
+
+    @commands.command(aliases=["BK"])
+    @commands.has_any_role(*common.leader_roles)
+    @commands.cooldown(1, 60, commands.BucketType.user)
+    async def bulk_kick(self, ctx, *people: Member):
+        """Kick many people from the outfit at once. Mention them...
+        If nobody is mentioned, everyone that suggest_kicks recommends kicking will be kicked.
+        They will be moved to Guardsman, unregistered, and DMed."""
+        if not people:
+            try:
+                table_rows, *_ = await self.db.suggest_kicks()
+            except ValueError:
+                return await ctx.send("I have no archive entries to base my opinion on, my lord")
+            found = await self.find_members(row[0] for row in table_rows if row[2] == "Kick")
+            people = list(found.values())
+            if not people:
+                return await ctx.send("I recommend kicking nobody, my lord")
+
+            # confirm before kicking people that weren't named
+            await send_as_chunks(f"I will expel {len(people)} brothers: " +
+                                 ", ".join(found) + ". Reply 'yes' to confirm, my lord", ctx)
+            try:
+                await self.bot.wait_for("message", timeout=30,
+                                        check=lambda msg: msg.author == ctx.author
+                                        and msg.channel == ctx.channel
+                                        and msg.content.lower() == "yes")
+            except asyncio.TimeoutError:
+                return await ctx.send("Then they shall stay, my lord")
+
+        # the easter-egg of kick
+        people = [person for person in people
+                  if not memtils.is_leader(person)]
+        async with ctx.typing():
+            not_dmed, not_kicked = await self.kick_members(people)
+        await ctx.send(f"{len(people) - len(not_kicked)} brothers have been expelled, my lord" +
+                       (f". {len(not_dmed)} of them couldn't be DMed" if not_dmed else ""))
+        if not_kicked:
+            await send_as_chunks("I couldn't change the roles of these brothers, so they remain: " +
+                                 ", ".join(person.display_name for person in not_kicked), ctx)
 
     @commands.command(aliases=["RA"])
     @commands.has_any_role(*common.leader_roles)
@@ -490,10 +620,10 @@ class Attendance(commands.Cog):
         """Remove a person's away status."""
         name = memtils.NameParser(name).parsed
         # validate the person
-        if not await memtils.is_member(name, [r[1] for r in self.db.get_all_members()]):
+        if not await self.db.is_registered(name):
             await ctx.send("That person is not in our chapter!")
         else:
-            self.db.unmark_away(name)
+            await self.db.unmark_away(name)
             await ctx.send("An old face has returned :D")
 
     @commands.command(aliases=["SK", "SKSKSKSKSKSKSKSKSK_GIVE_ME_THE_TEA_SIS"])
@@ -501,14 +631,9 @@ class Attendance(commands.Cog):
     @commands.cooldown(1, 20, commands.BucketType.user)
     async def suggest_kicks(self, ctx):
         """Suggest who should be kicked this month."""
-        async def wrap(self) -> Tuple[
-                List[Tuple[str, int, str, str, str]],
-                str, str]:
-            return self.db.suggest_kicks()
-
         async with ctx.typing():
             try:
-                table_rows, *stats = await wrap(self)
+                table_rows, *stats = await self.db.suggest_kicks()
 
                 # create the reaction table
                 KickSuggestionMenu(table_rows, ctx, *stats)
@@ -533,7 +658,7 @@ class Attendance(commands.Cog):
         extra_leader: Optional[Member] = None
         if len(shuffled) % 2 != 0:
             extra_leader = list(
-                filter(lambda m: any([n in common.leader_roles for n in [ro.name for ro in m.roles]]), shuffled))[0]
+                filter(memtils.is_leader, shuffled))[0]
             shuffled.pop(shuffled.index(extra_leader))
 
         pairs = [f"{shuffled[i].mention} your partner is {shuffled[i - 1].mention}"
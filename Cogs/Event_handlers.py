@@ -1,12 +1,14 @@
 """This module collects all of the event_handler_modules into one namespace"""
 
 from discord.ext import commands
-from .event_handler_modules import error_handler, moderators, reaction_handlers, react_menu_handling
+from .event_handler_modules import error_handler, moderators, reaction_handlers, react_menu_handling, \
+    member_tracking
 
 
 def setup(bot):
     modules = (
         error_handler,
+        member_tracking,
         moderators,
         react_menu_handling,
         reaction_handlers,
@@ -18,6 +20,7 @@ def setup(bot):
 def teardown(bot):
     modules = (
         error_handler,
+        member_tracking,
         moderators,
         react_menu_handling,
         reaction_handlers,
@@ -5,11 +5,9 @@ from discord.ext import commands, tasks
 from asyncio import sleep as async_sleep
 from typing import *
 from .Attendance import Attendance
-from Utils import common, memtils
-from json import load
+from Utils import common, memtils, config, AttendanceDB, backups, reconciliation
 from random import choice
 import datetime as D
-import os
 from traceback import print_exc
 from sqlite3 import OperationalError
 from contextlib import suppress
@@ -25,8 +23,10 @@ class RepeatingTasks(commands.Cog):
         start_day: str
             The day that the rescheduler last hit.
             Format: %Y/%m/%d
-        att: Attendance.Attendance
-            The object used to call attendance functions."""
+        att: Optional[Attendance.Attendance]
+            The loaded Attendance cog. None if it isn't loaded.
+    backups: Utils.backups.BackupManager
+        Keeps the local rotation of DB backups."""
     WINTER_START_TIME = D.time(20, 00)
     SUMMER_START_TIME = D.time(19, 00)
 
@@ -39,9 +39,8 @@ class RepeatingTasks(commands.Cog):
         self.scheduled = False
         # create a dummy start time so that the rescheduler doesn't reject today
         self.start_day = D.datetime(1980, 1, 1).strftime("%Y/%m/%d")
-
-        # start a dummy instance of Attendance
-        self.att = Attendance(bot)
+        # one full backup a week, the rest are deltas
+        self.backups = backups.BackupManager(full_every=14)
 
         # start the tasks
         tasks_ = [
@@ -49,13 +48,19 @@ class RepeatingTasks(commands.Cog):
             self.change_status,
             self.new_day,
             self.check_registered_members,
-            self.images_cleanup,
             self.backup_DB,
+            self.check_DB_integrity,
+            self.reload_config,
         ]
 
         for task in tasks_:
             task.start()
 
+    @property
+    def att(self) -> Optional[Attendance]:
+        """Get the loaded Attendance cog. It shares its database with the other cogs."""
+        return self.bot.get_cog("Attendance")
+
     async def _schedule_att(self):
         """
         Finds the time until event time and waits until then to
@@ -88,12 +93,17 @@ class RepeatingTasks(commands.Cog):
             # wait until event time
             await async_sleep(run_in_seconds)
 
+            # the Attendance cog may have been unloaded while waiting
+            att = self.att
+            if att is None:
+                return
+
             # ping people to get in ops
-            await self.att.get_in_ops_inner()
+            await att.get_in_ops_inner()
 
             # do attendance
             print("attendance starting")
-            await self.att.attendance_inner()
+            await att.attendance_inner()
 
         except:
             print_exc()
@@ -119,9 +129,7 @@ class RepeatingTasks(commands.Cog):
     async def change_status(self):
         """Change the status every 30 minutes."""
         try:
-            # get the responses
-            with open("./Text Files/statuses.json", encoding="utf-8-sig") as f:
-                statuses = load(f)
+            statuses = config.statuses()
 
             # choose a random status from the two lists combined
             chosen_status = choice(statuses["playing"] + statuses["watching"])
@@ -167,7 +175,7 @@ class RepeatingTasks(commands.Cog):
                 6: "INTERNAL_OPS",
             }
 
-            self.att.db.new_day(event_types[day])
+            await AttendanceDB.get_shared_db().new_day(event_types[day])
 
     @tasks.loop(hours=12)
     async def check_registered_members(self):
@@ -179,67 +187,101 @@ class RepeatingTasks(commands.Cog):
             return
 
         try:
+            db = AttendanceDB.get_shared_db()
             # get the names of all registered members
-            registered = [row[1] for row in self.att.db.get_all_members()]
+            registered = [row[1] for row in await db.get_all_members()]
 
             # get all the names of the people in the discord outfit
             await common.wait_until_loaded(self.bot)
             in_outfit = await memtils.get_in_outfit()
 
-            # add those who are not registered
-            for name in in_outfit:
-                if not await memtils.is_member(name, registered):
-                    self.att.db.add_member(name)
-                    print(f'"{name}" was detected by the cleanup check. ' +
-                          "I have registered him.")
-
-            # remove those who are registered but not in in_outfit
-            for name in registered:
-                if not await memtils.is_member(name, in_outfit):
-                    self.att.db.delete_member(name)
-                    print(f'"{name}" was detected by the cleanup check. ' +
-                          "I have un-registered him.")
+            # pair them up away from the event loop, then apply the changes in one commit
+            diff = await self.bot.loop.run_in_executor(None, reconciliation.reconcile,
+                                                       registered, in_outfit)
+            if not diff:
+                return
+            await db.run(diff.apply)
+
+            for name in diff.adds:
+                print(f'"{name}" was detected by the cleanup check. ' +
+                      "I have registered him.")
+            for name in diff.removes:
+                print(f'"{name}" was detected by the cleanup check. ' +
+                      "I have un-registered him.")
+            for old, new in diff.renames:
+                print(f'"{old}" was detected by the cleanup check as "{new}". ' +
+                      "I have renamed him.")
         except:
             print_exc()
 
-    @tasks.loop(hours=4)
-    async def images_cleanup(self):
-        """Delete the built-up images from mestils.create_table."""
-        for file_name in os.listdir("./Images"):
-            os.remove(f"./Images/{file_name}")
+    @tasks.loop(hours=24)
+    async def check_DB_integrity(self):
+        """Run the full integrity check on the attendance DB once a day.
+        Only the quick check is run when the DB is opened."""
+        try:
+            errors = await AttendanceDB.get_shared_db().checkIntegrity()
+            if errors:
+                print(f"The attendance DB failed its integrity check. Errors: {errors}")
+                await common.wait_until_loaded(self.bot)
+                await common.error_channel.send("The attendance DB failed its integrity check:\n" +
+                                                "\n".join(errors)[:1900])
+        except:
+            print_exc()
+
+    @check_DB_integrity.before_loop
+    async def delay_integrity_check(self):
+        """Keep the full check away from the startup I/O."""
+        await self.bot.wait_until_ready()
+        await async_sleep(3600)
+
+    @tasks.loop(minutes=1)
+    async def reload_config(self):
+        """Reload the files in Text Files that have been edited.
+        Only their modification times are checked unless one has changed."""
+        try:
+            reloaded = config.store.refresh()
+            if reloaded:
+                print(f"Reloaded {', '.join(reloaded)}")
+        except:
+            print_exc()
 
     @tasks.loop(hours=12)
     async def backup_DB(self):
-        """Sends the DB to Bot Testing.backups every 12 hours.
+        """Sends a backup of the DB to Bot Testing.backups every 12 hours.
 
-        Messages have a 5MB file size limit.
-        I calculated that we should fall well-within that cap
-        over the course of a year so this should be safe.
-        This will need to be revised if our outfit suddenly becomes
-        very large but that's unlikely."""
+        The snapshot is taken with the sqlite backup API on the DB's thread,
+        then it's compressed on another thread. Only the pages that changed
+        since the last backup are sent, apart from a full copy every week.
+        Use Utils.backups.restore with the files from the backups channel
+        to get the DB back."""
         # don't back up the dev version's DBs
         if common.DEV_VERSION:
             return
 
-        # search for the first file with "attendance" in its name
-        # which has a .db extension
-        folder = "./BenUtils/Databases/"
-        db_file = None
-        for file_name in os.listdir(folder):
-            if "attendance" in file_name.lower() and ".db" == file_name[-3:]:
-                db_file = folder + file_name
-        if not db_file:
-            return  # check that the file was found
-
-        # send it to Bot Channel.backups
         try:
-            await common.wait_until_loaded(self.bot)
-            backups_channel = self.bot.get_channel(712352058035929158)
-            await backups_channel.send(f"DB backup from {D.datetime.today().strftime('%d.%m.%Y')}",
-                                       file=File(db_file))
+            snapshot_path = await AttendanceDB.get_shared_db().run(self.backups.snapshot)
+            backup_path = await self.bot.loop.run_in_executor(None, self.backups.prepare,
+                                                              snapshot_path)
+            if not backup_path:
+                print("The database hasn't changed since the last backup.")
+                return
+
+            # send it to Bot Channel.backups
+            # the next delta is only made against it once it's been sent
+            try:
+                await common.wait_until_loaded(self.bot)
+                backups_channel = self.bot.get_channel(712352058035929158)
+                await backups_channel.send(
+                    f"DB backup from {D.datetime.today().strftime('%d.%m.%Y')}",
+                    file=File(backup_path))
+            except:
+                self.backups.discard(backup_path)
+                raise
+            self.backups.commit(backup_path)
             print("Backed up the database successfully!")
         except:
             # log to Bot Testing.errors
+            print_exc()
             print("The database failed to back up.")
             await common.error_channel.send("Failed to back up the DB on " +
                                             f"{D.datetime.today().strftime('%d.%m.%Y')}")
@@ -0,0 +1,105 @@
+from discord.ext import commands
+from discord import Member, Role, Guild
+from Utils import common
+from Utils.memtils import roles, outfit
+from Utils.presence import in_game
+
+
+class MemberTracking(commands.Cog):
+    """Keeps the member indexes in Utils up to date with common.server."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @staticmethod
+    def _is_server(guild: Guild) -> bool:
+        """Check if the event came from common.server."""
+        return common.server is not None and guild.id == common.server.id
+
+    @staticmethod
+    def _update(member: Member):
+        """Re-check whether the member is in the outfit and in game."""
+        if outfit.update(member):
+            in_game.update(member)
+        else:
+            in_game.remove(member.id)
+
+    @staticmethod
+    def _rebuild():
+        """Re-check every outfit member after a role changed."""
+        outfit.build(common.server)
+        in_game.build(outfit.members.values())
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Index the server. on_ready is also fired after reconnecting,
+        which may have missed some updates."""
+        await common.wait_until_loaded(self.bot)
+        roles.build(common.server)
+        self._rebuild()
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: Member, after: Member):
+        if not self._is_server(after.guild):
+            return
+        # discord.py 1.x sends presence changes here too
+        if before.roles != after.roles:
+            roles.update_member(after)
+            self._update(after)
+        elif before.display_name != after.display_name:
+            self._update(after)
+        elif before.activities != after.activities and after in outfit:
+            in_game.update(after)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: Member):
+        if self._is_server(member.guild):
+            roles.update_member(member)
+            self._update(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: Member):
+        if self._is_server(member.guild):
+            roles.remove_member(member.id)
+            outfit.remove(member.id)
+            in_game.remove(member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: Role):
+        if self._is_server(role.guild):
+            roles.add_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: Role):
+        if self._is_server(role.guild):
+            roles.remove_role(role)
+            # everyone with the role may have left the outfit
+            self._rebuild()
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: Role, after: Role):
+        if self._is_server(after.guild) and before.name != after.name:
+            roles.rename_role(before, after)
+            self._rebuild()
+
+
+def setup(bot: commands.Bot):
+    """Load MemberTracking.
+
+    Args:
+        bot (commands.Bot): the bot to load the Cogs to
+    """
+    cogs = (
+        MemberTracking,
+    )
+
+    for cog in cogs:
+        bot.add_cog(cog(bot))
+
+
+def teardown(bot):
+    cogs = (
+        "MemberTracking",
+    )
+    for cog in cogs:
+        bot.remove_cog(cog)
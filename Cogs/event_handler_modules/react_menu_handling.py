@@ -1,6 +1,7 @@
-from discord import Reaction, Member
+from discord import RawReactionActionEvent, HTTPException, Object
 from discord.ext import commands, tasks
-from typing import Dict
+from typing import Dict, Tuple
+from contextlib import suppress
 from inspect import iscoroutinefunction as iscorofunc
 from json import dumps
 from Utils.mestils import send_as_chunks
@@ -10,60 +11,81 @@ import datetime as D
 class ReactMenuHandler(commands.Cog):
     """Manages all of the active ReactMenus.
 
+    Reactions are routed from on_raw_reaction_add, so menus work even if
+    their message has left discord.py's message cache.
+
     ATTRIBUTES
-    bound_messages: Dict[Tuple[int, ReactMenu]]
+    bound_messages: Dict[int, ReactMenu]
         The messages that are currently being tracked.
         They're cleaned up every 10 minutes.
-        Format: Message.id : ReactMenu"""
+        Format: Message.id : ReactMenu
+    routes: Dict[Tuple[int, int], Tuple[ReactMenu, str]]
+        The menu and the name of the callback for each button.
+        Format: (Message.id, Emoji.id) : (ReactMenu, callback name)"""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.bound_messages: Dict[int, 'ReactMenu'] = {}
+        self.routes: Dict[Tuple[int, int], Tuple['ReactMenu', str]] = {}
         self.message_cleanup.start()
 
-    @commands.Cog.listener()
-    async def on_reaction_add(self, reaction_: Reaction, person: Member):
-        """Check if the message reacted to is bound.
-        If so, execute the reaction's callback if applicable."""
-        # don't respond to self
-        if person == self.bot.user:
-            return
+    def bind(self, menu: 'ReactMenu'):
+        """Start routing the reactions on the menu's message to it."""
+        self.bound_messages[menu.msg.id] = menu
+        for emote_id, callback_name in menu.emotes.items():
+            self.routes[(menu.msg.id, emote_id)] = (menu, callback_name)
 
-        # check if the message is bound
-        msg = reaction_.message
-        if msg.id not in self.bound_messages:
+    def unbind(self, menu: 'ReactMenu'):
+        """Stop routing reactions to the menu. Ignored if it isn't bound."""
+        if self.bound_messages.pop(menu.msg.id, None) is None:
             return
+        for emote_id in menu.emotes:
+            self.routes.pop((menu.msg.id, emote_id), None)
 
-        # check if the reaction is valid
-        menu = self.bound_messages[msg.id]
-
-        # check that it's ready
-        if menu._starting:
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
+        """Execute the callback of the button that was clicked if it's on a bound message,
+        then remove the reaction that was added."""
+        # don't respond to self
+        if payload.user_id == self.bot.user.id:
             return
 
-        # execute the reaction's callback if it exists
-        cb = getattr(menu,
-                     menu.emotes[reaction_.emoji.id], None)
-        if cb is not None:
-            # allow coroutines
-            if iscorofunc(cb):
-                await cb(menu)
-            else:
-                cb(menu)
-
-        # clean up the user's reactions
-        for r in msg.reactions:
-            await r.remove(person)
+        route = self.routes.get((payload.message_id, payload.emoji.id))
+        if route is None:
+            # clean up reactions that aren't buttons too
+            menu = self.bound_messages.get(payload.message_id)
+            if menu is None:
+                return
+        else:
+            menu, callback_name = route
+            # check that it's ready
+            if menu._starting:
+                return
+
+            # execute the reaction's callback if it exists
+            cb = getattr(menu, callback_name, None)
+            if cb is not None:
+                # allow coroutines
+                if iscorofunc(cb):
+                    await cb(menu)
+                else:
+                    cb(menu)
+
+        # clean up the user's reaction
+        with suppress(HTTPException):
+            await menu.msg.remove_reaction(payload.emoji, Object(payload.user_id))
 
     @tasks.loop(minutes=10)
     async def message_cleanup(self):
         """Stop tracking messages that are older than 10 minutes."""
         # check if it was last interacted wtih >10 minutes ago
         now = D.datetime.utcnow()
-        new_bound_messages = {menu.msg.id: menu for menu in self.bound_messages.values()
-                              if (menu.msg.edited_at and ((now - menu.msg.edited_at).seconds / 60) < 10)
-                              or ((now - menu.msg.created_at).seconds / 60) < 10}
-        self.bound_messages = new_bound_messages
+        expired = [menu for menu in self.bound_messages.values()
+                   if not ((menu.msg.edited_at
+                            and (now - menu.msg.edited_at).total_seconds() / 60 < 10)
+                           or (now - menu.msg.created_at).total_seconds() / 60 < 10)]
+        for menu in expired:
+            self.unbind(menu)
 
     @commands.command(aliases=["SRM"])
     @commands.is_owner()
@@ -1,11 +1,10 @@
 from discord.ext import commands
 import datetime as D
 from asyncio import get_event_loop
-from Utils import common
+from Utils import common, config
 from discord import Message, TextChannel
 from typing import Dict, Optional, List, Callable
 from random import choice
-from json import load
 from Utils.mestils import search_word, get_eu_timezone
 
 
@@ -127,9 +126,7 @@ class TextReactions(ReactionParent):
         # send a message if a match was found
         if match_name:
             self.set_cooldown(msg.channel)
-            with open("./Text Files/responses.json") as f:
-                responses = load(f)
-            await msg.channel.send(choice(responses[match_name]))
+            await msg.channel.send(choice(config.responses()[match_name]))
 
     @property
     def is_winter(self) -> bool:
@@ -192,12 +189,8 @@ class ReactReactions(ReactionParent):
 
         # only try to react if a match was found
         if match_name is not None:
-            # get the responses
-            with open("./Text Files/responses.json") as f:
-                responses = load(f)
-
             self.set_cooldown(msg.channel)
-            await msg.add_reaction(choice(responses[match_name]))
+            await msg.add_reaction(choice(config.responses()[match_name]))
 
 
 class ReactionOverlord(ReactionParent):
@@ -0,0 +1,8 @@
+-- name lookups: get_member_by_name, delete_member, mark_away, record_att, etc.
+CREATE INDEX IF NOT EXISTS idx_members_name ON Members(name);
+
+-- monthly reports: a range over the month that covers the joined and averaged columns
+CREATE INDEX IF NOT EXISTS idx_attendees_date ON Attendees(date, memberID, attended);
+
+-- per-member reports and the ON DELETE CASCADE from Members
+CREATE INDEX IF NOT EXISTS idx_attendees_member ON Attendees(memberID, date, attended);
@@ -0,0 +1,42 @@
+-- store dates as day numbers (the same as datetime.date.toordinal())
+-- so that a month is an integer range and rows don't need to be parsed.
+-- SQLite can't change a column's type so the tables are rebuilt
+
+CREATE TABLE Days_new(
+    date INTEGER PRIMARY KEY,
+	eventType TEXT NOT NULL
+	CHECK(
+		eventType IN("AIR", "ARMOUR", "INFANTRY", "CO-OPS1", "CO-OPS2", "INTERNAL_OPS")
+	)
+);
+INSERT INTO Days_new(date, eventType)
+    SELECT CAST(julianday(date) - 1721424.5 AS INTEGER), eventType FROM Days;
+
+CREATE TABLE Members_new(
+    memberID INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    away BOOL DEFAULT 0,
+	joinedAt INTEGER DEFAULT (CAST(julianday('now') - 1721424.5 AS INTEGER)));
+INSERT INTO Members_new(memberID, name, away, joinedAt)
+    SELECT memberID, name, away, CAST(julianday(joinedAt) - 1721424.5 AS INTEGER) FROM Members;
+
+CREATE TABLE Attendees_new(
+    date INTEGER NOT NULL, 
+    memberID INTEGER NOT NULL, 
+    attended BOOL DEFAULT 0, 
+    FOREIGN KEY(memberID) REFERENCES Members(memberID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY(date) REFERENCES Days(date) ON DELETE CASCADE ON UPDATE CASCADE);
+INSERT INTO Attendees_new(date, memberID, attended)
+    SELECT CAST(julianday(date) - 1721424.5 AS INTEGER), memberID, attended FROM Attendees;
+
+DROP TABLE Attendees;
+DROP TABLE Members;
+DROP TABLE Days;
+ALTER TABLE Days_new RENAME TO Days;
+ALTER TABLE Members_new RENAME TO Members;
+ALTER TABLE Attendees_new RENAME TO Attendees;
+
+-- the indexes were dropped with the old tables
+CREATE INDEX idx_members_name ON Members(name);
+CREATE INDEX idx_attendees_date ON Attendees(date, memberID, attended);
+CREATE INDEX idx_attendees_member ON Attendees(memberID, date, attended);
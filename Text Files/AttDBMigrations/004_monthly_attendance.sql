@@ -0,0 +1,22 @@
+-- running totals of each member's attendance per month and event type
+-- so that the reports don't have to aggregate every roll call.
+-- month is the day number of the first day of the month
+CREATE TABLE IF NOT EXISTS MonthlyAttendance(
+    month INTEGER NOT NULL,
+    memberID INTEGER NOT NULL,
+    eventType TEXT NOT NULL,
+    attended INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(month, memberID, eventType),
+    FOREIGN KEY(memberID) REFERENCES Members(memberID) ON DELETE CASCADE ON UPDATE CASCADE);
+
+-- for the ON DELETE CASCADE from Members
+CREATE INDEX IF NOT EXISTS idx_monthly_attendance_member ON MonthlyAttendance(memberID);
+
+-- backfill from the existing roll calls
+INSERT INTO MonthlyAttendance(month, memberID, eventType, attended, total)
+    SELECT CAST(julianday(Attendees.date + 1721424.5, 'start of month') - 1721424.5 AS INTEGER),
+        memberID, eventType, SUM(attended), COUNT(*)
+    FROM Attendees, Days
+    WHERE Attendees.date = Days.date
+    GROUP BY 1, memberID, eventType;
@@ -0,0 +1,2 @@
+-- the minutes each member spent in the event channels, from Utils.voice_sessions
+ALTER TABLE Attendees ADD COLUMN minutes INTEGER NOT NULL DEFAULT 0;
@@ -1,10 +1,193 @@
 import unittest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+from discord import HTTPException, Forbidden
+from BenUtils.db import AsyncDBWriter
+from Utils.AttendanceDB import AttendanceDBWriter, get_shared_db, close_shared_db
+from Cogs.Attendance import Attendance, KickSuggestionMenu
+from Utils import common
+from testils import create_bot, async_test
+
+
+class FakeRole:
+    def __init__(self, id: int, default: bool = False):
+        self.id = id
+        self.default = default
+
+    def is_default(self) -> bool:
+        return self.default
+
+
+class FakeGuild:
+    def __init__(self):
+        self.roles = {}
+
+    def get_role(self, id: int) -> FakeRole:
+        return self.roles.setdefault(id, FakeRole(id))
+
+
+class FakeChannel:
+    """Records the messages sent to it."""
+
+    def __init__(self):
+        self.id = 0
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def http_error(error: type = HTTPException, status: int = 500) -> HTTPException:
+    return error(SimpleNamespace(status=status, reason="Error"), "Error")
+
+
+class FakeMember:
+    """Records the requests made to kick it.
+    edit_error and send_error are raised by those requests."""
+
+    def __init__(self, name: str, guild: FakeGuild, roles,
+                 edit_error: Exception = None, send_error: Exception = None):
+        self.display_name = name
+        self.mention = f"@{name}"
+        self.guild = guild
+        self.roles = roles
+        self.edit_error = edit_error
+        self.send_error = send_error
+        self.requests = []
+
+    async def edit(self, roles, reason=None):
+        self.requests.append("edit")
+        await asyncio.sleep(0.01)
+        if self.edit_error:
+            raise self.edit_error
+        self.roles = roles
+
+    async def send(self, content):
+        self.requests.append("send")
+        if self.send_error:
+            raise self.send_error
+
+
+class FakeMessage:
+    """Records the bot's reactions on it. Like the Message returned by send,
+    its reactions attribute isn't updated."""
+
+    def __init__(self):
+        self.id = 1
+        self.reactions = []
+        self.added = []
+
+    async def edit(self, embed=None):
+        pass
+
+    async def add_reaction(self, emoji):
+        self.added.append(emoji)
+
+    async def remove_reaction(self, emoji, member):
+        self.added.remove(emoji)
+
+
+class FakeMenuChannel:
+    async def send(self, content=None, embed=None):
+        self.msg = FakeMessage()
+        return self.msg
 
 
 class Test_test_attendance(unittest.TestCase):
     def test_A(self):
         pass
 
+    @async_test
+    async def test_reload(self):
+        """Check that reloading the cog keeps using the same database service."""
+        bot = create_bot("Attendance")
+        old = Attendance(bot)
+        shared = old.db
+        old.cog_unload()
+        await asyncio.sleep(0)
+        self.assertIs(Attendance(bot).db, shared)
+        self.assertIs(get_shared_db(), shared)
+        await close_shared_db()
+
+
+class test_bulk_kick(unittest.TestCase):
+    def setUp(self):
+        self.cog = Attendance(create_bot("Attendance"))
+        shared = patch("Utils.AttendanceDB.get_shared_db",
+                       return_value=AsyncDBWriter(AttendanceDBWriter, ":memory:"))
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    @async_test
+    async def tearDown(self):
+        await self.cog.db.close()
+
+    @async_test
+    async def test_kick_members(self):
+        """Check that each person's roles are replaced in one edit
+        and that they're all unregistered."""
+        guild = FakeGuild()
+        everyone = FakeRole(1, default=True)
+        extra = FakeRole(2)
+        astartes = guild.get_role(545807109774770187)
+        people = [FakeMember(f"member{i}", guild, [everyone, astartes, extra]) for i in range(10)]
+        await self.cog.db.add_members([f"member{i}" for i in range(12)])
+
+        self.assertEqual(await self.cog.kick_members(people), ([], []))
+        for person in people:
+            self.assertEqual(person.requests, ["edit", "send"])
+            self.assertEqual([role.id for role in person.roles],
+                             [2, Attendance.GUARDSMAN_ROLE_ID])
+        self.assertEqual([row[1] for row in await self.cog.db.get_all_members()],
+                         ["member10", "member11"])
+
+    @async_test
+    async def test_kick_failures(self):
+        """Check that people whose roles can't be changed stay registered
+        and that everyone that can't be DMed is pinged."""
+        guild = FakeGuild()
+        astartes = guild.get_role(545807109774770187)
+        people = [
+            FakeMember("kicked", guild, [astartes]),
+            FakeMember("hierarchy", guild, [astartes], edit_error=http_error(Forbidden, 403)),
+            FakeMember("outage", guild, [astartes], edit_error=http_error()),
+            FakeMember("private", guild, [astartes], send_error=http_error(Forbidden, 403)),
+            FakeMember("flaky", guild, [astartes], send_error=http_error()),
+        ]
+        await self.cog.db.add_members([person.display_name for person in people])
+        self.addCleanup(setattr, common, "bot_channel", common.bot_channel)
+        common.bot_channel = FakeChannel()
+
+        not_dmed, not_kicked = await self.cog.kick_members(people)
+        self.assertEqual([person.display_name for person in not_dmed], ["private", "flaky"])
+        self.assertEqual([person.display_name for person in not_kicked], ["hierarchy", "outage"])
+        # nobody is DMed if their roles weren't changed
+        self.assertEqual(people[1].requests, ["edit"])
+        self.assertEqual(common.bot_channel.sent,
+                         [Attendance.KICK_MESSAGE + " @private @flaky"])
+        self.assertEqual([row[1] for row in await self.cog.db.get_all_members()],
+                         ["hierarchy", "outage"])
+
+
+class test_kick_suggestion_menu(unittest.TestCase):
+    @async_test
+    async def test_finished(self):
+        """Check that the menu's reactions are removed once everyone has been skipped."""
+        bound = {}
+        handler = SimpleNamespace(bind=lambda menu: bound.update({menu.msg.id: menu}),
+                                  unbind=lambda menu: bound.pop(menu.msg.id))
+        bot = SimpleNamespace(get_cog=lambda name: handler if name == "ReactMenuHandler" else None,
+                              get_emoji=lambda id: id, user=SimpleNamespace(id=0))
+        channel = FakeMenuChannel()
+        menu = KickSuggestionMenu([("member", 0, "Kick", False, "01.01")],
+                                  SimpleNamespace(bot=bot, channel=channel), "0%", "100%")
+        await menu.wait_until_ready(reactions=True)
+        self.assertEqual(len(channel.msg.added), 4)
+
+        await menu.skip(menu)
+        self.assertEqual((channel.msg.added, bound), ([], {}))
+
 
 if __name__ == '__main__':
     unittest.main()
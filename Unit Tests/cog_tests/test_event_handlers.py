@@ -1,4 +1,42 @@
 import unittest
+from types import SimpleNamespace
+import datetime as D
+from Cogs.event_handler_modules.react_menu_handling import ReactMenuHandler
+from testils import create_bot, async_test
+
+
+class FakeMessage:
+    """Records the reactions removed from it."""
+
+    def __init__(self, id: int = 10, created_at: D.datetime = None):
+        self.id = id
+        self.created_at = created_at or D.datetime.utcnow()
+        self.edited_at = None
+        self.removed = []
+
+    async def remove_reaction(self, emoji, member):
+        self.removed.append((emoji.id, member.id))
+
+
+class FakeMenu:
+    def __init__(self, msg: FakeMessage = None):
+        self.msg = msg or FakeMessage()
+        self.emotes = {1: "on_next", 2: "on_select"}
+        self._starting = False
+        self.calls = []
+
+    @staticmethod
+    async def on_next(self):
+        self.calls.append("on_next")
+
+    @staticmethod
+    def on_select(self):
+        self.calls.append("on_select")
+
+
+def payload(message_id: int, emoji_id: int, user_id: int = 100) -> SimpleNamespace:
+    return SimpleNamespace(message_id=message_id, user_id=user_id,
+                           emoji=SimpleNamespace(id=emoji_id))
 
 
 class Test_test_event_handlers(unittest.TestCase):
@@ -6,5 +44,55 @@ class Test_test_event_handlers(unittest.TestCase):
         pass
 
 
+class test_react_menu_handler(unittest.TestCase):
+    def setUp(self):
+        bot = create_bot("ReactMenuHandler")
+        bot._connection.user = SimpleNamespace(id=1)
+        self.handler = ReactMenuHandler(bot)
+        self.menu = FakeMenu()
+        self.handler.bind(self.menu)
+
+    def tearDown(self):
+        self.handler.message_cleanup.cancel()
+
+    @async_test
+    async def test_routing(self):
+        """Check that each click calls its callback and only removes that reaction."""
+        await self.handler.on_raw_reaction_add(payload(10, 1))
+        await self.handler.on_raw_reaction_add(payload(10, 2))
+        self.assertEqual(self.menu.calls, ["on_next", "on_select"])
+        self.assertEqual(self.menu.msg.removed, [(1, 100), (2, 100)])
+
+        # other emojis are removed without calling anything, other messages are ignored
+        await self.handler.on_raw_reaction_add(payload(10, None))
+        await self.handler.on_raw_reaction_add(payload(11, 1))
+        self.assertEqual(len(self.menu.calls), 2)
+        self.assertEqual(self.menu.msg.removed[-1], (None, 100))
+
+    @async_test
+    async def test_unbind(self):
+        """Check that unbound menus and the bot's own reactions are ignored."""
+        await self.handler.on_raw_reaction_add(payload(10, 1, user_id=1))
+        self.handler.unbind(self.menu)
+        await self.handler.on_raw_reaction_add(payload(10, 1))
+        self.assertEqual((self.menu.calls, self.menu.msg.removed), ([], []))
+        self.assertEqual(self.handler.routes, {})
+
+    @async_test
+    async def test_cleanup(self):
+        """Check that menus that haven't been used for 10 minutes are unbound."""
+        old = FakeMenu(FakeMessage(11, D.datetime.utcnow() - D.timedelta(days=1, minutes=5)))
+        self.handler.bind(old)
+        await self.handler.message_cleanup()
+        self.assertEqual(list(self.handler.bound_messages), [10])
+        self.assertEqual(set(self.handler.routes), {(10, 1), (10, 2)})
+
+        # editing the message counts as using it
+        self.menu.msg.created_at -= D.timedelta(minutes=20)
+        self.menu.msg.edited_at = D.datetime.utcnow()
+        await self.handler.message_cleanup()
+        self.assertEqual(list(self.handler.bound_messages), [10])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,8 @@
 import discord
 from typing import *
 from discord.ext import commands
+from functools import wraps
+import asyncio
 
 
 def create_bot(cog_name: str) -> commands.Bot:
@@ -14,3 +16,11 @@ def create_bot(cog_name: str) -> commands.Bot:
                         allowed_mentions=discord.AllowedMentions(everyone=False,
                                                                  roles=False),
                         )
+
+
+def async_test(f):
+    """Block until the async test finishes."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        return asyncio.get_event_loop().run_until_complete(f(*args, **kwargs))
+    return wrapper
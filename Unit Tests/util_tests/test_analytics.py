@@ -0,0 +1,74 @@
+import unittest
+import datetime as D
+import numpy as np
+from Utils.AttendanceDB import AttendanceDBWriter, day_number
+from Utils.analytics import AttendanceMatrix, month_start
+
+# Monday 6th January 2020
+MONDAY = D.date(2020, 1, 6).toordinal()
+
+
+class test_matrix(unittest.TestCase):
+    def setUp(self):
+        joined = D.date(2019, 1, 1)
+        members = [(1, "one", False, joined), (2, "two", True, joined)]
+        # a roll call every day for 6 weeks
+        days = [(MONDAY + i, "AIR" if i % 2 else "INFANTRY") for i in range(42)]
+        # one attends every day, two attends every other day
+        attendees = [(member_id, day, member_id == 1 or (day - MONDAY) % 2 == 0)
+                     for day, _ in days for member_id in (1, 2)]
+        self.matrix = AttendanceMatrix(members, days, attendees)
+
+    def test_per_member(self):
+        """Check the ratios of each member and that a range with no roll calls is NaN."""
+        np.testing.assert_allclose(self.matrix.per_member(), [1.0, 0.5])
+        self.assertTrue(np.isnan(self.matrix.per_member(0, 1)).all())
+
+    def test_per_event_type(self):
+        """Check that the columns are grouped by their event type."""
+        self.assertEqual(self.matrix.per_event_type(), {"AIR": 0.5, "INFANTRY": 1.0})
+
+    def test_per_week(self):
+        """Check that the weeks start on a Monday."""
+        mondays, week_ratios = self.matrix.per_week(MONDAY + 3)
+        self.assertEqual(list(mondays), [MONDAY + 7 * i for i in range(6)])
+        self.assertEqual(len(week_ratios), 6)
+
+    def test_rolling(self):
+        """Check that rolling only uses the months it was asked for."""
+        day = MONDAY + 41
+        self.assertEqual(month_start(day), D.date(2020, 2, 1).toordinal())
+        self.assertEqual(month_start(day, 2), D.date(2019, 12, 1).toordinal())
+        np.testing.assert_allclose(self.matrix.rolling(1, day),
+                                   self.matrix.per_member(month_start(day), month_start(day, -1)))
+
+
+class test_backends(unittest.TestCase):
+    def setUp(self):
+        self.writer = AttendanceDBWriter(":memory:")
+        self.writer.add_members([f"member{i}" for i in range(20)])
+        self.writer.new_day("AIR")
+        self.writer.record_att([f"member{i}" for i in range(0, 20, 3)])
+
+    def tearDown(self):
+        self.writer.connection.close()
+
+    def test_reports(self):
+        """Check that both backends produce the same reports."""
+        for method in ("get_att_per_member", "get_att_per_event", "suggest_kicks"):
+            self.assertEqual(getattr(self.writer, method)(backend="numpy"),
+                             getattr(self.writer, method)(backend="sql"), method)
+        with self.assertRaises(ValueError):
+            self.writer.get_att_per_member(backend="pandas")
+
+    def test_reload(self):
+        """Check that the matrix is kept until the DB is written to."""
+        matrix = self.writer.get_attendance_matrix()
+        self.assertIs(matrix, self.writer.get_attendance_matrix())
+        self.writer.add_member("new")
+        self.assertIsNot(matrix, self.writer.get_attendance_matrix())
+        self.assertIn("new", self.writer.get_attendance_matrix().names)
+
+
+if __name__ == '__main__':
+    unittest.main()
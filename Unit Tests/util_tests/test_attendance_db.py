@@ -1,9 +1,366 @@
 import unittest
+import sqlite3 as sql
+import threading
+import asyncio
+import datetime as D
+import tempfile
+import shutil
+from Utils.AttendanceDB import AttendanceDBWriter, day_number, get_shared_db, close_shared_db
+from BenUtils.db import AsyncDBWriter, DBWriter
+from testils import async_test
 
 
-class Test_test_attendance_db(unittest.TestCase):
-    def test_A(self):
-        pass
+class test_async_db(unittest.TestCase):
+    def setUp(self):
+        self.db = AsyncDBWriter(AttendanceDBWriter, ":memory:")
+
+    @async_test
+    async def tearDown(self):
+        await self.db.close()
+
+    @async_test
+    async def test_queries(self):
+        """Check that methods of the wrapped class can be awaited."""
+        await self.db.add_member("test")
+        rows = await self.db.get_all_members()
+        self.assertEqual([row[1] for row in rows], ["test"])
+
+    @async_test
+    async def test_runs_off_loop(self):
+        """Check that the queries are executed on the writer thread."""
+        thread = await self.db.run(lambda writer: threading.current_thread())
+        self.assertIsNot(thread, threading.current_thread())
+        # every job should use the same thread
+        self.assertIs(thread, await self.db.run(lambda writer: threading.current_thread()))
+
+    @async_test
+    async def test_order(self):
+        """Check that concurrent calls are executed in the order they were made."""
+        names = [f"member{i}" for i in range(50)]
+        await asyncio.gather(*[self.db.add_member(name) for name in names])
+        self.assertEqual([row[1] for row in await self.db.get_all_members()], names)
+
+    @async_test
+    async def test_errors(self):
+        """Check that errors are raised in the awaiting coroutine."""
+        with self.assertRaises(sql.OperationalError):
+            await self.db.doQuery("SELECT * FROM NotATable;")
+        # the writer should still work afterwards
+        self.assertEqual(await self.db.doQuery("SELECT 1;"), [(1,)])
+
+    @async_test
+    async def test_close(self):
+        """Check that calls are rejected while closing and restart the writer afterwards."""
+        await self.db.add_member("test")
+        closing = asyncio.ensure_future(self.db.close())
+        await asyncio.sleep(0)
+        with self.assertRaises(RuntimeError):
+            await self.db.get_all_members()
+        await closing
+
+        # a new connection to a new in-memory database
+        self.assertEqual(await self.db.get_all_members(), [])
+
+    @async_test
+    async def test_shared_db(self):
+        """Check that every caller gets the same service until it's closed."""
+        shared = get_shared_db()
+        self.assertIs(shared, get_shared_db())
+        await close_shared_db()
+        self.assertIsNot(shared, get_shared_db())
+        await close_shared_db()
+
+
+class test_transactions(unittest.TestCase):
+    def setUp(self):
+        self.writer = AttendanceDBWriter(":memory:")
+
+    def tearDown(self):
+        self.writer.connection.close()
+
+    def count_members(self) -> int:
+        return self.writer.doQuery("SELECT COUNT(*) FROM Members;")[0][0]
+
+    def test_commit(self):
+        """Check that the writes in a transaction are committed together."""
+        with self.writer.transaction():
+            self.writer.add_member("one")
+            self.writer.add_member("two")
+            # nothing should be committed until the block ends
+            self.assertTrue(self.writer.connection.in_transaction)
+        self.assertFalse(self.writer.connection.in_transaction)
+        self.assertEqual(self.count_members(), 2)
+
+    def test_rollback(self):
+        """Check that an exception rolls back the whole transaction, including nested blocks."""
+        with self.assertRaises(ValueError):
+            with self.writer.transaction():
+                self.writer.add_member("one")
+                with self.writer.transaction():
+                    self.writer.add_member("two")
+                raise ValueError()
+        self.assertEqual(self.count_members(), 0)
+
+    def test_savepoint(self):
+        """Check that a caught exception only rolls back its own nested block."""
+        with self.writer.transaction():
+            self.writer.add_member("one")
+            with self.assertRaises(ValueError):
+                with self.writer.transaction():
+                    self.writer.add_member("two")
+                    raise ValueError()
+            with self.writer.transaction():
+                self.writer.add_member("three")
+            self.assertTrue(self.writer.connection.in_transaction)
+        self.assertEqual([row[1] for row in self.writer.get_all_members()], ["one", "three"])
+
+    def test_batches(self):
+        """Check the batched write methods."""
+        self.writer.add_members(["one", "two", "three"])
+        self.writer.delete_members(["one", "three"])
+        self.assertEqual([row[1] for row in self.writer.get_all_members()], ["two"])
+        results = self.writer.executeBatch([
+            ("INSERT INTO Members(name) VALUES(?);", ["four"]),
+            ("SELECT name FROM Members WHERE name = ?;", ["four"]),
+        ])
+        self.assertEqual(results, [[], [("four",)]])
+
+    def test_new_day(self):
+        """Check that a repeated day is ignored."""
+        self.writer.new_day("AIR")
+        self.writer.new_day("AIR")
+        self.assertEqual(self.writer.doQuery("SELECT COUNT(*) FROM Days;")[0][0], 1)
+        self.assertFalse(self.writer.connection.in_transaction)
+
+    def test_deferred(self):
+        """Check that deferred writes are only committed when flushed or when too many build up."""
+        writer = AttendanceDBWriter(":memory:", deferCommits=True, maxPending=3)
+        writer.add_member("one")
+        writer.add_member("two")
+        self.assertTrue(writer.connection.in_transaction)
+        writer.flush()
+        self.assertFalse(writer.connection.in_transaction)
+
+        # hit the cap
+        for name in ("three", "four", "five"):
+            writer.add_member(name)
+        self.assertFalse(writer.connection.in_transaction)
+        writer.connection.close()
+
+    @async_test
+    async def test_group_commit(self):
+        """Check that the async writer commits deferred writes once its queue is empty."""
+        db = AsyncDBWriter(AttendanceDBWriter, ":memory:", deferCommits=True)
+        await asyncio.gather(*[db.add_member(str(i)) for i in range(20)])
+        self.assertFalse(await db.run(lambda writer: writer.connection.in_transaction))
+        await db.close()
+
+
+class test_roster(unittest.TestCase):
+    def setUp(self):
+        self.writer = AttendanceDBWriter(":memory:")
+        self.writer.add_members(["one", "two", "three"])
+
+    def tearDown(self):
+        self.writer.connection.close()
+
+    def test_lookups(self):
+        """Check that the cached lookups match the Members table."""
+        self.assertEqual(self.writer.count_members(), 3)
+        self.assertEqual(self.writer.get_member_by_name("two")[0], 2)
+        self.assertEqual(self.writer.get_member_by_id(3)[1], "three")
+        self.assertEqual(self.writer.get_join_date_by_id(1),
+                         D.date.fromordinal(day_number()))
+        self.assertIsNone(self.writer.get_member_by_name("four"))
+
+        # repeated lookups shouldn't query the DB
+        with self.writer.recordQueries() as statements:
+            self.writer.get_all_members()
+            self.writer.get_member_by_name("one")
+        self.assertEqual(statements, [])
+
+    def test_invalidation(self):
+        """Check that writes to Members are seen by the next lookup."""
+        self.writer.get_all_members()
+        self.writer.add_member("four")
+        self.assertEqual(self.writer.count_members(), 4)
+        self.writer.mark_away("one")
+        self.assertTrue(self.writer.get_member_by_name("one")[2])
+        self.writer.unmark_away("one")
+        self.assertFalse(self.writer.get_member_by_name("one")[2])
+        self.writer.delete_member_by_id(4)
+        self.writer.delete_members(["two"])
+        self.writer.delete_member("three")
+        self.assertEqual([row[1] for row in self.writer.get_all_members()], ["one"])
+
+    def test_name_index(self):
+        """Check that the fuzzy name index follows the roster."""
+        self.assertTrue(self.writer.is_registered("[DTWM] One"))
+        self.assertFalse(self.writer.is_registered("four"))
+        self.writer.add_member("four")
+        self.writer.delete_member("one")
+        self.assertTrue(self.writer.is_registered("four"))
+        self.assertFalse(self.writer.is_registered("one"))
+        self.assertEqual(self.writer.match_members(["tw0", "xyz"]), [("two", 67), None])
+
+    def test_rollback(self):
+        """Check that rows read inside a rolled back transaction aren't kept."""
+        with self.assertRaises(ValueError):
+            with self.writer.transaction():
+                self.writer.add_member("four")
+                self.assertIsNotNone(self.writer.get_member_by_name("four"))
+                raise ValueError()
+        self.assertIsNone(self.writer.get_member_by_name("four"))
+        self.assertEqual(self.writer.count_members(), 3)
+
+
+class test_schema(unittest.TestCase):
+    def setUp(self):
+        self.writer = AttendanceDBWriter(":memory:")
+        self.writer.add_members([f"member{i}" for i in range(30)])
+        self.writer.new_day("AIR")
+        self.writer.record_att(["member1", "member2"])
+
+    def tearDown(self):
+        self.writer.connection.close()
+
+    def test_integrity(self):
+        """Check the startup and full integrity checks."""
+        self.assertEqual(self.writer.checkIntegrity(), [])
+        self.assertEqual(self.writer.checkIntegrity(quick=True), [])
+        # the check can be skipped at startup
+        writer = AttendanceDBWriter(":memory:", integrityCheck=None)
+        self.assertEqual(writer.count_members(), 0)
+        writer.connection.close()
+
+    def test_migrations(self):
+        """Check that every migration is recorded and that re-running them does nothing."""
+        version = self.writer.doQuery("SELECT MAX(version) FROM schema_version;")[0][0]
+        self.assertEqual(self.writer.migrate("./Text Files/AttDBMigrations"), version)
+        self.assertEqual(self.writer.doQuery("SELECT COUNT(*) FROM schema_version;")[0][0],
+                         version)
+
+    def test_integer_dates(self):
+        """Check that the text dates from before migration 3 are converted to day numbers."""
+        writer = DBWriter(":memory:")
+        # build the schema as it was at version 2
+        with tempfile.TemporaryDirectory() as old_migrations:
+            for file_name in ("001_create_tables.sql", "002_add_indexes.sql"):
+                shutil.copy(f"./Text Files/AttDBMigrations/{file_name}", old_migrations)
+            self.assertEqual(writer.migrate(old_migrations), 2)
+        writer.executeBatch([
+            ("INSERT INTO Members(name, joinedAt) VALUES('old', '2020-02-29');", ()),
+            ("INSERT INTO Days(date, eventType) VALUES('2020-03-01', 'AIR');", ()),
+            ("INSERT INTO Attendees(date, memberID, attended) VALUES('2020-03-01', 1, 1);", ()),
+        ])
+
+        writer.migrate("./Text Files/AttDBMigrations/")
+        expected = day_number(D.date(2020, 3, 1))
+        self.assertEqual(writer.doQuery("SELECT joinedAt FROM Members;"),
+                         [(day_number(D.date(2020, 2, 29)),)])
+        self.assertEqual(writer.doQuery("SELECT date FROM Days;"), [(expected,)])
+        self.assertEqual(writer.doQuery("SELECT date, memberID, attended FROM Attendees;"),
+                         [(expected, 1, 1)])
+        # the foreign keys should still work
+        writer.doQuery("DELETE FROM Members;")
+        self.assertEqual(writer.doQuery("SELECT COUNT(*) FROM Attendees;"), [(0,)])
+        writer.connection.close()
+
+    def test_monthly_totals(self):
+        """Check that the monthly totals match the raw roll calls after every roll call."""
+        def raw_totals():
+            return self.writer.doQuery("""SELECT memberID, eventType, SUM(attended), COUNT(*)
+                FROM Attendees, Days WHERE Attendees.date = Days.date
+                GROUP BY memberID, eventType ORDER BY memberID, eventType;""")
+
+        def totals():
+            return self.writer.doQuery("""SELECT memberID, eventType, attended, total
+                FROM MonthlyAttendance ORDER BY memberID, eventType;""")
+
+        # a second roll call on the same day
+        self.writer.record_att(["member1", "member3"])
+        self.assertEqual(totals(), raw_totals())
+        # roll calls that were added by hand are picked up by a rebuild
+        self.writer.doQuery("UPDATE Attendees SET attended = 1 WHERE memberID = 5;")
+        self.assertNotEqual(totals(), raw_totals())
+        self.writer.rebuild_monthly_attendance()
+        self.assertEqual(totals(), raw_totals())
+
+        # the reports should match the raw averages
+        self.assertEqual(self.writer.get_member_att("member1"), "100%")
+        self.assertEqual(self.writer.get_member_att("member3"), "50%")
+        self.assertIsNone(self.writer.get_member_att("member7"))
+        # 6 of the 60 rows were attended
+        self.assertEqual(self.writer.get_att_per_event()[0], ("AIR", 10))
+
+    def test_record_att(self):
+        """Check that a roll call gives every member a row and reports unknown names."""
+        unknown = self.writer.record_att(["member3", "member4", "member4", "stranger"])
+        self.assertEqual(unknown, ["stranger"])
+        attended = self.writer.doQuery("""SELECT name FROM Attendees, Members
+            WHERE Attendees.memberID = Members.memberID AND attended = 1
+                AND Attendees.rowid > 30 ORDER BY name;""")
+        self.assertEqual(attended, [("member3",), ("member4",)])
+        self.assertEqual(self.writer.doQuery("SELECT COUNT(*) FROM Attendees;")[0][0], 60)
+
+        # nothing should be written without members
+        self.writer.doQuery("DELETE FROM Members;")
+        with self.assertRaises(ValueError):
+            self.writer.record_att(["member1"])
+        self.assertEqual(self.writer.doQuery("SELECT COUNT(*) FROM Attendees;")[0][0], 0)
+
+    def test_minutes(self):
+        """Check that the minutes of each attendee are recorded."""
+        self.writer.record_att(["member3", "member4"], {"member3": 85})
+        rows = self.writer.doQuery("""SELECT name, attended, minutes FROM Attendees, Members
+            WHERE Attendees.memberID = Members.memberID AND Attendees.rowid > 30
+                AND name IN ('member3', 'member4', 'member5') ORDER BY name;""")
+        self.assertEqual(rows, [("member3", 1, 85), ("member4", 1, 0), ("member5", 0, 0)])
+
+    def test_query_plans(self):
+        """Check that none of the queries in AttendanceDBWriter do a full table scan."""
+        calls = {
+            "new_day": ("INFANTRY",),
+            "create_tables": (),
+            "add_member": ("new",),
+            "add_members": (["new2", "new3"],),
+            "get_member_by_name": ("member1",),
+            "get_member_by_id": (1,),
+            "is_registered": ("member1",),
+            "match_members": (["member1", "membr2"],),
+            "delete_member": ("new",),
+            "delete_members": (["new2"],),
+            "rename_members": ([("new3", "renamed")],),
+            "delete_member_by_id": (4,),
+            "record_att": (["member1"],),
+            "rebuild_monthly_attendance": (),
+            "get_join_date_by_name": ("member1",),
+            "get_join_date_by_id": (1,),
+            "get_att_per_member": (),
+            "get_att_per_event": (),
+            "get_member_att": ("member1",),
+            "get_all_members": (),
+            "count_members": (),
+            "get_attendance_matrix": (),
+            "mark_away": ("member2",),
+            "unmark_away": ("member2",),
+            "suggest_kicks": (),
+        }
+        # make sure that new methods get checked too
+        own_methods = {name for name, attr in vars(AttendanceDBWriter).items()
+                       if callable(attr) and not name.startswith("_")}
+        self.assertEqual(own_methods - set(calls), set(),
+                         "Add the new methods to this test")
+
+        with self.writer.recordQueries() as statements:
+            for name, args in calls.items():
+                # some methods fail on duplicate data, but their queries still ran
+                try:
+                    getattr(self.writer, name)(*args)
+                except (sql.IntegrityError, ValueError):
+                    pass
+
+        self.assertEqual(self.writer.findFullScans(statements), [])
 
 
 if __name__ == '__main__':
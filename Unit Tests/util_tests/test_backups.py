@@ -0,0 +1,86 @@
+import unittest
+import sqlite3 as sql
+import tempfile
+import shutil
+import os
+from Utils.AttendanceDB import AttendanceDBWriter
+from Utils import backups
+
+
+class test_backups(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.manager = backups.BackupManager(self.folder, full_every=3, keep_fulls=1)
+        self.writer = AttendanceDBWriter(":memory:")
+        self.writer.add_members([f"member{i}" for i in range(50)])
+
+    def tearDown(self):
+        self.writer.connection.close()
+        shutil.rmtree(self.folder)
+
+    def backup(self) -> str:
+        return self.manager.store(self.manager.snapshot(self.writer))
+
+    def restored_members(self, **kwargs) -> list:
+        path = os.path.join(self.folder, "restored.db")
+        backups.restore(self.folder, path, **kwargs)
+        connection = sql.connect(path)
+        try:
+            return [row[0] for row in connection.execute("SELECT name FROM Members ORDER BY memberID;")]
+        finally:
+            connection.close()
+
+    def test_deltas(self):
+        """Check that only the changes are stored after the first backup."""
+        full = self.backup()
+        self.assertTrue(full.endswith(".full.z"))
+        # nothing changed
+        self.assertIsNone(self.backup())
+
+        self.writer.add_member("new")
+        delta = self.backup()
+        self.assertTrue(delta.endswith(".delta.z"))
+        self.assertLess(os.path.getsize(delta), os.path.getsize(full))
+        self.assertEqual(self.restored_members()[-1], "new")
+
+    def test_restore_point(self):
+        """Check that the chain can be restored up to an earlier backup."""
+        self.backup()
+        self.writer.add_member("new")
+        self.backup()
+        self.assertNotIn("new", self.restored_members(until=1))
+        self.assertIn("new", self.restored_members(until=2))
+
+    def test_rotation(self):
+        """Check that a full backup is taken every full_every backups
+        and that the older chains are removed."""
+        for i in range(5):
+            self.writer.add_member(f"new{i}")
+            self.backup()
+        kinds = [kind for _, kind, _ in backups.list_backups(self.folder)]
+        # the first chain was rotated out
+        self.assertEqual(kinds, ["full", "delta"])
+        self.assertEqual(self.restored_members()[-1], "new4")
+
+    def test_failed_upload(self):
+        """Check that a discarded backup doesn't leave a gap in the chain."""
+        self.backup()
+        self.writer.add_member("lost")
+        self.manager.discard(self.manager.prepare(self.manager.snapshot(self.writer)))
+        self.writer.add_member("new")
+        delta = self.manager.prepare(self.manager.snapshot(self.writer))
+        self.manager.commit(delta)
+
+        self.assertEqual([seq for seq, _, _ in backups.list_backups(self.folder)], [1, 2])
+        self.assertEqual(self.restored_members()[-2:], ["lost", "new"])
+
+    def test_bad_delta(self):
+        """Check that a delta isn't applied to the wrong snapshot."""
+        delta = backups.create_delta(b"a" * 8, b"b" * 8, 4)
+        self.assertEqual(backups.apply_delta(b"a" * 8, delta), b"b" * 8)
+        with self.assertRaises(ValueError):
+            backups.apply_delta(b"c" * 8, delta)
+
+
+if __name__ == '__main__':
+    unittest.main()
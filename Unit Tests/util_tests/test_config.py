@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import shutil
+import os
+from Utils import config
+
+
+class test_config(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.store = config.ConfigStore(self.folder)
+        self.store.register("lines.txt", config.parse_lines)
+        self.store.register("data.json", config.parse_json)
+        self.write("lines.txt", "a\r\nb\n\n")
+        self.write("data.json", '{"x": [1, 2]}')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, file_name: str, contents: str, mtime_ns: int = None):
+        path = os.path.join(self.folder, file_name)
+        with open(path, "w", newline="") as f:
+            f.write(contents)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_snapshots(self):
+        """Check that files are parsed into read-only types."""
+        self.assertEqual(self.store.get("lines.txt"), ("a", "b"))
+        data = self.store.get("data.json")
+        self.assertEqual(data["x"], (1, 2))
+        with self.assertRaises(TypeError):
+            data["y"] = 3
+
+    def test_refresh(self):
+        """Check that files are only reloaded after they change."""
+        calls = []
+        self.store.on_reload("lines.txt", lambda: calls.append(True))
+        first = self.store.get("lines.txt")
+        self.assertEqual(self.store.refresh(), [])
+        self.assertIs(self.store.get("lines.txt"), first)
+
+        mtime = os.stat(os.path.join(self.folder, "lines.txt")).st_mtime_ns
+        self.write("lines.txt", "c", mtime_ns=mtime + 10 ** 9)
+        self.assertEqual(self.store.refresh(), ["lines.txt"])
+        self.assertEqual(self.store.get("lines.txt"), ("c",))
+        self.assertEqual(calls, [True])
+
+    def test_bad_edit(self):
+        """Check that a file that fails to parse keeps its last snapshot."""
+        self.store.get("data.json")
+        self.write("data.json", "{", mtime_ns=10 ** 9)
+        self.assertEqual(self.store.refresh(), [])
+        self.assertEqual(self.store.get("data.json")["x"], (1, 2))
+
+    def test_bot_files(self):
+        """Check that the bot's own files parse."""
+        self.assertTrue(all(isinstance(id, int) for id in config.channel_ids()))
+        self.assertIn("playing", config.statuses())
+        self.assertTrue(config.delimiters())
+        self.assertTrue(config.responses())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,10 @@
 import unittest
+from random import Random
+from fuzzywuzzy import process
+from types import SimpleNamespace
+from unittest.mock import patch
+from Utils import memtils
+from Utils.memtils import NameParser, reload_delimiters, _parse, MemberNameIndex, RoleIndex, OutfitRoster
 
 
 class Test_test_memtils(unittest.TestCase):
@@ -6,5 +12,147 @@ class Test_test_memtils(unittest.TestCase):
         pass
 
 
+class test_name_parser(unittest.TestCase):
+    def test_parsed(self):
+        """Check each of the settings."""
+        self.assertEqual(NameParser("[DTWM] benmitchellmtbV5 - Tech Priest").parsed,
+                         "benmitchellmtbV5")
+        self.assertEqual(NameParser("Zoë: (leader)", case=True).parsed, "ZOE")
+        self.assertEqual(NameParser("Zoë", remove_weird_chars=True).parsed, "Zo")
+        self.assertEqual(NameParser("v5 name2", check_numbers=True).parsed, "vname")
+        self.assertEqual(NameParser("[TAG] a-b", check_tag=False, check_titles=False,
+                                    check_english=False).parsed, "[TAG] a-b")
+
+    def test_parse_many(self):
+        """Check that parse_many matches parsing the names one by one."""
+        names = ["[DTWM] one", "two, the second", "Zoë", "[DTWM] one"]
+        self.assertEqual(NameParser.parse_many(names, case=False),
+                         [NameParser(name, case=False).parsed for name in names])
+
+    def test_no_delimiters(self):
+        """Check that names are left alone when delimiters.txt is empty."""
+        self.addCleanup(reload_delimiters)
+        for delimiters in ((), ("",)):
+            with patch("Utils.config.delimiters", return_value=delimiters):
+                reload_delimiters()
+                self.assertEqual(NameParser("name, the title").parsed, "namethetitle")
+
+    def test_memo(self):
+        """Check that repeated names are served from the memo."""
+        reload_delimiters()
+        NameParser.parse_many(["repeat"] * 10)
+        info = _parse.cache_info()
+        self.assertEqual((info.hits, info.misses), (9, 1))
+
+
+class test_member_name_index(unittest.TestCase):
+    def setUp(self):
+        rng = Random(0)
+        letters = "abcdefghijklmnopqrstuvwxyz0123456789"
+        self.names = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 14)))
+                      for _ in range(300)]
+        self.index = MemberNameIndex(self.names)
+
+    def test_exact(self):
+        """Check that names are matched regardless of case and symbols."""
+        self.assertEqual(self.index.best_match(self.names[0].upper() + "!"),
+                         (self.names[0], 100))
+        self.assertIsNone(MemberNameIndex().best_match("anyone"))
+
+    def test_matches_extract_one(self):
+        """Check that the pruned search finds the same scores as process.extractOne for typos."""
+        queries = [name[:-1] + "x" for name in self.names[:50]]
+        for query, match in zip(queries, self.index.match_many(queries)):
+            self.assertEqual(match[1], process.extractOne(query, self.names)[1], query)
+
+    def test_incremental(self):
+        """Check adding, removing, and syncing names."""
+        self.index.remove(self.names[0])
+        self.assertNotIn(self.names[0], self.index)
+        with self.assertRaises(KeyError):
+            self.index.remove(self.names[0])
+
+        added, removed = self.index.sync(self.names[1:3] + ["new"])
+        self.assertEqual((added, len(removed)), (["new"], len(self.names) - 3))
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.missing(["new", "zzzzzzzzzz"]), ["zzzzzzzzzz"])
+
+
+
+class test_role_index(unittest.TestCase):
+    def setUp(self):
+        self.astartes = SimpleNamespace(id=1, name="Astartes")
+        self.champion = SimpleNamespace(id=2, name="Champion")
+        self.brother = SimpleNamespace(id=3, name="Battle Brother")
+        self.members = [SimpleNamespace(id=10, roles=[self.astartes]),
+                        SimpleNamespace(id=11, roles=[self.astartes, self.brother]),
+                        SimpleNamespace(id=12, roles=[self.champion])]
+        self.index = RoleIndex()
+        self.index.build(SimpleNamespace(roles=[self.astartes, self.champion, self.brother],
+                                         members=self.members))
+
+    def test_checks(self):
+        """Check that role names aren't case-sensitive and that excluded roles are left out."""
+        self.assertTrue(self.index.has_any(self.members[2], "champion"))
+        self.assertFalse(self.index.has_any(self.members[0], ("Champion", "Chaplain")))
+        self.assertEqual(self.index.member_ids(("Astartes", "Champion"), ("Battle Brother",)),
+                         [10, 12])
+
+    def test_updates(self):
+        """Check that role and member changes are reflected."""
+        self.members[0].roles = [self.champion]
+        self.index.update_member(self.members[0])
+        self.index.remove_member(12)
+        self.assertEqual(self.index.member_ids(["Champion"]), [10])
+
+        renamed = SimpleNamespace(id=2, name="Chaplain")
+        self.index.rename_role(self.champion, renamed)
+        self.assertEqual(self.index.member_ids(["Champion"]), [])
+        self.assertEqual(self.index.member_ids(["Chaplain"]), [10])
+
+        # not indexed, so it's worked out from its roles
+        self.assertTrue(self.index.has_any(SimpleNamespace(id=99, roles=[renamed]), "chaplain"))
+        self.assertNotIn(99, self.index.masks)
+
+
+
+class test_outfit_roster(unittest.TestCase):
+    def setUp(self):
+        self.astartes = SimpleNamespace(id=1, name="Astartes")
+        self.brother = SimpleNamespace(id=2, name="Battle Brother")
+        self.members = [SimpleNamespace(id=10, display_name="[DTWM] one", roles=[self.astartes]),
+                        SimpleNamespace(id=11, display_name="two", roles=[self.astartes, self.brother]),
+                        SimpleNamespace(id=12, display_name="guest", roles=[])]
+        guild = SimpleNamespace(roles=[self.astartes, self.brother], members=self.members)
+        # the roster decides membership with the module's role index
+        patcher = patch.object(memtils, "roles", RoleIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        memtils.roles.build(guild)
+        self.roster = OutfitRoster()
+        self.roster.build(guild)
+
+    def test_build(self):
+        """Check that only outfit members are in the roster."""
+        self.assertEqual(self.roster.parsed_names(), ["one"])
+        self.assertIn(self.members[0], self.roster)
+        self.assertNotIn(self.members[1], self.roster)
+        self.assertIs(self.roster.get_by_name("one"), self.members[0])
+
+    def test_updates(self):
+        """Check joining, renaming, and leaving the outfit."""
+        self.members[2].roles = [self.astartes]
+        memtils.roles.update_member(self.members[2])
+        self.assertTrue(self.roster.update(self.members[2]))
+
+        self.members[0].display_name = "uno"
+        self.roster.update(self.members[0])
+        self.assertIsNone(self.roster.get_by_name("one"))
+        self.assertEqual(sorted(self.roster.parsed_names()), ["guest", "uno"])
+
+        self.roster.remove(12)
+        self.assertEqual(len(self.roster), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
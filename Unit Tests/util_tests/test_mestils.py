@@ -1,6 +1,8 @@
 import unittest
 from Utils import mestils
-from time import time
+from time import time, monotonic
+import asyncio
+from testils import async_test
 
 
 class test_mestils(unittest.TestCase):
@@ -142,5 +144,43 @@ census.daybreakgames.com/get/ps2/item?name.en=PSA-02 Diamondback'''
         self.assertEqual([True] * len(tests), outputs)
 
 
+class FakeChannel:
+    """Records when each message was sent."""
+
+    def __init__(self):
+        self.id = 1
+        self.sent = []
+
+    async def send(self, content, **kwargs):
+        self.sent.append((content, monotonic()))
+
+
+class test_pinging(unittest.TestCase):
+    def test_pack_mentions(self):
+        """Check that the mentions are packed into as few messages as possible."""
+        mentions = [f"<@{i:018d}>" for i in range(200)]
+        messages = mestils.pack_mentions(mentions, prefix="Come! ")
+        # 22 characters per mention and a space between them
+        self.assertEqual(len(messages), 3)
+        self.assertTrue(all(len(message) <= 2000 and message.startswith("Come! ")
+                            for message in messages))
+        self.assertEqual(" ".join(messages).replace("Come! ", "").split(" "), mentions)
+        self.assertEqual(mestils.pack_mentions([]), [])
+        with self.assertRaises(ValueError):
+            mestils.pack_mentions(mentions, prefix="x" * 1990)
+
+    @async_test
+    async def test_rate_limit(self):
+        """Check that messages are sent in order without going over the rate."""
+        channel = FakeChannel()
+        sender = mestils.RateLimitedSender(rate=2, per=0.1)
+        await asyncio.gather(*[sender.send(channel, str(i)) for i in range(5)])
+        self.assertEqual([content for content, _ in channel.sent], ["0", "1", "2", "3", "4"])
+        times = [sent_at for _, sent_at in channel.sent]
+        # the 3rd message must wait for the 1st to be a period old
+        self.assertGreaterEqual(times[2] - times[0], 0.09)
+        self.assertGreaterEqual(times[4] - times[2], 0.09)
+
+
 if __name__ == '__main__':
     unittest.main()
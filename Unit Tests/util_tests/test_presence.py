@@ -0,0 +1,40 @@
+import unittest
+import datetime as D
+from types import SimpleNamespace
+from Utils.presence import PresenceIndex
+
+PS2 = SimpleNamespace(name="Planetside 2")
+OTHER = SimpleNamespace(name="Something else")
+
+
+def member(id: int, *activities) -> SimpleNamespace:
+    return SimpleNamespace(id=id, activities=activities)
+
+
+class test_presence(unittest.TestCase):
+    def setUp(self):
+        self.start = D.datetime(2020, 1, 1, 19)
+        self.index = PresenceIndex()
+        self.index.build([member(1, PS2), member(2, OTHER), member(3)], now=self.start)
+
+    def test_updates(self):
+        """Check that members are added and removed as their activities change."""
+        self.assertEqual(list(self.index.playing), [1])
+        later = self.start + D.timedelta(minutes=5)
+        self.assertTrue(self.index.update(member(2, OTHER, PS2), now=later))
+        self.assertFalse(self.index.update(member(1), now=later))
+        self.assertEqual(self.index.playing, {2: later})
+
+    def test_peak(self):
+        """Check that the peak is kept until the next day."""
+        later = self.start + D.timedelta(minutes=5)
+        self.index.update(member(2, PS2), now=later)
+        self.index.remove(1)
+        self.assertEqual(self.index.get_peak(later), (2, later))
+
+        tomorrow = self.start + D.timedelta(days=1)
+        self.assertEqual(self.index.get_peak(tomorrow), (1, tomorrow))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,46 @@
 import unittest
+import asyncio
+from types import SimpleNamespace
+from Utils.react_menu import ReactMenu
+from testils import async_test
+
+
+class FakeMessage:
+    """Records the reactions added to it."""
+
+    def __init__(self, latency: float):
+        self.id = 1
+        self.latency = latency
+        self.added = []
+
+    async def add_reaction(self, emoji):
+        await asyncio.sleep(self.latency)
+        self.added.append(emoji)
+
+
+class FakeChannel:
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.requests = 0
+
+    async def send(self, content=None, embed=None):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        self.msg = FakeMessage(self.latency)
+        return self.msg
+
+    async def fetch_message(self, id):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self.msg
+
+
+def create_bot() -> SimpleNamespace:
+    """A bot with a ReactMenuHandler whose emojis are their ids."""
+    bound_messages = {}
+    handler = SimpleNamespace(bound_messages=bound_messages,
+                              bind=lambda menu: bound_messages.update({menu.msg.id: menu}))
+    return SimpleNamespace(get_cog=lambda name: handler, get_emoji=lambda id: id)
 
 
 class Test_test_react_menu(unittest.TestCase):
@@ -6,5 +48,27 @@ class Test_test_react_menu(unittest.TestCase):
         pass
 
 
+class test_react_menu_setup(unittest.TestCase):
+    @async_test
+    async def test_ready_before_reactions(self):
+        """Check that the menu is ready as soon as the message is sent
+        and that the reactions are added in order afterwards."""
+        channel = FakeChannel(latency=0.05)
+        bot = create_bot()
+        menu = ReactMenu(["a", "b"], bot, channel, on_select=lambda menu: None,
+                         last_emote_id=1, next_emote_id=2, select_emote_id=3)
+        self.assertEqual(menu.emotes, {1: "on_last", 2: "on_next", 3: "on_select"})
+
+        await menu.wait_until_ready()
+        self.assertFalse(menu._starting)
+        self.assertIs(bot.get_cog("ReactMenuHandler").bound_messages[1], menu)
+        self.assertLess(len(channel.msg.added), 3)
+
+        await menu.wait_until_ready(reactions=True)
+        self.assertEqual(channel.msg.added, [1, 2, 3])
+        # only the message was sent, nothing was fetched
+        self.assertEqual(channel.requests, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
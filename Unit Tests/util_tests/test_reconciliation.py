@@ -0,0 +1,38 @@
+import unittest
+from Utils.AttendanceDB import AttendanceDBWriter
+from Utils.reconciliation import reconcile
+
+
+class test_reconciliation(unittest.TestCase):
+    def test_one_to_one(self):
+        """Check that two registered names can't both claim one outfit member."""
+        diff = reconcile(["member1", "benmitchell", "benmitchel"], ["member1", "benmitchellV5"])
+        self.assertEqual(diff.renames, [("benmitchell", "benmitchellV5")])
+        self.assertEqual(diff.removes, ["benmitchel"])
+        self.assertEqual(diff.adds, [])
+
+    def test_exact_first(self):
+        """Check that equal names are paired before similar ones."""
+        diff = reconcile(["member10", "member1"], ["member1", "member10", "member100"])
+        self.assertFalse(diff.renames)
+        self.assertEqual(diff.adds, ["member100"])
+        self.assertFalse(reconcile(["a", "b"], ["b", "a"]))
+
+    def test_apply(self):
+        """Check that the changes are applied and that renamed members keep their attendance."""
+        writer = AttendanceDBWriter(":memory:")
+        self.addCleanup(writer.connection.close)
+        writer.add_members(["stays", "renamed", "leaves"])
+        writer.new_day("INFANTRY")
+        writer.record_att(["renamed"])
+
+        diff = reconcile([row[1] for row in writer.get_all_members()],
+                         ["stays", "renamedV2", "joins"])
+        diff.apply(writer)
+        self.assertEqual(sorted(row[1] for row in writer.get_all_members()),
+                         ["joins", "renamedV2", "stays"])
+        self.assertIsNotNone(writer.get_member_att("renamedV2"))
+
+
+if __name__ == '__main__':
+    unittest.main()
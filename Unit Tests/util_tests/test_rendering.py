@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+from io import BytesIO
+from PIL import Image
+import subprocess
+import sys
+from Utils import rendering
+from testils import async_test
+
+
+class test_rendering(unittest.TestCase):
+    def tearDown(self):
+        rendering.shutdown()
+
+    @async_test
+    async def test_render_table(self):
+        """Check that a table is rendered to a PNG in the worker."""
+        png = await rendering.render_table([[1, "a"], [2, None]], col_labels=["n", "x"])
+        self.assertTrue(png.getvalue().startswith(b"\x89PNG"))
+
+    @async_test
+    async def test_cached(self):
+        """Check that an unchanged table isn't rendered again
+        and that concurrent requests share a render."""
+        rendering.cache.clear()
+        rows = [["cached", 1]]
+        first, second = await asyncio.gather(
+            rendering.render_table(rows, backend="pillow"),
+            rendering.render_table(rows, backend="pillow"))
+        self.assertEqual(len(rendering.cache), 1)
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+        # sending a buffer closes it, so each call gets its own
+        first.close()
+        again = rendering.create_table(rows, backend="pillow")
+        self.assertEqual(again.getvalue(), second.getvalue())
+        self.assertEqual(len(rendering.cache), 1)
+        await rendering.render_table(rows, col_labels=["different"], backend="pillow")
+        self.assertEqual(len(rendering.cache), 2)
+
+    def test_cache_budget(self):
+        """Check that the least recently used images are dropped first."""
+        cache = rendering.ImageCache(max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((len(cache), cache.size), (2, 8))
+        cache.put("huge", b"x" * 11)
+        self.assertIsNone(cache.get("huge"))
+
+    def test_pillow(self):
+        """Check that the Pillow backend fits every column and rejects unknown backends."""
+        png = rendering.draw_table_pillow([["a", "a much longer cell"]], ["short", "x"], ["row"],
+                                          dpi=72)
+        size = rendering.FONT_SIZE
+        padding = round(size * rendering.CELL_PADDING)
+        with Image.open(BytesIO(png)) as image:
+            self.assertGreater(image.width, rendering.text_width(size, "row") +
+                               rendering.text_width(size, "short") +
+                               rendering.text_width(size, "a much longer cell"))
+            # a row for the labels and one for the cells
+            self.assertEqual(image.height, 2 * (size + 2 * padding) + 1)
+        with self.assertRaises(ValueError):
+            asyncio.get_event_loop().run_until_complete(
+                rendering.render_table([["a"]], backend="crayons"))
+
+    def test_lazy_import(self):
+        """Check that importing mestils doesn't import matplotlib."""
+        check = "import sys, Utils.mestils; print('matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", check], check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
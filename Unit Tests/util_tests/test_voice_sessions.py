@@ -0,0 +1,38 @@
+import unittest
+from Utils.voice_sessions import VoiceSessionTracker
+
+EVENT_CHANNEL = 1
+OTHER_EVENT_CHANNEL = 2
+LOBBY = 3
+
+
+class test_voice_sessions(unittest.TestCase):
+    def setUp(self):
+        self.tracker = VoiceSessionTracker([EVENT_CHANNEL, OTHER_EVENT_CHANNEL])
+
+    def test_minutes(self):
+        """Check that the minutes cover every session, including people present at the start."""
+        self.tracker.start([(10, "early")], now=0)
+        # joins late, leaves, and comes back
+        self.tracker.update(20, "late", LOBBY, EVENT_CHANNEL, now=600)
+        self.tracker.update(20, "late", EVENT_CHANNEL, None, now=1200)
+        self.tracker.update(20, "late", None, OTHER_EVENT_CHANNEL, now=3000)
+        # moving between event channels doesn't end a session
+        self.tracker.update(10, "early", EVENT_CHANNEL, OTHER_EVENT_CHANNEL, now=100)
+        # never joins an event channel
+        self.tracker.update(30, "lurker", None, LOBBY, now=100)
+
+        self.assertEqual(self.tracker.stop(now=5400), {"early": 90, "late": 50})
+        self.assertFalse(self.tracker.tracking)
+
+    def test_not_tracking(self):
+        """Check that updates outside of an event are ignored."""
+        self.tracker.update(10, "early", None, EVENT_CHANNEL, now=0)
+        self.assertEqual(self.tracker.stop(), {})
+        self.tracker.start(now=0)
+        with self.assertRaises(ValueError):
+            self.tracker.start(now=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
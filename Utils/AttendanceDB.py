@@ -5,14 +5,90 @@ from BenUtils import db
 import sqlite3 as sql
 import datetime as D
 from contextlib import suppress
-from .mestils import create_table
+from .analytics import AttendanceMatrix
+from .memtils import MemberNameIndex, NameParser
 
 
-class AttendanceDBWriter(db.DBWriter):
-    """Handles the attendance database and accessing it."""
+def day_number(date: D.date = None) -> int:
+    """Get the number that a date is stored as in the database.
+    Dates are stored as `datetime.date.toordinal()` so that they can be
+    compared as integers and converted back with `datetime.date.fromordinal()`.
+
+    ARGUMENTS
+    date:
+        The date to convert. Defaults to today in UTC."""
+    if date is None:
+        date = D.datetime.now(D.timezone.utc).date()
+    return date.toordinal()
+
+
+# the service shared by every cog. Opened by get_shared_db
+_shared_db: Optional[db.AsyncDBWriter] = None
+
+
+def get_shared_db() -> db.AsyncDBWriter:
+    """Get the attendance database service that every cog shares.
+    The connection is opened on the first query and only quick_check is run on it.
+    The full integrity check is scheduled by Cogs.Repeating."""
+    global _shared_db
+    if _shared_db is None:
+        # group the commits of queued writes
+        _shared_db = db.AsyncDBWriter(AttendanceDBWriter, deferCommits=True,
+                                      integrityCheck="quick")
+    return _shared_db
+
 
-    def __init__(self):
-        super().__init__("Attendance")
+async def close_shared_db():
+    """Close the shared database service. The next get_shared_db will open a new one."""
+    global _shared_db
+    if _shared_db is not None:
+        service, _shared_db = _shared_db, None
+        await service.close()
+
+
+class AttendanceDBWriter(db.DBWriter):
+    """Handles the attendance database and accessing it.
+
+    The reports are read from MonthlyAttendance, which holds running totals
+    per member, month, and event type. record_att keeps it up to date.
+
+    The Members table is cached in memory as the roster.
+    It's loaded on the first lookup and dropped whenever Members is written to.
+
+    ATTRIBUTES
+    _roster: Optional[Dict[int, Tuple[int, str, bool, datetime.date]]]
+        The rows of Members by memberID. None until it's loaded.
+    _roster_by_name: Dict[str, Tuple[int, str, bool, datetime.date]]
+        The rows of Members by name.
+        The first member registered with a name wins.
+    _name_index: Utils.memtils.MemberNameIndex
+        The fuzzy index of the members' names.
+        It's re-synced with the roster when the roster is reloaded.
+    _matrix: Optional[Tuple[int, Utils.analytics.AttendanceMatrix]]
+        The matrix used by the "numpy" report backend
+        and the connection's total_changes when it was loaded.
+    """
+
+    # add the Attendees rows after a rowid to the monthly totals
+    _ROLLUP_QUERY = """INSERT INTO MonthlyAttendance(month, memberID, eventType, attended, total)
+        SELECT CAST(julianday(Attendees.date + 1721424.5, 'start of month') - 1721424.5 AS INTEGER),
+            memberID, eventType, SUM(attended), COUNT(*)
+        FROM Attendees, Days
+        WHERE Attendees.date = Days.date
+            AND Attendees.rowid > ?
+        GROUP BY 1, memberID, eventType
+        ON CONFLICT(month, memberID, eventType) DO UPDATE SET
+            attended = attended + excluded.attended,
+            total = total + excluded.total;"""
+
+    def __init__(self, name: str = "Attendance", **kwargs):
+        """name: the name of the database. Pass ":memory:" for a temporary database.
+        **kwargs: any settings for BenUtils.db.DBWriter"""
+        self._roster = None
+        self._roster_by_name = {}
+        self._name_index = MemberNameIndex()
+        self._matrix = None
+        super().__init__(name, **kwargs)
 
         # create the table if it doesn't exist
         self.create_tables()
@@ -28,28 +104,61 @@ class AttendanceDBWriter(db.DBWriter):
         if event_type not in ("AIR", "ARMOUR", "INFANTRY", "CO-OPS1", "CO-OPS2", "INTERNAL_OPS"):
             raise ValueError("Invalid event_type")
 
-        # if the day was already registered
-        try:
-            with self.cursor() as cursor:
-                cursor.execute("""INSERT INTO Days(date, eventType) VALUES (
-                        ( SELECT DATE('now') ),
-                        ?
-                    );""", [event_type]
-                )
-        except sql.IntegrityError:
-            self.connection.rollback()
-        finally:
-            self.connection.commit()
+        # ignore the day if it was already registered
+        with suppress(sql.IntegrityError):
+            with self.transaction() as cursor:
+                cursor.execute("INSERT INTO Days(date, eventType) VALUES (?, ?);",
+                               [day_number(), event_type])
 
     def create_tables(self):
-        """Create the tables if they're not already created."""
-        self._executeFromFile("./Text Files/AttDBTableDefinitions.txt")
+        """Create the tables if they're not already created
+        and apply any new migrations."""
+        self.migrate("./Text Files/AttDBMigrations")
+
+    @staticmethod
+    def _this_month() -> Tuple[int, int]:
+        """Get the day numbers of the first day of this month and of next month.
+        Used for `date >= ? AND date < ?` so that the date indexes can be used."""
+        start = D.date.fromordinal(day_number()).replace(day=1)
+        end = (start + D.timedelta(days=32)).replace(day=1)
+        return day_number(start), day_number(end)
+
+    def _load_roster(self) -> Dict[int, Tuple[int, str, bool, D.date]]:
+        """Get the cached rows of Members by memberID. They're queried if they aren't cached."""
+        if self._roster is None:
+            rows = self.doQuery(
+                "SELECT memberID, name, away, joinedAt FROM Members ORDER BY memberID;")
+            self._roster = {row[0]: (row[0], row[1], bool(row[2]), D.date.fromordinal(row[3]))
+                            for row in rows}
+            self._roster_by_name = {}
+            for row in self._roster.values():
+                self._roster_by_name.setdefault(row[1], row)
+            # only the changed names are re-indexed
+            self._name_index.sync(row[1] for row in self._roster.values())
+        return self._roster
+
+    def _invalidate_roster(self):
+        """Drop the cached roster so that the next lookup re-reads Members."""
+        self._roster = None
+        self._roster_by_name = {}
+
+    def _onRollback(self):
+        """The roster and matrix may have been loaded with the rolled back changes."""
+        self._invalidate_roster()
+        self._matrix = None
 
-    # any methods that the bot will access have been made coroutines
     def add_member(self, name: str):
         """Add a member to the Members table."""
+        self._invalidate_roster()
         self.doQuery("INSERT INTO Members(name) VALUES(?);", vars=[name])
 
+    def add_members(self, names: Iterable[str]):
+        """Add many members to the Members table in one transaction."""
+        self._invalidate_roster()
+        with self.transaction() as cursor:
+            cursor.executemany("INSERT INTO Members(name) VALUES(?);",
+                               [(name,) for name in names])
+
     def get_member_by_name(self, name: str) -> Optional[Tuple[int, str, bool, D.date]]:
         """
         Get the row of a member by their name.
@@ -61,23 +170,29 @@ class AttendanceDBWriter(db.DBWriter):
             The member that was found.
             If multiple members were found, the first one will be returned.
         """
-        # fetch the row(s)
-        rows = self.doQuery(
-            "SELECT memberID, name, away, joinedAt FROM Members WHERE name = ?;",
-            vars=[name])
+        self._load_roster()
+        return self._roster_by_name.get(name)
 
-        # check if nothing was found
-        if not rows:
-            return None
-        else:
-            # get the first member
-            first_member = rows[0]
-            # convert away to bool
-            away = bool(first_member[2])
-            # convert joinedAt to D.date
-            joined_at = D.datetime.strptime(first_member[3], "%Y-%m-%d").date()
+    def is_registered(self, name: str, min_ratio: int = 85) -> bool:
+        """Check if a name fuzzily matches a registered member.
+        Works like Utils.memtils.is_member against the Members table.
+
+        ARGUMENTS
+        name:
+            The name to check. It will be parsed by NameParser.
+        min_ratio:
+            The lowest score out of 100 that counts as a match."""
+        self._load_roster()
+        return self._name_index.is_member(NameParser(name, case=False).parsed, min_ratio)
+
+    def match_members(self, names: Iterable[str]) -> List[Optional[Tuple[str, int]]]:
+        """Find the closest registered member of each name.
 
-            return first_member[:-2] + (away, joined_at)
+        RETURNS
+            (member name, score out of 100) for each name.
+            None where no member was close."""
+        self._load_roster()
+        return self._name_index.match_many(names)
 
     def get_member_by_id(self, id: int) -> Optional[Tuple[int, str, bool, D.date]]:
         """
@@ -90,63 +205,92 @@ class AttendanceDBWriter(db.DBWriter):
             The member that was found.
             If multiple members were found, the first one will be returned.
         """
-        # fetch the row(s)
-        rows = self.doQuery(
-            "SELECT memberID, name, away, joinedAt FROM Members WHERE memberID = ?;",
-            [id])
-
-        # check if nothing was found
-        if not rows:
-            return None
-        else:
-            # get the first member
-            first_member = rows[0]
-            # convert away to bool
-            away = bool(first_member[2])
-            # convert joinedAt to D.date
-            joined_at = D.datetime.strptime(first_member[3], "%Y-%m-%d").date()
-
-            return first_member[:-2] + (away, joined_at)
+        return self._load_roster().get(id)
 
     def delete_member(self, name: str):
         """Delete a member from the Members table by their name."""
+        self._invalidate_roster()
         self.doQuery("DELETE FROM Members WHERE name = ?;", [name])
 
+    def delete_members(self, names: Iterable[str]):
+        """Delete many members from the Members table by their names in one transaction."""
+        self._invalidate_roster()
+        with self.transaction() as cursor:
+            cursor.executemany("DELETE FROM Members WHERE name = ?;",
+                               [(name,) for name in names])
+
+    def rename_members(self, renames: Iterable[Tuple[str, str]]):
+        """Rename many members in one transaction. Their attendance is kept.
+
+        ARGUMENTS
+        renames:
+            (old name, new name) for each member."""
+        self._invalidate_roster()
+        with self.transaction() as cursor:
+            cursor.executemany("UPDATE Members SET name = ? WHERE name = ?;",
+                               [(new, old) for old, new in renames])
+
     def delete_member_by_id(self, id: int):
         """Delete a member from the Members table by their id."""
+        self._invalidate_roster()
         self.doQuery("DELETE FROM Members WHERE memberID = ?;", [id])
 
-    def record_att(self, attendees: Iterable[str]):
+    def record_att(self, attendees: Iterable[str],
+                   minutes: Dict[str, int] = None) -> List[str]:
         """
         Mark the attendees as attended in the Attendees table.
+        Every registered member gets a row for today.
 
         ARGUMENTS
         attendees:
             The list of names of people who attended.
             These names are expected to be parsed by Utils.memtils.NameParser
             with the default settings.
+        minutes:
+            How many minutes each attendee was at the event for.
+            Attendees that aren't in it are recorded with 0 minutes.
+
+        RETURNS
+            The names in attendees that don't belong to a registered member.
+
+        RAISES
+            ValueError: there are no members in the DB.
         """
-        # get registered members
-        members = [row[1] for row in self.get_all_members()]
-
-        # ensure that Members isn't empty
-        if not members:
-            raise ValueError("No members in the DB")
-
-        # mark attended = True/False depending on whether their name is in attendees
-        to_insert = [
-            (name, 1) if name in attendees else (name, 0)
-            for name in members
-        ]
-
-        # send to DB
-        self.doQuery("""INSERT INTO Attendees(date, memberID, attended) VALUES(
-                ( SELECT DATE('now') ),
-                ( SELECT memberID FROM Members WHERE name = ? ),
-                ?
-            );""",
-                     to_insert, True
-                     )
+        today = day_number()
+        with self.transaction() as cursor:
+            # stage the names so that the roll call can be one join
+            cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS RollCall(
+                name TEXT PRIMARY KEY, minutes INTEGER NOT NULL) WITHOUT ROWID;""")
+            cursor.execute("DELETE FROM temp.RollCall;")
+            minutes = minutes or {}
+            cursor.executemany("INSERT OR IGNORE INTO temp.RollCall(name, minutes) VALUES(?, ?);",
+                               [(name, minutes.get(name, 0)) for name in attendees])
+
+            # mark attended = True/False depending on whether their name was staged
+            cursor.execute("SELECT IFNULL(MAX(rowid), 0) FROM Attendees;")
+            last_row = cursor.fetchone()[0]
+            cursor.execute("""INSERT INTO Attendees(date, memberID, attended, minutes)
+                SELECT ?, Members.memberID, RollCall.name IS NOT NULL, IFNULL(RollCall.minutes, 0)
+                FROM Members LEFT JOIN temp.RollCall ON RollCall.name = Members.name;""", [today])
+
+            # ensure that Members isn't empty
+            # raising here rolls back the transaction
+            if cursor.rowcount < 1:
+                raise ValueError("No members in the DB")
+
+            # update the monthly totals with the new rows
+            cursor.execute(self._ROLLUP_QUERY, [last_row])
+
+            cursor.execute("""SELECT name FROM temp.RollCall
+                WHERE name NOT IN (SELECT name FROM Members);""")
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild_monthly_attendance(self):
+        """Recalculate the MonthlyAttendance totals from every row in Attendees.
+        Use this after editing Attendees or Days by hand."""
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM MonthlyAttendance;")
+            cursor.execute(self._ROLLUP_QUERY, [0])
 
     def get_join_date_by_name(self, name: str) -> Optional[D.date]:
         """Get the join date of a member by their name.
@@ -154,12 +298,8 @@ class AttendanceDBWriter(db.DBWriter):
         RETURNS
         None: the member wasn't found.
         datetime.Date: the date that the member joined at."""
-        try:
-            row = self.doQuery(
-                "SELECT joinedAt FROM Members WHERE name = ?;", [name])[0]
-            return D.datetime.strptime(row[0], "%Y-%m-%d").date()
-        except IndexError:
-            return None
+        member = self.get_member_by_name(name)
+        return member[3] if member else None
 
     def get_join_date_by_id(self, id: int) -> Optional[D.date]:
         """Get the join date of a member by their name
@@ -167,32 +307,54 @@ class AttendanceDBWriter(db.DBWriter):
         RETURNS
         None: the member wasn't found.
         datetime.Date: the date that the member joined at."""
-        try:
-            row = self.doQuery(
-                "SELECT joinedAt FROM Members WHERE memberID = ?;", [id])[0]
-            return D.datetime.strptime(row[0], "%Y-%m-%d").date()
-        except IndexError:
-            return None
-
-    def get_att_per_member(self) -> str:
+        member = self.get_member_by_id(id)
+        return member[3] if member else None
+
+    @staticmethod
+    def _check_backend(backend: str) -> str:
+        """Raise a ValueError if backend isn't a report backend."""
+        if backend not in ("sql", "numpy"):
+            raise ValueError(f"Invalid backend: {backend}")
+        return backend
+
+    def get_attendance_matrix(self) -> AttendanceMatrix:
+        """Get Attendees as an AttendanceMatrix.
+        It's kept until this connection writes to the DB."""
+        changes = self.connection.total_changes
+        if self._matrix is None or self._matrix[0] != changes:
+            days = self.doQuery("SELECT date, eventType FROM Days;")
+            attendees = self.doQuery("SELECT memberID, date, attended FROM Attendees;")
+            self._matrix = (changes,
+                            AttendanceMatrix(self.get_all_members(), days, attendees))
+        return self._matrix[1]
+
+    def get_att_per_member(self, backend: str = "sql") -> str:
         """Get this month's attendance and save it as an image.
 
+        ARGUMENTS
+        backend:
+            "sql" = read the totals from MonthlyAttendance
+            "numpy" = calculate them from get_attendance_matrix
+
         RETURNS
             The path the the table image.
 
         RAISES
             ValueError: No attendance data returned from Attendees."""
-        # get the target month for the LIKE clause
-        target_month = D.datetime.today().strftime("%Y-%m-") + "%"
+        # get the first day of this month
+        month, next_month = self._this_month()
 
         # get the attendance per member and whether they were away
-        rows = self.doQuery("""SELECT AVG(attended), away, name
-	                            FROM Attendees, Members
-                                WHERE Attendees.memberID = Members.memberID
-    	                            AND date LIKE ?
+        if self._check_backend(backend) == "numpy":
+            rows = self.get_attendance_matrix().member_rows(month, next_month)
+        else:
+            rows = self.doQuery("""SELECT CAST(SUM(attended) AS REAL) / SUM(total), away, name
+                                FROM MonthlyAttendance, Members
+                                WHERE MonthlyAttendance.memberID = Members.memberID
+                                    AND month = ?
                                 GROUP BY name;""",
-                            vars=[target_month]
-                            )
+                                vars=[month]
+                                )
 
         # handle no attendance data returned
         if not rows:
@@ -206,7 +368,7 @@ class AttendanceDBWriter(db.DBWriter):
         new_rows = [(0.0, 0, name) if name not in rows
                     else (*rows[name], name)
                     for name in
-                    [r[1] for r in self.get_all_members()]
+                    [r[1] for r in self._load_roster().values()]
                     ]
 
         # convert away and avg. attendance to more readable forms
@@ -224,26 +386,33 @@ class AttendanceDBWriter(db.DBWriter):
         # create a table
         return sorted_rows
 
-    def get_att_per_event(self) -> str:
+    def get_att_per_event(self, backend: str = "sql") -> str:
         """Get this month's average attendance for each event type
         and save it as an image.
 
+        ARGUMENTS
+        backend:
+            "sql" = read the totals from MonthlyAttendance
+            "numpy" = calculate them from get_attendance_matrix
+
         RETURNS
             The path the the table image.
 
         RAISES
             ValueError: No attendance data returned from Attendees."""
-        # get the target month for the LIKE clause
-        target_month = D.datetime.today().strftime("%Y-%m-") + "%"
+        # get the first day of this month
+        month, next_month = self._this_month()
 
-        # get the attendance per member and whether they were away
-        rows = self.doQuery("""SELECT AVG(attended), eventType
-	                        FROM Attendees, Days
-                            WHERE Attendees.date = Days.date
-    	                        AND Attendees.date LIKE ?
-                            GROUP BY eventType;""",
-                            vars=[target_month]
-                            )
+        # get the attendance per event type
+        if self._check_backend(backend) == "numpy":
+            rows = self.get_attendance_matrix().event_rows(month, next_month)
+        else:
+            rows = self.doQuery("""SELECT CAST(SUM(attended) AS REAL) / SUM(total), eventType
+                                FROM MonthlyAttendance
+                                WHERE month = ?
+                                GROUP BY eventType;""",
+                                vars=[month]
+                                )
 
         # handle no attendance data returned
         # which looks like [(None, None)...]
@@ -282,14 +451,15 @@ class AttendanceDBWriter(db.DBWriter):
         RETURNS
         None: they have attended no events
         'x%': x % of events were attended by the person"""
-        # get the target month for the LIKE clause
-        target_month = D.datetime.today().strftime("%Y-%m-") + "%"
+        # get the first day of this month
+        month, _ = self._this_month()
 
-        rows = self.doQuery("""SELECT AVG(attended) FROM Attendees, Members
-                            WHERE Members.memberID = Attendees.memberID
+        rows = self.doQuery("""SELECT CAST(SUM(attended) AS REAL) / SUM(total)
+                            FROM MonthlyAttendance, Members
+                            WHERE Members.memberID = MonthlyAttendance.memberID
                             AND Members.name = ?
-                            AND Attendees.date LIKE ?;""",
-                            vars=(name, target_month)
+                            AND month = ?;""",
+                            vars=(name, month)
                             )
 
         # handle no attended events
@@ -299,11 +469,12 @@ class AttendanceDBWriter(db.DBWriter):
             return f"{int(round(rows[0][0] * 100, 0))}%"
 
     def get_all_members(self) -> List[Tuple[int, str, bool, D.date]]:
-        """Get the memberID, name, joinedAt of all registered members in the Members table."""
-        rows = self.doQuery(
-            "SELECT memberID, name, away, joinedAt FROM Members;")
-        return [(row[0], row[1], bool(row[2]), D.datetime.strptime(row[3], "%Y-%m-%d").date())
-                for row in rows]
+        """Get the memberID, name, away, joinedAt of all registered members in the Members table."""
+        return list(self._load_roster().values())
+
+    def count_members(self) -> int:
+        """Get the number of registered members."""
+        return len(self._load_roster())
 
     def mark_away(self, name: str) -> bool:
         '''
@@ -314,6 +485,7 @@ class AttendanceDBWriter(db.DBWriter):
         False: " "     "  not "  "   "
         '''
         # count the number of changes and use it to see if a member was hit
+        self._invalidate_roster()
         changes_before = self.connection.total_changes
         self.doQuery("UPDATE Members SET away = 1 WHERE name = ?;", [name])
         return self.connection.total_changes > changes_before
@@ -327,16 +499,22 @@ class AttendanceDBWriter(db.DBWriter):
         False: " "     "  not "  "   "
         '''
         # count the number of changes and use it to see if a member was hit
+        self._invalidate_roster()
         changes_before = self.connection.total_changes
         self.doQuery("UPDATE Members SET away = 0 WHERE name = ?;", [name])
         return self.connection.total_changes > changes_before
 
-    def suggest_kicks(self) -> Tuple[
+    def suggest_kicks(self, backend: str = "sql") -> Tuple[
             List[Tuple[str, int, str, str, str]],
             str, str]:
         """
         Get all members under 50% attendance and their priority for kicking.
 
+        ARGUMENTS
+        backend:
+            "sql" = read the totals from MonthlyAttendance
+            "numpy" = calculate them from get_attendance_matrix
+
         RETURNS
             The rows to create a table with in the format:
             (name, attendance ratio (%), suggested action, away status, join date)
@@ -344,17 +522,20 @@ class AttendanceDBWriter(db.DBWriter):
             the % of the outfit recommended to be warned;
             and the % of the outfit recommended to be kicked.
         """
-        # get the target month for the LIKE clause
-        target_month = D.datetime.today().strftime("%Y-%m-") + "%"
-
-        # most of the data manipulation is in the query
-        # because sql is faaaaaaaaaaaast
-        rows = self.doQuery("""SELECT round(AVG(attended) * 100, 0) as ratio, name, away, joinedAt
-	                                FROM attendees, members
-	                                WHERE attendees.memberid = members.memberid
-    	                                AND attendees.date like ?
-                                    GROUP BY name
-                                    HAVING ratio <= 20;""", [target_month])
+        # get the first day of this month
+        month, next_month = self._this_month()
+
+        if self._check_backend(backend) == "numpy":
+            rows = self.get_attendance_matrix().kick_rows(month, next_month)
+        else:
+            # most of the data manipulation is in the query
+            # because sql is faaaaaaaaaaaast
+            rows = self.doQuery("""SELECT round(SUM(attended) * 100.0 / SUM(total), 0) as ratio, name, away, joinedAt
+                                FROM MonthlyAttendance, members
+                                WHERE MonthlyAttendance.memberid = members.memberid
+                                    AND month = ?
+                                GROUP BY name
+                                HAVING ratio <= 20;""", [month])
 
         if not rows:
             raise ValueError("No attendance data returned from the DB.")
@@ -363,18 +544,17 @@ class AttendanceDBWriter(db.DBWriter):
         table_rows = []
         num_kicked = 0
         num_warned = 0
+        today = day_number()
         for ratio, name, away, joined_at in rows:
             # round ratio
             ratio = int(ratio)
             # convert away to bool
             away = bool(away)
-            # convert joinedAt to D.date
-            joined_at = D.datetime.strptime(joined_at, "%Y-%m-%d")
             # assign each member a priority level
             # +1 point per 10% under 50% attendance
             priority_score = (50 - ratio) // 10
             # reduce the priority of those who were away or joined within a month
-            if away or (D.datetime.today() - joined_at).days < 30:
+            if away or today - joined_at < 30:
                 priority_score = 0
 
             # count how many people are being recommended to be kicked/warned
@@ -386,11 +566,11 @@ class AttendanceDBWriter(db.DBWriter):
                 num_kicked += 1
 
             table_rows.append((name, ratio, priority_level,
-                               away, joined_at.strftime("%d.%m.%y"))
+                               away, D.date.fromordinal(joined_at).strftime("%d.%m.%y"))
                               )
 
         # get kicked/warned %
-        num_members = len(self.get_all_members())
+        num_members = self.count_members()
         percent_warned = f"{int(round((num_warned / num_members) * 100, 0))}%"
         percent_kicked = f"{int(round((num_kicked / num_members) * 100, 0))}%"
         return (table_rows, percent_warned, percent_kicked)
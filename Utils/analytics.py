@@ -0,0 +1,173 @@
+"""Attendance statistics calculated with numpy.
+
+Attendees is loaded once into a dense member x day matrix
+so that each statistic is a few array operations instead of a query.
+Days are day numbers, as in Utils.AttendanceDB."""
+
+from typing import *
+import numpy as np
+import datetime as D
+from itertools import chain
+
+
+def month_start(day: int, months_back: int = 0) -> int:
+    """Get the day number of the first day of the month that day is in.
+
+    ARGUMENTS
+    day:
+        The day number to get the month of.
+    months_back:
+        How many months before that month to go back."""
+    date = D.date.fromordinal(day)
+    month_index = date.year * 12 + date.month - 1 - months_back
+    return D.date(month_index // 12, month_index % 12 + 1, 1).toordinal()
+
+
+def ratios(attended: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Divide attended by totals. Anything with no total is NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals > 0, attended / totals, np.nan)
+
+
+class AttendanceMatrix:
+    """
+    The Attendees table as a member x day matrix.
+
+    ATTRIBUTES
+    member_ids: np.ndarray
+        The memberID of each row, in ascending order.
+    names: List[str]
+        The name of each row.
+    aways: np.ndarray
+        Whether each member is away.
+    joined: np.ndarray
+        The day number that each member joined on.
+    days: np.ndarray
+        The day number of each column, in ascending order.
+    event_types: np.ndarray
+        The event type of each column.
+    attended: np.ndarray
+        Whether a member attended a day.
+    recorded: np.ndarray
+        Whether a member had a roll call on a day.
+        Days from before a member joined or that had no roll call aren't counted.
+    """
+
+    def __init__(self, members: Iterable[Tuple[int, str, bool, D.date]],
+                 days: Iterable[Tuple[int, str]],
+                 attendees: Iterable[Tuple[int, int, bool]]):
+        """
+        ARGUMENTS
+        members:
+            The rows from AttendanceDBWriter.get_all_members.
+        days:
+            (date, eventType) for each row of Days.
+        attendees:
+            (memberID, date, attended) for each row of Attendees.
+        """
+        members = sorted(members)
+        self.member_ids = np.array([row[0] for row in members], dtype=np.int64)
+        self.names = [row[1] for row in members]
+        self.aways = np.array([row[2] for row in members], dtype=bool)
+        self.joined = np.array([row[3].toordinal() for row in members], dtype=np.int64)
+
+        days = sorted(days)
+        self.days = np.array([row[0] for row in days], dtype=np.int64)
+        self.event_types = np.array([row[1] for row in days], dtype=object)
+
+        self.attended = np.zeros((len(self.member_ids), len(self.days)), dtype=bool)
+        self.recorded = np.zeros_like(self.attended)
+        # fromiter is much faster than np.array for millions of tuples
+        attendees = np.fromiter(chain.from_iterable(attendees),
+                                dtype=np.int64).reshape(-1, 3)
+        if len(attendees) and len(self.member_ids) and len(self.days):
+            rows = np.searchsorted(self.member_ids, attendees[:, 0])
+            columns = np.searchsorted(self.days, attendees[:, 1])
+            # the foreign keys should prevent orphans but don't trust them
+            rows_ok = rows < len(self.member_ids)
+            columns_ok = columns < len(self.days)
+            found = rows_ok & columns_ok
+            found[found] = ((self.member_ids[rows[found]] == attendees[found, 0])
+                            & (self.days[columns[found]] == attendees[found, 1]))
+            rows, columns = rows[found], columns[found]
+            self.recorded[rows, columns] = True
+            self.attended[rows, columns] = attendees[found, 2].astype(bool)
+
+    def _columns(self, start: int = None, end: int = None) -> np.ndarray:
+        """Get a mask of the days where start <= day < end."""
+        mask = np.ones(len(self.days), dtype=bool)
+        if start is not None:
+            mask &= self.days >= start
+        if end is not None:
+            mask &= self.days < end
+        return mask
+
+    def per_member(self, start: int = None, end: int = None) -> np.ndarray:
+        """Get the attendance ratio of each member between start and end.
+        NaN if a member had no roll calls."""
+        columns = self._columns(start, end)
+        return ratios(self.attended[:, columns].sum(axis=1),
+                      self.recorded[:, columns].sum(axis=1))
+
+    def per_event_type(self, start: int = None, end: int = None) -> Dict[str, float]:
+        """Get the attendance ratio of each event type between start and end.
+        Event types without any roll calls are left out."""
+        columns = self._columns(start, end)
+        types, inverse = np.unique(self.event_types[columns].astype(str), return_inverse=True)
+        attended = np.bincount(inverse, weights=self.attended[:, columns].sum(axis=0),
+                               minlength=len(types))
+        totals = np.bincount(inverse, weights=self.recorded[:, columns].sum(axis=0),
+                             minlength=len(types))
+        return {str(event_type): float(ratio) for event_type, ratio, total in
+                zip(types, ratios(attended, totals), totals) if total}
+
+    def per_week(self, start: int = None, end: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the attendance ratio of each week between start and end.
+
+        RETURNS
+            The day numbers of the Monday of each week
+            and the attendance ratio of that week."""
+        columns = self._columns(start, end)
+        # day number 1 was a Monday
+        weeks = (self.days[columns] - 1) // 7
+        if not len(weeks):
+            return np.array([], dtype=np.int64), np.array([])
+        # the days are sorted so each week is a contiguous run of columns
+        week_numbers, first_columns = np.unique(weeks, return_index=True)
+        attended = np.add.reduceat(self.attended[:, columns].sum(axis=0), first_columns)
+        totals = np.add.reduceat(self.recorded[:, columns].sum(axis=0), first_columns)
+        return week_numbers * 7 + 1, ratios(attended, totals)
+
+    def rolling(self, months: int = 3, day: int = None) -> np.ndarray:
+        """Get the attendance ratio of each member over several months.
+
+        ARGUMENTS
+        months:
+            How many months to include. The month that day is in counts as one.
+        day:
+            The day number to end on. Defaults to the last day in the matrix."""
+        if day is None:
+            day = int(self.days[-1]) if len(self.days) else D.date.today().toordinal()
+        return self.per_member(month_start(day, months - 1), month_start(day, -1))
+
+    # the rows that the SQL reports of AttendanceDBWriter are built from
+    def member_rows(self, start: int, end: int) -> List[Tuple[float, bool, str]]:
+        """Get (ratio, away, name) for every member with a roll call between start and end."""
+        member_ratios = self.per_member(start, end)
+        return [(float(ratio), bool(away), name) for ratio, away, name in
+                zip(member_ratios, self.aways, self.names) if not np.isnan(ratio)]
+
+    def event_rows(self, start: int, end: int) -> List[Tuple[float, str]]:
+        """Get (ratio, event type) for every event type with a roll call between start and end."""
+        return [(float(ratio), event_type) for event_type, ratio in
+                self.per_event_type(start, end).items()]
+
+    def kick_rows(self, start: int, end: int,
+                  max_ratio: int = 20) -> List[Tuple[int, str, bool, int]]:
+        """Get (ratio as a rounded %, name, away, joinedAt) for every member
+        whose attendance between start and end was at most max_ratio %. Sorted by name."""
+        percents = np.floor(self.per_member(start, end) * 100 + 0.5)
+        with np.errstate(invalid="ignore"):
+            selected = np.flatnonzero(percents <= max_ratio)
+        return sorted(((int(percents[i]), self.names[i], bool(self.aways[i]), int(self.joined[i]))
+                       for i in selected), key=lambda row: row[1])
@@ -0,0 +1,277 @@
+"""Compressed, incremental backups of a database.
+
+Snapshots are taken with the sqlite online backup API so that they're consistent
+even if the live connection is writing. Each backup is stored as either a full copy
+or the pages that changed since the last backup, compressed with zlib.
+A chain of backups is restored by taking its full copy and applying the deltas after it in order."""
+
+from typing import *
+from BenUtils.db import DBWriter
+import sqlite3 as sql
+import datetime as D
+import hashlib
+import os
+import re
+import struct
+import zlib
+
+# delta files start with this header:
+# magic, sha256 of the snapshot it applies to, length of the new snapshot, page size
+DELTA_HEADER = struct.Struct(">4s32sQI")
+DELTA_MAGIC = b"DLTA"
+# each changed page is prefixed with its number
+PAGE_NUMBER = struct.Struct(">I")
+# 000001-20200101-120000.full.z
+BACKUP_NAME = re.compile(r"^(?P<seq>\d{6})-\d{8}-\d{6}\.(?P<kind>full|delta)\.z$")
+
+
+def diff_pages(old: bytes, new: bytes, page_size: int) -> List[Tuple[int, bytes]]:
+    """Get the pages of new that are different to old.
+
+    RETURNS
+        (page number, page contents) for every changed page.
+        Pages past the end of old count as changed."""
+    changed = []
+    for start in range(0, len(new), page_size):
+        page = new[start:start + page_size]
+        if page != old[start:start + page_size]:
+            changed.append((start // page_size, page))
+    return changed
+
+
+def create_delta(old: bytes, new: bytes, page_size: int) -> Optional[bytes]:
+    """Create a compressed delta that turns old into new.
+
+    RETURNS
+    None: nothing changed.
+    bytes: the compressed delta."""
+    pages = diff_pages(old, new, page_size)
+    if not pages and len(old) == len(new):
+        return None
+
+    parts = [DELTA_HEADER.pack(DELTA_MAGIC, hashlib.sha256(old).digest(),
+                               len(new), page_size)]
+    for page_number, page in pages:
+        parts.append(PAGE_NUMBER.pack(page_number))
+        parts.append(page)
+    return zlib.compress(b"".join(parts))
+
+
+def apply_delta(old: bytes, delta: bytes) -> bytes:
+    """Apply a delta from create_delta to old.
+
+    RAISES
+        ValueError: the delta isn't valid or it wasn't made from old."""
+    delta = zlib.decompress(delta)
+    magic, base_hash, length, page_size = DELTA_HEADER.unpack_from(delta)
+    if magic != DELTA_MAGIC:
+        raise ValueError("Not a delta")
+    if hashlib.sha256(old).digest() != base_hash:
+        raise ValueError("The delta wasn't made from this snapshot")
+
+    # the database may have grown or shrunk
+    new = bytearray(old[:length].ljust(length, b"\0"))
+    offset = DELTA_HEADER.size
+    while offset < len(delta):
+        page_number, = PAGE_NUMBER.unpack_from(delta, offset)
+        offset += PAGE_NUMBER.size
+        start = page_number * page_size
+        page = delta[offset:offset + page_size]
+        new[start:start + len(page)] = page
+        offset += len(page)
+    return bytes(new)
+
+
+def list_backups(folder: str) -> List[Tuple[int, str, str]]:
+    """Get the backups in folder, oldest first.
+
+    RETURNS
+        (sequence number, kind, file name) for each backup. kind is "full" or "delta"."""
+    backups = []
+    for file_name in os.listdir(folder):
+        match = BACKUP_NAME.match(file_name)
+        if match:
+            backups.append((int(match["seq"]), match["kind"], file_name))
+    return sorted(backups)
+
+
+def restore(folder: str, dest_path: str, until: int = None):
+    """Rebuild a database file from the backups in folder.
+
+    ARGUMENTS
+    folder:
+        The folder that the backups are stored in.
+    dest_path:
+        Where to write the database. It will be overwritten.
+    until:
+        The sequence number of the last backup to apply.
+        Defaults to the newest backup.
+
+    RAISES
+        FileNotFoundError: there's no full backup to start from."""
+    backups = [row for row in list_backups(folder)
+               if until is None or row[0] <= until]
+
+    # start from the newest full backup
+    fulls = [i for i, (_, kind, _) in enumerate(backups) if kind == "full"]
+    if not fulls:
+        raise FileNotFoundError(f"No full backup in {folder}")
+
+    data = b""
+    for _, kind, file_name in backups[fulls[-1]:]:
+        with open(os.path.join(folder, file_name), "rb") as f:
+            contents = f.read()
+        data = zlib.decompress(contents) if kind == "full" else apply_delta(data, contents)
+
+    with open(dest_path, "wb") as f:
+        f.write(data)
+
+
+class BackupManager:
+    """Takes backups of a database and keeps a rotation of them in a folder.
+
+    Use snapshot on the thread that owns the connection,
+    then store on any thread to compress and save it.
+    If the backup is uploaded somewhere, use prepare instead of store
+    and only commit it once it's been uploaded so that the uploaded chain has no gaps.
+
+    ATTRIBUTES
+    folder: str
+        Where the backups are kept.
+    full_every: int
+        How many backups to take before taking another full one.
+        The ones in between are deltas.
+    keep_fulls: int
+        How many chains of a full backup and its deltas to keep.
+    """
+
+    def __init__(self, folder: str = "./BenUtils/Databases/Backups",
+                 full_every: int = 14, keep_fulls: int = 2):
+        """
+        ARGUMENTS
+        folder:
+            The folder to keep the backups in. It will be created if it doesn't exist.
+        full_every:
+            How many backups to take before taking another full one.
+        keep_fulls:
+            How many full backups to keep along with their deltas.
+        """
+        self.folder = folder
+        self.full_every = full_every
+        self.keep_fulls = keep_fulls
+        os.makedirs(folder, exist_ok=True)
+
+    @property
+    def _latest_path(self) -> str:
+        """The uncompressed copy of the last backup that deltas are made against."""
+        return os.path.join(self.folder, "latest.db")
+
+    @property
+    def _snapshot_path(self) -> str:
+        """Where snapshot writes to until commit picks it up."""
+        return os.path.join(self.folder, "snapshot.db")
+
+    def snapshot(self, writer: DBWriter) -> str:
+        """Copy the database with the sqlite backup API.
+        Must be called on the thread that owns writer's connection,
+        so use it with AsyncDBWriter.run.
+
+        RETURNS
+            The path of the copy. Pass it to store."""
+        # don't leave deferred writes out of the snapshot
+        writer.flush()
+        dest = sql.connect(self._snapshot_path)
+        try:
+            writer.connection.backup(dest)
+        finally:
+            dest.close()
+        return self._snapshot_path
+
+    def store(self, snapshot_path: str) -> Optional[str]:
+        """Prepare a backup of the snapshot and commit it straight away.
+        Use prepare and commit instead if the backup has to be uploaded first.
+
+        RETURNS
+        None: nothing changed since the last backup.
+        str: the path of the new backup."""
+        path = self.prepare(snapshot_path)
+        if path:
+            self.commit(path)
+        return path
+
+    def prepare(self, snapshot_path: str) -> Optional[str]:
+        """Compress the snapshot as a full backup or as a delta of the last backup.
+        The next delta is still made against the last backup until commit is called,
+        so call discard instead if the backup couldn't be uploaded.
+
+        RETURNS
+        None: nothing changed since the last backup.
+        str: the path of the new backup."""
+        with open(snapshot_path, "rb") as f:
+            new = f.read()
+
+        backups = list_backups(self.folder)
+        seq = backups[-1][0] + 1 if backups else 1
+        # count the backups since the last full one
+        since_full = 0
+        for _, kind, _ in reversed(backups):
+            if kind == "full":
+                break
+            since_full += 1
+
+        # start a new chain if there's nothing to diff against
+        full = (since_full == len(backups)
+                or since_full + 1 >= self.full_every
+                or not os.path.exists(self._latest_path))
+        if full:
+            data = zlib.compress(new)
+        else:
+            with open(self._latest_path, "rb") as f:
+                old = f.read()
+            page_size = self._page_size(snapshot_path)
+            data = create_delta(old, new, page_size)
+            if data is None:
+                os.remove(snapshot_path)
+                return None
+
+        kind = "full" if full else "delta"
+        path = os.path.join(self.folder,
+                            f"{seq:06d}-{D.datetime.utcnow():%Y%m%d-%H%M%S}.{kind}.z")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def commit(self, backup_path: str):
+        """Make the prepared backup the one that the next delta is made against
+        and remove the backups that have rotated out."""
+        os.replace(self._snapshot_path, self._latest_path)
+        if BACKUP_NAME.match(os.path.basename(backup_path))["kind"] == "full":
+            self._rotate()
+
+    def discard(self, backup_path: str):
+        """Delete a prepared backup that won't be committed,
+        so the next backup continues the chain from the last committed one."""
+        for path in (backup_path, self._snapshot_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _page_size(path: str) -> int:
+        """Get the page size of the database at path."""
+        connection = sql.connect(path)
+        try:
+            return connection.execute("PRAGMA page_size;").fetchone()[0]
+        finally:
+            connection.close()
+
+    def _rotate(self):
+        """Delete the chains older than the newest keep_fulls full backups."""
+        backups = list_backups(self.folder)
+        fulls = [seq for seq, kind, _ in backups if kind == "full"]
+        if len(fulls) <= self.keep_fulls:
+            return
+
+        oldest_kept = fulls[-self.keep_fulls]
+        for seq, _, file_name in backups:
+            if seq < oldest_kept:
+                os.remove(os.path.join(self.folder, file_name))
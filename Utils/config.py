@@ -0,0 +1,151 @@
+"""Serves the files in Text Files from memory.
+
+Each file is parsed once into an immutable snapshot.
+ConfigStore.refresh re-parses the files whose modification time changed.
+Cogs.Repeating calls it regularly so edits are picked up without a restart."""
+
+from typing import *
+from types import MappingProxyType
+from json import load
+from traceback import print_exc
+import os
+
+
+def freeze(value: Any) -> Any:
+    """Convert parsed JSON into read-only types.
+    dicts become MappingProxyTypes and lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def parse_lines(path: str) -> Tuple[str, ...]:
+    """Get the non-empty lines of a text file."""
+    with open(path, encoding="utf-8-sig") as f:
+        return tuple(line.strip("\r\n") for line in f.readlines() if line.strip("\r\n"))
+
+
+def parse_ints(path: str) -> Tuple[int, ...]:
+    """Get each line of a text file as an int."""
+    return tuple(int(line) for line in parse_lines(path))
+
+
+def parse_json(path: str) -> Any:
+    """Get the contents of a JSON file as read-only types."""
+    with open(path, encoding="utf-8-sig") as f:
+        return freeze(load(f))
+
+
+class ConfigStore:
+    """
+    Parses config files once and serves snapshots of them from memory.
+
+    ATTRIBUTES
+    folder: str
+        The folder that the files are in.
+    _parsers: Dict[str, Callable[[str], Any]]
+        The function that parses each file from its path.
+    _snapshots: Dict[str, Tuple[int, Any]]
+        The modification time in nanoseconds and the parsed contents of each loaded file.
+    _listeners: Dict[str, List[Callable[[], None]]]
+        The functions to call after each file is reloaded.
+    """
+
+    def __init__(self, folder: str = "./Text Files"):
+        """
+        ARGUMENTS
+        folder:
+            The folder that the files are in.
+        """
+        self.folder = folder
+        self._parsers = {}
+        self._snapshots = {}
+        self._listeners = {}
+
+    def register(self, file_name: str, parser: Callable[[str], Any]):
+        """Add a file to the store. It's parsed when it's first used."""
+        self._parsers[file_name] = parser
+
+    def on_reload(self, file_name: str, listener: Callable[[], None]):
+        """Call listener whenever the file is reloaded by refresh."""
+        self._listeners.setdefault(file_name, []).append(listener)
+
+    def remove_listener(self, file_name: str, listener: Callable[[], None]):
+        """Stop calling listener when the file is reloaded. Ignored if it wasn't added."""
+        listeners = self._listeners.get(file_name, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.folder, file_name)
+
+    def _load(self, file_name: str) -> Any:
+        """Parse a file and store it. The mtime is read first so that
+        an edit made while parsing is picked up by the next refresh."""
+        path = self._path(file_name)
+        mtime = os.stat(path).st_mtime_ns
+        contents = self._parsers[file_name](path)
+        self._snapshots[file_name] = (mtime, contents)
+        return contents
+
+    def get(self, file_name: str) -> Any:
+        """Get the parsed contents of a file.
+
+        RAISES
+            KeyError: the file wasn't registered."""
+        snapshot = self._snapshots.get(file_name)
+        if snapshot is None:
+            return self._load(file_name)
+        return snapshot[1]
+
+    def refresh(self) -> List[str]:
+        """Reload the loaded files that have changed since they were parsed.
+        A file that fails to parse keeps its last snapshot.
+
+        RETURNS
+            The names of the files that were reloaded."""
+        reloaded = []
+        for file_name, (mtime, _) in list(self._snapshots.items()):
+            try:
+                if os.stat(self._path(file_name)).st_mtime_ns == mtime:
+                    continue
+                self._load(file_name)
+            except Exception:
+                print(f"Failed to reload {file_name}")
+                print_exc()
+                continue
+
+            reloaded.append(file_name)
+            for listener in self._listeners.get(file_name, ()):
+                listener()
+        return reloaded
+
+
+# the store used by the bot
+store = ConfigStore()
+store.register("channels.txt", parse_ints)
+store.register("delimiters.txt", parse_lines)
+store.register("responses.json", parse_json)
+store.register("statuses.json", parse_json)
+
+
+def channel_ids() -> Tuple[int, ...]:
+    """Get the ids of the event voice channels."""
+    return store.get("channels.txt")
+
+
+def delimiters() -> Tuple[str, ...]:
+    """Get the delimiters that separate a name from a title."""
+    return store.get("delimiters.txt")
+
+
+def responses() -> Mapping[str, Tuple[str, ...]]:
+    """Get the messages and reactions to respond to each type of message with."""
+    return store.get("responses.json")
+
+
+def statuses() -> Mapping[str, Tuple[str, ...]]:
+    """Get the statuses for each activity type."""
+    return store.get("statuses.json")
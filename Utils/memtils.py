@@ -2,13 +2,50 @@
 
 from typing import *
 import unicodedata
-from string import ascii_letters
-from discord import Member, Guild
+import re
+from functools import lru_cache
+from discord import Member, Guild, Role, User
 from discord.ext.commands import Context
-from Utils import common
-from fuzzywuzzy import process, fuzz  # this module has a great name :D
+from Utils import common, config
+from fuzzywuzzy import fuzz, utils  # this module has a great name :D
+from collections import Counter
 from BenUtils.searching import binarySearch
 
+# pre-compile the regexs
+NON_ALPHANUMERIC = re.compile(r"[^A-Za-z0-9]")
+NON_LETTERS = re.compile(r"[^A-Za-z]")
+
+
+@lru_cache(maxsize=None)
+def get_delimiter_regex() -> Optional[Pattern]:
+    """Get a regex that matches any of the delimiters in delimiters.txt.
+    It's rebuilt when the config store reloads the file.
+
+    RETURNS
+    None: there are no delimiters, so there are no titles to remove.
+    Pattern: the regex."""
+    # longest first so that a delimiter isn't cut short by its prefix
+    # an empty delimiter would match the start of every name
+    delimiters = sorted(filter(None, config.delimiters()), key=len, reverse=True)
+    if not delimiters:
+        return None
+    return re.compile("|".join(map(re.escape, delimiters)))
+
+
+def reload_delimiters():
+    """Rebuild the delimiter regex and forget the names parsed with the old delimiters."""
+    get_delimiter_regex.cache_clear()
+    _parse.cache_clear()
+
+
+config.store.on_reload("delimiters.txt", reload_delimiters)
+
+
+@lru_cache(maxsize=4096)
+def _parse(name: str, *settings) -> str:
+    """Memoised NameParser.parse. settings are the rest of NameParser's arguments in order."""
+    return NameParser(name, *settings)._parse()
+
 
 class NameParser:
     """
@@ -81,7 +118,31 @@ class NameParser:
 
     @property
     def parsed(self) -> str:
-        """Return the parsed name. The name will be parsed according to the settings."""
+        """Return the parsed name. The name will be parsed according to the settings.
+        Results are memoised by the name and settings."""
+        return _parse(self._original_name, self.check_tag, self.check_titles,
+                      self.check_english, self.remove_weird_chars,
+                      self.check_numbers, self.case)
+
+    @classmethod
+    def parse_many(cls, names: Iterable[str], **settings) -> List[str]:
+        """Parse many names with the same settings.
+
+        ARGUMENTS
+        names:
+            The names to parse.
+        **settings:
+            Any settings for NameParser.__init__
+
+        RETURNS
+            The parsed names in the same order as names."""
+        parser = cls("", **settings)
+        settings = (parser.check_tag, parser.check_titles, parser.check_english,
+                    parser.remove_weird_chars, parser.check_numbers, parser.case)
+        return [_parse(name, *settings) for name in names]
+
+    def _parse(self) -> str:
+        """Parse the name without the memo."""
         # don't modify the original
         name = self._original_name
 
@@ -125,77 +186,429 @@ class NameParser:
             name = unicodedata.normalize("NFKD", name)
 
         # remove any (surviving) non-ascii characters
-        name = name.encode("ascii", "ignore")
-        name = name.decode()  # convert bytes to string
+        name = name.encode("ascii", "ignore").decode()
 
         # remove symbols
-        # filter out the symbols
-        char_gen = (char for char in name if char.isalnum())
-        return "".join(char_gen)  # convert back to string
+        return NON_ALPHANUMERIC.sub("", name)
 
     def remove_numbers(self, name: str) -> str:
         """Remove numbers from the name."""
-        return "".join((char for char in name if char in ascii_letters))
+        return NON_LETTERS.sub("", name)
 
     def remove_titles(self, name: str) -> str:
         """Remove titles after a delimiter."""
-        # get the valid delimiters
-        with open("./Text Files/delimiters.txt") as f:
-            delimiters = [line.strip("\n") for line in f.readlines()]
+        # discard anything after the first delimiter
+        regex = get_delimiter_regex()
+        match = regex and regex.search(name)
+        return name[:match.start()] if match else name
 
-        # discard anything after the delimiter
-        for delimiter in delimiters:
-            name, *_ = name.split(delimiter)
 
-        return name
+class MemberNameIndex:
+    """
+    An index of names for finding the closest one to a name
+    without comparing it to every name like process.extractOne does.
+
+    Names are compared after fuzzywuzzy.utils.full_process (lower case, no symbols).
+    A name that is registered after processing is found by hash.
+    Otherwise, only the names that share the most trigrams with it
+    are scored with fuzz.WRatio, the scorer that process.extractOne uses.
+    Names that share no trigrams with it aren't considered.
+
+    ATTRIBUTES
+    max_candidates: int
+        How many names to score per lookup.
+    _names: Counter
+        How many times each (unprocessed) name was added.
+    _by_key: Dict[str, List[str]]
+        The names with each processed name.
+    _grams: Dict[str, Set[str]]
+        The processed names with each trigram.
+    """
+
+    def __init__(self, names: Iterable[str] = (), max_candidates: int = 25):
+        """
+        ARGUMENTS
+        names:
+            The names to index.
+        max_candidates:
+            How many names to score per lookup.
+            Raising it makes misses less likely but lookups slower.
+        """
+        self.max_candidates = max_candidates
+        self._names = Counter()
+        self._by_key = {}
+        self._grams = {}
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _trigrams(key: str) -> Set[str]:
+        """Get the trigrams of a processed name. It's padded so that short names have some."""
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, name: str):
+        """Add a name to the index."""
+        self._names[name] += 1
+        key = utils.full_process(name)
+        names = self._by_key.setdefault(key, [])
+        names.append(name)
+        if len(names) == 1:
+            for gram in self._trigrams(key):
+                self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, name: str):
+        """Remove a name from the index.
+
+        RAISES
+            KeyError: the name isn't in the index."""
+        if name not in self._names:
+            raise KeyError(name)
+        self._names[name] -= 1
+        if not self._names[name]:
+            del self._names[name]
+
+        key = utils.full_process(name)
+        names = self._by_key[key]
+        names.remove(name)
+        if not names:
+            del self._by_key[key]
+            for gram in self._trigrams(key):
+                keys = self._grams[gram]
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def sync(self, names: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Make the index hold exactly names. Only the differences are re-indexed.
+
+        RETURNS
+            The names that were added and the names that were removed."""
+        target = Counter(names)
+        added = list((target - self._names).elements())
+        removed = list((self._names - target).elements())
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+        return added, removed
+
+    def best_match(self, name: str) -> Optional[Tuple[str, int]]:
+        """Get the closest name in the index.
+
+        RETURNS
+        None: no name shares a trigram with name.
+        Tuple[str, int]: the closest name and its score out of 100."""
+        key = utils.full_process(name)
+        if not key:
+            return None
+        if key in self._by_key:
+            return self._by_key[key][0], 100
+
+        scores = self._score_candidates(key)
+        if not scores:
+            return None
+        score, best = max(scores)
+        return self._by_key[best][0], score
+
+    def _score_candidates(self, key: str) -> List[Tuple[int, str]]:
+        """Score the processed names that share the most trigrams with a processed name.
+
+        RETURNS
+            (score, processed name) of each candidate."""
+        # count the trigrams that each name shares with this one
+        shared = Counter()
+        for gram in self._trigrams(key):
+            shared.update(self._grams.get(gram, ()))
+        return [(fuzz.WRatio(key, candidate), candidate)
+                for candidate, _ in shared.most_common(self.max_candidates)]
+
+    def candidates(self, name: str, min_ratio: int = 0) -> List[Tuple[str, int]]:
+        """Get every name in the index that best_match would consider, best first.
+
+        RETURNS
+            (name, score) for each candidate that scores at least min_ratio.
+            Names that are the same after processing score 100."""
+        key = utils.full_process(name)
+        if not key:
+            return []
+        scores = [(100, key)] if key in self._by_key else []
+        scores += [(score, candidate) for score, candidate in self._score_candidates(key)
+                   if candidate != key]
+        scores.sort(key=lambda pair: pair[0], reverse=True)
+        return [(indexed, score) for score, candidate in scores if score >= min_ratio
+                for indexed in self._by_key[candidate]]
+
+    def match_many(self, names: Iterable[str]) -> List[Optional[Tuple[str, int]]]:
+        """Get the best_match of each name. Repeated names are only looked up once."""
+        names = list(names)
+        matches = {name: self.best_match(name) for name in set(names)}
+        return [matches[name] for name in names]
+
+    def is_member(self, name: str, min_ratio: int = 85) -> bool:
+        """Check if the closest name in the index scores at least min_ratio."""
+        match = self.best_match(name)
+        return match is not None and match[1] >= min_ratio
+
+    def missing(self, names: Iterable[str], min_ratio: int = 85) -> List[str]:
+        """Get the names that don't have a match in the index that scores at least min_ratio."""
+        names = list(names)
+        return [name for name, match in zip(names, self.match_many(names))
+                if match is None or match[1] < min_ratio]
+
+    def __contains__(self, name: str) -> bool:
+        """Check if the exact name was added."""
+        return name in self._names
+
+    def __len__(self) -> int:
+        """Get the number of names in the index."""
+        return sum(self._names.values())
+
+
+class RoleIndex:
+    """
+    The roles of every member as a bitmask so that a role check is one bitwise AND.
+
+    Each role id is given a bit. The masks of groups of role names are cached
+    until the roles change. It's kept up to date by the MemberTracking listeners.
+
+    ATTRIBUTES
+    built: bool
+        Whether a guild has been indexed.
+    bits: Dict[int, int]
+        The bit of each role by its id. Deleted roles keep their bit.
+    names: Dict[str, Set[int]]
+        The ids of the roles with each lowercase name.
+    masks: Dict[int, int]
+        The roles of each member by their id.
+    _group_masks: Dict[Tuple[str, ...], int]
+        The cached masks from mask_for.
+    """
+
+    def __init__(self):
+        self.built = False
+        self.bits = {}
+        self.names = {}
+        self.masks = {}
+        self._group_masks = {}
+
+    def build(self, guild: Guild):
+        """Index every role and member of guild. Anything indexed before is forgotten."""
+        self.bits, self.names, self.masks = {}, {}, {}
+        self._group_masks.clear()
+        for role in guild.roles:
+            self.add_role(role)
+        for member in guild.members:
+            self.update_member(member)
+        self.built = True
+
+    def add_role(self, role: Role) -> int:
+        """Give a role a bit if it doesn't have one.
+
+        RETURNS
+            The role's bit."""
+        bit = self.bits.get(role.id)
+        if bit is None:
+            bit = self.bits[role.id] = 1 << len(self.bits)
+            self.names.setdefault(role.name.lower(), set()).add(role.id)
+            self._group_masks.clear()
+        return bit
+
+    def remove_role(self, role: Role):
+        """Stop matching a role by its name."""
+        self.names.get(role.name.lower(), set()).discard(role.id)
+        self._group_masks.clear()
+
+    def rename_role(self, before: Role, after: Role):
+        """Match a role by its new name."""
+        self.remove_role(before)
+        self.names.setdefault(after.name.lower(), set()).add(after.id)
+
+    def update_member(self, member: Member) -> int:
+        """Index the current roles of a member.
+
+        RETURNS
+            The member's mask."""
+        mask = 0
+        for role in member.roles:
+            mask |= self.add_role(role)
+        self.masks[member.id] = mask
+        return mask
+
+    def remove_member(self, member_id: int):
+        """Forget a member. Ignored if they weren't indexed."""
+        self.masks.pop(member_id, None)
+
+    def mask_of(self, member: Union[Member, User]) -> int:
+        """Get the mask of a member.
+        Members that aren't indexed are worked out from their roles without being stored
+        because they won't be kept up to date. A User that isn't indexed has no roles."""
+        mask = self.masks.get(member.id)
+        if mask is None:
+            mask = 0
+            for role in getattr(member, "roles", ()):
+                mask |= self.add_role(role)
+        return mask
+
+    def mask_for(self, role_names: Union[Iterable[str], str]) -> int:
+        """Get the mask of every role with one of the names. Not case-sensitive."""
+        key = (role_names,) if isinstance(role_names, str) else tuple(role_names)
+        mask = self._group_masks.get(key)
+        if mask is None:
+            mask = 0
+            for name in key:
+                for role_id in self.names.get(name.lower(), ()):
+                    mask |= self.bits[role_id]
+            self._group_masks[key] = mask
+        return mask
+
+    def has_any(self, member: Union[Member, User], role_names: Union[Iterable[str], str]) -> bool:
+        """Check if a member has any of the roles."""
+        return bool(self.mask_of(member) & self.mask_for(role_names))
+
+    def member_ids(self, role_names: Iterable[str], exclude: Iterable[str] = ()) -> List[int]:
+        """Get the ids of the members with any of role_names and none of exclude."""
+        include, exclude = self.mask_for(role_names), self.mask_for(exclude)
+        return [member_id for member_id, mask in self.masks.items()
+                if mask & include and not mask & exclude]
+
+
+# the role index of common.server
+roles = RoleIndex()
+# members with these roles aren't in the outfit even if they have a member role
+NON_MEMBER_ROLES = ("Battle Brother",)
 
 
 def check_roles(person: Member, role_name: Union[Iterable[str], str]) -> bool:
     """Check if the person has the role(s).
     Not case-sensitive.
     DEPRECATED. Use commands.has_role"""
-    role_names = [role.name.lower() for role in person.roles]
-    if isinstance(role_name, str):
-        return role_name.lower() in role_names
-    # check if any of the target roles are in their roles
-    else:
-        targets = [name.lower() for name in role_name]
-        return bool(set(role_names).intersection(set(targets)))
+    return roles.has_any(person, role_name)
 
 
-async def get_in_outfit(return_members: bool = False) -> List[Union[Member, str]]:
-    """Get all of the people in the outfit. Requires common.load_bot
+def is_leader(person: Union[Member, User]) -> bool:
+    """Check if the person has one of common.leader_roles."""
+    return roles.has_any(person, common.leader_roles)
 
-    ARGUMENTS
-    return_members: return Discord.Members instead of their names"""
+
+def is_outfit_member(person: Union[Member, User]) -> bool:
+    """Check if the person has a member role and isn't a battle brother."""
+    mask = roles.mask_of(person)
+    return bool(mask & roles.mask_for(common.member_roles)) and \
+        not mask & roles.mask_for(NON_MEMBER_ROLES)
+
+
+class OutfitRoster:
+    """
+    The outfit members of a guild and their parsed names.
+
+    It's built once and kept up to date by the MemberTracking listeners
+    so that membership tests and name lookups don't scan the guild.
+    Membership is decided by is_outfit_member, so update roles before the roster.
+
+    ATTRIBUTES
+    built: bool
+        Whether a guild has been indexed.
+    members: Dict[int, Member]
+        The outfit members by their id.
+    names: Dict[int, Tuple[str, str]]
+        (display name, parsed name) of each outfit member by their id.
+        Names are only re-parsed when the display name changes.
+    by_name: Dict[str, int]
+        The id of the outfit member with each parsed name.
+        If two members have the same parsed name, the last one updated is kept.
+    """
+
+    def __init__(self):
+        self.built = False
+        self.members = {}
+        self.names = {}
+        self.by_name = {}
+
+    def build(self, guild: Guild):
+        """Index every outfit member of guild. Anything indexed before is forgotten."""
+        self.members, self.names, self.by_name = {}, {}, {}
+        for member in guild.members:
+            self.update(member)
+        self.built = True
+
+    def update(self, member: Member) -> bool:
+        """Add, update, or remove a member depending on whether they're in the outfit.
+
+        RETURNS
+            Whether they're in the outfit."""
+        if not is_outfit_member(member):
+            self.remove(member.id)
+            return False
+
+        self.members[member.id] = member
+        old = self.names.get(member.id)
+        if old is None or old[0] != member.display_name:
+            if old is not None:
+                self._forget_name(member.id, old[1])
+            parsed = NameParser(member.display_name).parsed
+            self.names[member.id] = (member.display_name, parsed)
+            self.by_name[parsed] = member.id
+        return True
+
+    def remove(self, member_id: int):
+        """Forget a member. Ignored if they weren't in the outfit."""
+        self.members.pop(member_id, None)
+        old = self.names.pop(member_id, None)
+        if old is not None:
+            self._forget_name(member_id, old[1])
+
+    def _forget_name(self, member_id: int, parsed: str):
+        if self.by_name.get(parsed) == member_id:
+            del self.by_name[parsed]
+
+    def get_by_name(self, parsed: str) -> Optional[Member]:
+        """Get the outfit member with the parsed name."""
+        member_id = self.by_name.get(parsed)
+        return None if member_id is None else self.members[member_id]
+
+    def parsed_names(self) -> List[str]:
+        """Get the parsed name of every outfit member."""
+        return [parsed for _, parsed in self.names.values()]
+
+    def __contains__(self, member: Union[Member, User]) -> bool:
+        return member.id in self.members
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+# the outfit members of common.server
+outfit = OutfitRoster()
+
+
+def get_roster() -> OutfitRoster:
+    """Get the outfit roster, building it if the listeners haven't yet. Requires common.load_bot"""
     # throw an error if the bot hasn't been loaded
     if not common.bot_loaded:
         raise ValueError("You must use common.load_bot first")
 
-    # get all the outfit members
-    in_outfit = []
-    for person in common.server.members:
-        if check_roles(person, common.member_roles):
-            # don't add battle brothers
-            if check_roles(person, "Battle Brother"):
-                continue
-            else:
-                if return_members:
-                    in_outfit.append(person)
-                else:
-                    in_outfit.append(NameParser(person.display_name).parsed)
+    if not roles.built:
+        roles.build(common.server)
+    if not outfit.built:
+        outfit.build(common.server)
+    return outfit
 
-    return in_outfit
 
+async def get_in_outfit(return_members: bool = False) -> List[Union[Member, str]]:
+    """Get all of the people in the outfit. Requires common.load_bot
+
+    ARGUMENTS
+    return_members: return Discord.Members instead of their names"""
+    roster = get_roster()
+    if return_members:
+        return list(roster.members.values())
+    return roster.parsed_names()
 
-def get_title(person: Member) -> str:
-    """Return 'my lord' if they're a leader, otherwise return 'brother'."""
-    title = "brother"
-    for role_ in common.leader_roles:
-        if check_roles(person, role_):
-            title = "my lord"
 
-    return title
+def get_title(person: Union[Member, User]) -> str:
+    """Return 'my lord' if they're a leader, otherwise return 'brother'."""
+    return "my lord" if is_leader(person) else "brother"
 
 
 async def search_member(search_with: Union[Context, Guild],
@@ -223,8 +636,8 @@ async def search_member(search_with: Union[Context, Guild],
     return NameParser(result.display_name).parsed
 
 
-async def is_member(name: str, outfit_members: List[str] = None,
-                    db: 'AttendanceDB.AttendanceDBWriter' = None,
+async def is_member(name: str, outfit_members: Union[List[str], MemberNameIndex] = None,
+                    db: 'BenUtils.db.AsyncDBWriter' = None,
                     min_ratio: int = 85) -> bool:
     """Check if the person is a member of the outfit.
     Not case-sensitive and uses a fuzzy ratio.
@@ -236,6 +649,7 @@ async def is_member(name: str, outfit_members: List[str] = None,
         The names of the people in the outfit.
         Defaults to people with the member roles in our discord.
         This should be passed if you need to check against the DB members.
+        Pass a MemberNameIndex if you're checking many names against the same people.
     db:
         The DB interface to use to populate outfit_members
         if outfit_members wasn't passed.
@@ -244,22 +658,23 @@ async def is_member(name: str, outfit_members: List[str] = None,
         between the name and the best match from the outfit.
     """
     # handle an empty list
-    if len(outfit_members) == 0:
+    if outfit_members is not None and len(outfit_members) == 0:
         return False
 
-    # parsed the name and lower it
-    parsed_name = NameParser(name, case=False).parsed
-
     # get the names of the members from the discord or db if they weren't provided
     if not outfit_members:
         if db:
-            outfit_members = [row[1] for row in db.get_all_members()]
+            return await db.is_registered(name, min_ratio)
         else:
             outfit_members = await get_in_outfit()
-    member_names = [n.lower() for n in outfit_members]
+
+    # parsed the name and lower it
+    parsed_name = NameParser(name, case=False).parsed
 
     # do a fuzzy comparison
-    return process.extractOne(parsed_name, member_names)[1] >= min_ratio
+    if not isinstance(outfit_members, MemberNameIndex):
+        outfit_members = MemberNameIndex(outfit_members)
+    return outfit_members.is_member(parsed_name, min_ratio)
 
 
 def compare_name(name1: str, name2: Union[str, List[str]],
@@ -282,4 +697,4 @@ def compare_name(name1: str, name2: Union[str, List[str]],
         return fuzz.ratio(name1, name2) >= min_ratio
     # handle name2 = list
     else:
-        return process.extractOne(name1, name2)[1] >= min_ratio
+        return MemberNameIndex(name2).is_member(name1, min_ratio)
@@ -2,11 +2,11 @@
 
 from typing import *
 from discord.abc import Messageable
-from matplotlib import pyplot, transforms
-from asyncio import sleep as async_sleep
+from asyncio import sleep as async_sleep, Lock
 import re
-import datetime as D
 from random import randint
+from collections import deque
+from time import monotonic
 
 # pre-compile the regexs
 REGEX = {
@@ -18,63 +18,6 @@ REGEX = {
 }
 
 
-def create_table(cell_contents: Iterable[Iterable[Any]], file_name: str = None,
-                 col_labels: List[str] = None, row_labels: List[str] = None) -> str:
-    """Create a table and save it as an image.
-
-    ARGUMENTS
-    cell_contents:
-        The content to populate the rows with.
-        Each element in cell_contents represents a row.
-        Each element in cell_contents[n] represents a cell.
-    col_labels:
-        The labels for the columns.
-    row_labels:
-        "   "      "   "   rows.
-    file_name:
-        The name of the file. It will be saved as a png file.
-        The file will be saved in DTWM-Discord-Bot/Images.
-        Defaults to "table_at_{D.datetime.today().strftime('%H.%M.%S')}"
-    RETURNS
-        The file path of the table image."""
-    # create table
-    table = pyplot.table(
-        cellText=cell_contents, rowLabels=row_labels,
-        colLabels=col_labels, loc="center"
-    )
-
-    # remove all the background stuff
-    pyplot.axis("off")
-    pyplot.grid("off")
-
-    # draw the canvas and get the current boundary box's coordinates
-    figure = pyplot.gcf()
-    figure.dpi = 200
-    figure.canvas.draw()
-    points = table.get_window_extent(figure._cachedRenderer).get_points()
-
-    # add some padding
-    points[0, :] -= 10
-    points[1, :] += 10
-
-    # create a boundary box that's cropped to fit the table
-    new_boundary_box = transforms.Bbox.from_extents(
-        points / figure.dpi)  # 200 DPI
-
-    # save the table
-    if not file_name:
-        file_name = f"table_at_{D.datetime.today().strftime('%H.%M.%S')}"
-    # the extra line is needed so that the path can be returned
-    path = f"./Images/{file_name}.png"
-    pyplot.savefig(path, bbox_inches=new_boundary_box)
-
-    # clean up the figure so that the table is properly forgotten
-    pyplot.clf()
-    pyplot.cla()
-    pyplot.close()
-    return path
-
-
 def list_join(to_join: Iterable[str], connective: str = "and") -> str:
     """
     Join a list into a grammatically-correct string.
@@ -225,6 +168,107 @@ async def send_as_chunks(msg: Union[str, List[str]], target: Messageable,
         await async_sleep(delay)
 
 
+def pack_mentions(mentions: Iterable[str], prefix: str = "",
+                  character_cap: int = 2000) -> List[str]:
+    """Pack mentions into as few messages as possible.
+
+    ARGUMENTS
+    mentions:
+        The mentions to send. They're separated by spaces.
+    prefix:
+        The text to start each message with.
+    character_cap:
+        The maximum characters per message.
+
+    RETURNS
+        The messages. Empty if there were no mentions.
+
+    RAISES
+        ValueError: the prefix and a mention don't fit in one message."""
+    messages = []
+    current = None
+    for mention in mentions:
+        if current is not None and len(current) + 1 + len(mention) <= character_cap:
+            current += " " + mention
+        else:
+            if len(prefix) + len(mention) > character_cap:
+                raise ValueError(f"The prefix and {mention} are longer than "
+                                 f"{character_cap} characters")
+            if current is not None:
+                messages.append(current)
+            current = prefix + mention
+    if current is not None:
+        messages.append(current)
+    return messages
+
+
+class RateLimitedSender:
+    """
+    Sends messages in the order they were queued
+    without going over a number of messages per period for each channel.
+    This avoids hitting Discord's rate limits instead of waiting them out.
+
+    ATTRIBUTES
+    rate: int
+        How many messages can be sent to a channel per period.
+    per: float
+        The length of the period in seconds.
+    _locks: Dict[Hashable, asyncio.Lock]
+        The queue of each channel. Lock waits in order.
+    _sent: Dict[Hashable, deque]
+        When the last `rate` messages were sent to each channel.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        """
+        ARGUMENTS
+        rate:
+            How many messages can be sent to a channel per period.
+        per:
+            The length of the period in seconds.
+            Discord allows 5 messages per 5 seconds per channel.
+        """
+        self.rate = rate
+        self.per = per
+        self._locks = {}
+        self._sent = {}
+
+    async def send(self, target: Messageable, content: str = None, **send_kwargs):
+        """Queue a message and wait until it's sent.
+
+        ARGUMENTS
+        target:
+            Any channel, User, or Context to send the message to.
+        content:
+            The message to send.
+        **send_kwargs:
+            Any kwargs for Messageable.send()
+
+        RETURNS
+            The discord.Message that was sent."""
+        key = getattr(target, "id", id(target))
+        lock = self._locks.setdefault(key, Lock())
+        async with lock:
+            sent = self._sent.setdefault(key, deque(maxlen=self.rate))
+            # wait until the oldest message in the window is a period old
+            if len(sent) == self.rate:
+                wait = sent[0] + self.per - monotonic()
+                if wait > 0:
+                    await async_sleep(wait)
+            message = await target.send(content, **send_kwargs)
+            sent.append(monotonic())
+        return message
+
+    async def send_all(self, target: Messageable, messages: Iterable[str], **send_kwargs):
+        """Queue many messages to the same target and wait until they've been sent."""
+        for message in messages:
+            await self.send(target, message, **send_kwargs)
+
+
+# shared so that every cog's messages are counted together
+sender = RateLimitedSender()
+
+
 def get_links(msg: str) -> Optional[List[str]]:
     """Use regex to extract any links from the message.
     NOTE: the regex will match anything after '/' until a new line or space is reached"""
@@ -0,0 +1,99 @@
+"""Tracks which outfit members are playing a game.
+
+The index is fed by the MemberTracking listeners so that finding who is in game
+is O(players online) instead of checking every member's activities."""
+
+from typing import *
+from discord import Member
+from Utils.memtils import get_roster
+import datetime as D
+
+
+class PresenceIndex:
+    """
+    The members that are playing a game and since when.
+
+    ATTRIBUTES
+    built: bool
+        Whether any members have been indexed.
+    game: str
+        The name of the activity to track.
+    playing: Dict[int, D.datetime]
+        When each member started playing by their id, in UTC.
+    peak: int
+        The most members that were playing at once today.
+    peak_at: Optional[D.datetime]
+        When the peak was first reached, in UTC.
+    """
+
+    def __init__(self, game: str = "Planetside 2"):
+        """
+        ARGUMENTS
+        game:
+            The name of the activity to track.
+        """
+        self.built = False
+        self.game = game
+        self.playing = {}
+        self.peak = 0
+        self.peak_at = None
+
+    def is_playing(self, member: Member) -> bool:
+        """Check the member's activities for the game."""
+        return any(activity.name == self.game for activity in member.activities)
+
+    def build(self, members: Iterable[Member], now: D.datetime = None):
+        """Index the members. Anything indexed before is forgotten."""
+        now = now or D.datetime.utcnow()
+        self.playing = {member.id: now for member in members if self.is_playing(member)}
+        self._record_peak(now)
+        self.built = True
+
+    def update(self, member: Member, now: D.datetime = None) -> bool:
+        """Add or remove a member depending on whether they're playing.
+
+        RETURNS
+            Whether they're playing."""
+        if not self.is_playing(member):
+            self.remove(member.id)
+            return False
+        if member.id not in self.playing:
+            now = now or D.datetime.utcnow()
+            self.playing[member.id] = now
+            self._record_peak(now)
+        return True
+
+    def remove(self, member_id: int):
+        """Forget a member. Ignored if they weren't playing."""
+        self.playing.pop(member_id, None)
+
+    def _record_peak(self, now: D.datetime):
+        """Update the peak, starting a new one on a new day."""
+        if self.peak_at is None or self.peak_at.date() != now.date():
+            self.peak, self.peak_at = 0, None
+        if len(self.playing) > self.peak:
+            self.peak, self.peak_at = len(self.playing), now
+
+    def get_peak(self, now: D.datetime = None) -> Tuple[int, Optional[D.datetime]]:
+        """Get today's peak and when it was reached."""
+        self._record_peak(now or D.datetime.utcnow())
+        return self.peak, self.peak_at
+
+    def __contains__(self, member: Member) -> bool:
+        return member.id in self.playing
+
+    def __len__(self) -> int:
+        return len(self.playing)
+
+
+# the outfit members playing Planetside 2
+in_game = PresenceIndex()
+
+
+def get_in_game() -> List[Member]:
+    """Get the outfit members playing Planetside 2, indexing them if the listeners
+    haven't yet. Requires common.load_bot"""
+    roster = get_roster()
+    if not in_game.built:
+        in_game.build(roster.members.values())
+    return [roster.members[id] for id in in_game.playing if id in roster.members]
@@ -16,8 +16,9 @@ class ReactMenu:
 
     ATTRIBUTES
     emotes: Dict[int, str]
-        The emotes' ids being used by this instance and their callback type's name.
-        Callback types may be: next_content, last_content, on_select, on_reject.
+        The emotes' ids being used by this instance and their callback type's name,
+        in the order that they're added to the message.
+        Callback types may be: on_last, on_next, on_select, on_reject.
         Example: 705987084535595028 : 'on_select'
     _bot: commands.Bot
         The bot instance to use.
@@ -45,6 +46,10 @@ class ReactMenu:
         The channel that the ReactMenu is bound to.
     _content_index: int
         Which element in content is currently being displayed.
+    _setup: asyncio.Task
+        Sends the message. The menu is ready once it's done.
+    _adding_reactions: Optional[asyncio.Task]
+        Adds the reactions in the background. None until the message is sent.
 
     """
 
@@ -131,48 +136,64 @@ class ReactMenu:
             embed_settings["colour"] = 13908894
         self.embed_settings = embed_settings
 
+        # the callbacks are known up front so the menu doesn't have to read its reactions
+        self.emotes = {last_emote_id: "on_last", next_emote_id: "on_next"}
+        if on_select:
+            self.emotes[select_emote_id] = "on_select"
+        if on_reject:
+            self.emotes[reject_emote_id] = "on_reject"
+        self._adding_reactions = None
+
         # create the Embed with the first element of content
         embed = self.create_embed(*self.create_slice())
 
-        asyncio.get_event_loop().create_task(self.__ainit__(embed, message_text,
-                                                            next_emote_id, last_emote_id,
-                                                            select_emote_id, reject_emote_id,
-                                                            on_select, on_reject))
+        self._setup = asyncio.get_event_loop().create_task(self.__ainit__(embed, message_text))
 
-    async def __ainit__(self, embed, message_text,
-                        next_emote_id, last_emote_id,
-                        select_emote_id, reject_emote_id,
-                        on_select, on_reject):
-        """Send the initial message, bind to it, and set up the reactions"""
+    async def __ainit__(self, embed, message_text):
+        """Send the initial message, bind to it, and start adding the reactions.
+        The menu responds to reactions as soon as the message exists."""
         # send the initial message
         self.msg = await self._channel.send(content=message_text,
                                             embed=embed)
 
         # register the message
-        handler = self._bot.get_cog("ReactMenuHandler")
-        handler.bound_messages[self.msg.id] = self
-
-        # add the default reactions
-        emotes = [self._bot.get_emoji(id_) for id_ in (last_emote_id, next_emote_id,
-                                                       select_emote_id, reject_emote_id)]
-        for emote in emotes[:2]:
-            await self.msg.add_reaction(emote)
-
-        # add the optional reactions
-        if on_select:
-            await self.msg.add_reaction(emotes[2])
-        if on_reject:
-            await self.msg.add_reaction(emotes[3])
-
-        # populate emotes dict
-        await asyncio.sleep(1)
-        # refresh the Message instance once the reactions have been added
-        self.msg = await self._channel.fetch_message(self.msg.id)
-        self.emotes = {r.emoji.id: callback_type for r, callback_type in
-                       zip(self.msg.reactions, ("on_last", "on_next", "on_select", "on_reject"))}
+        self._bot.get_cog("ReactMenuHandler").bind(self)
 
         # mark self as ready
         self._starting = False
+        self._adding_reactions = asyncio.get_event_loop().create_task(self._add_reactions())
+
+    async def _add_reactions(self):
+        """Add the reactions in the background, in the order that they should be displayed.
+        They share a rate limit so adding them at once wouldn't be any quicker."""
+        for id_ in self.emotes:
+            with suppress(HTTPException):
+                await self.msg.add_reaction(self._bot.get_emoji(id_))
+
+    async def remove_reactions(self):
+        """Remove the bot's reactions once the menu is finished.
+        The sent message doesn't track its reactions, so they're removed by their ids."""
+        if self._adding_reactions is not None:
+            self._adding_reactions.cancel()
+        for id_ in self.emotes:
+            with suppress(HTTPException):
+                await self.msg.remove_reaction(self._bot.get_emoji(id_), self._bot.user)
+
+    def unregister(self):
+        """Stop responding to reactions."""
+        handler = self._bot.get_cog("ReactMenuHandler")
+        if handler is not None and self.msg is not None:
+            handler.unbind(self)
+
+    async def wait_until_ready(self, reactions: bool = False):
+        """Wait until the menu responds to reactions.
+
+        ARGUMENTS
+        reactions:
+            Also wait until all of its reactions have been added."""
+        await asyncio.shield(self._setup)
+        if reactions:
+            await asyncio.shield(self._adding_reactions)
 
     @staticmethod
     async def on_next(self):
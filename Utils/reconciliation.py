@@ -0,0 +1,101 @@
+"""Works out how to make the registered members match the outfit members.
+
+Each registered name is paired with at most one outfit name so that two similar names
+can't both claim the same person. Pairs are picked greedily, best score first,
+after pairing the names that are the same."""
+
+from typing import *
+from Utils.memtils import MemberNameIndex
+
+
+class RosterDiff:
+    """
+    The changes that make the registered members match the outfit members.
+
+    ATTRIBUTES
+    adds: List[str]
+        The outfit names without a registered match. They should be registered.
+    removes: List[str]
+        The registered names without an outfit match. They should be unregistered.
+    renames: List[Tuple[str, str]]
+        (registered name, outfit name) for each pair that matched without being equal.
+    """
+
+    def __init__(self, adds: List[str], removes: List[str], renames: List[Tuple[str, str]]):
+        self.adds = adds
+        self.removes = removes
+        self.renames = renames
+
+    def __bool__(self) -> bool:
+        """Whether anything needs to change."""
+        return bool(self.adds or self.removes or self.renames)
+
+    def report(self) -> str:
+        """Describe the changes for a leader."""
+        if not self:
+            return "The archives match the chapter."
+        lines = []
+        if self.adds:
+            lines.append(f"Register ({len(self.adds)}): " + ", ".join(self.adds))
+        if self.removes:
+            lines.append(f"Unregister ({len(self.removes)}): " + ", ".join(self.removes))
+        if self.renames:
+            lines.append(f"Rename ({len(self.renames)}): " +
+                         ", ".join(f"{old} -> {new}" for old, new in self.renames))
+        return "\n".join(lines)
+
+    def apply(self, writer: 'Utils.AttendanceDB.AttendanceDBWriter'):
+        """Make the changes in one transaction.
+        Must be called on the thread that owns writer's connection,
+        so use it with AsyncDBWriter.run."""
+        with writer.transaction():
+            writer.delete_members(self.removes)
+            writer.rename_members(self.renames)
+            writer.add_members(self.adds)
+
+
+def reconcile(registered: Iterable[str], in_outfit: Iterable[str],
+              min_ratio: int = 85) -> RosterDiff:
+    """Pair the registered names with the outfit names one to one.
+
+    ARGUMENTS
+    registered:
+        The names in the Members table.
+    in_outfit:
+        The parsed names of the outfit members.
+    min_ratio:
+        The lowest score that two different names can be paired with.
+
+    RETURNS
+        The changes to make to the registered names."""
+    # repeated names are the same person
+    registered = list(dict.fromkeys(registered))
+    in_outfit = list(dict.fromkeys(in_outfit))
+
+    # names that are the same don't need scoring
+    exact = set(registered).intersection(in_outfit)
+    unpaired_registered = [name for name in registered if name not in exact]
+    unpaired_outfit = [name for name in in_outfit if name not in exact]
+
+    # score every candidate pair that's close enough
+    index = MemberNameIndex(unpaired_outfit)
+    pairs = [(score, i, registered_name, outfit_name)
+             for i, registered_name in enumerate(unpaired_registered)
+             for outfit_name, score in index.candidates(registered_name, min_ratio)]
+    # best first. Ties go to the earliest registered name
+    pairs.sort(key=lambda pair: (-pair[0], pair[1]))
+
+    paired_registered, paired_outfit = set(), set()
+    renames = []
+    for _, _, registered_name, outfit_name in pairs:
+        if registered_name in paired_registered or outfit_name in paired_outfit:
+            continue
+        paired_registered.add(registered_name)
+        paired_outfit.add(outfit_name)
+        renames.append((registered_name, outfit_name))
+
+    return RosterDiff(
+        adds=[name for name in unpaired_outfit if name not in paired_outfit],
+        removes=[name for name in unpaired_registered if name not in paired_registered],
+        renames=renames,
+    )
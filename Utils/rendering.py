@@ -0,0 +1,287 @@
+"""Renders tables as PNGs in a worker process.
+
+There are two backends:
+    matplotlib: draws each table on its own Figure instead of pyplot's global one.
+        It's only imported by the workers, so importing this module is cheap.
+    pillow: lays the table out from cached glyph widths and draws it directly.
+        It's much faster and lighter, but doesn't wrap or shrink text.
+The event loop only waits for the PNG's bytes.
+Rendered tables are cached in memory by a hash of their contents and settings,
+so asking for an unchanged table again doesn't render it."""
+
+from typing import *
+from concurrent.futures import ProcessPoolExecutor
+from asyncio import get_event_loop
+from functools import lru_cache
+from collections import OrderedDict
+from io import BytesIO
+from json import dumps
+import asyncio
+import hashlib
+from PIL import Image, ImageDraw, ImageFont
+
+# points per inch, used to match the text size of the matplotlib backend
+POINTS = 72
+# matplotlib's default table font size in points
+FONT_SIZE = 10
+# padding around each cell's text as a fraction of the font's height
+CELL_PADDING = 0.3
+
+_pool = None
+
+
+def draw_table(cell_contents: List[List[str]], col_labels: List[str] = None,
+               row_labels: List[str] = None, dpi: int = 200) -> bytes:
+    """Draw a table with matplotlib and crop it to fit.
+
+    ARGUMENTS
+    cell_contents:
+        The content to populate the rows with.
+        Each element in cell_contents represents a row.
+        Each element in cell_contents[n] represents a cell.
+    col_labels:
+        The labels for the columns.
+    row_labels:
+        "   "      "   "   rows.
+    dpi:
+        The resolution of the image.
+
+    RETURNS
+        The table as a PNG."""
+    # imported here so that only the processes that draw tables pay for it
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib import transforms
+
+    figure = Figure(dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    table = axes.table(cellText=cell_contents, rowLabels=row_labels,
+                       colLabels=col_labels, loc="center")
+    # remove all the background stuff
+    axes.axis("off")
+
+    # draw the canvas and get the table's boundary box's coordinates
+    canvas.draw()
+    points = table.get_window_extent(canvas.get_renderer()).get_points()
+    # add some padding
+    points[0, :] -= 10
+    points[1, :] += 10
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png",
+                   bbox_inches=transforms.Bbox.from_extents(points / dpi))
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> ImageFont.ImageFont:
+    """Get the table font in a size in pixels. Falls back to Pillow's default font."""
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def glyph_width(size: int, char: str) -> float:
+    """Get the width of a character in the table font."""
+    return get_font(size).getlength(char)
+
+
+def text_width(size: int, text: str) -> float:
+    """Get the width of some text from its glyphs' widths. Kerning is ignored."""
+    return sum(glyph_width(size, char) for char in text)
+
+
+def draw_table_pillow(cell_contents: List[List[str]], col_labels: List[str] = None,
+                      row_labels: List[str] = None, dpi: int = 200) -> bytes:
+    """Draw a table with Pillow. It looks like draw_table's but it's much quicker.
+    See draw_table for the arguments.
+
+    RETURNS
+        The table as a PNG."""
+    size = round(FONT_SIZE * dpi / POINTS)
+    font = get_font(size)
+    padding = round(size * CELL_PADDING)
+    row_height = size + 2 * padding
+
+    # lay out the grid: the labels are just another row and column
+    rows = [[str(cell) for cell in row] for row in cell_contents]
+    if col_labels is not None:
+        rows.insert(0, [str(label) for label in col_labels])
+    if row_labels is not None:
+        labels = [str(label) for label in row_labels]
+        rows = [[label] + row for label, row in
+                zip(([""] if col_labels is not None else []) + labels, rows)]
+    columns = max(map(len, rows), default=0)
+    widths = [0] * columns
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], text_width(size, cell))
+    widths = [round(width) + 2 * padding for width in widths]
+    lefts = [sum(widths[:i]) for i in range(columns + 1)]
+
+    # greyscale PNGs are about 3 times quicker to encode than RGB ones
+    image = Image.new("L", (max(lefts[-1], 1) + 1, len(rows) * row_height + 1), "white")
+    draw = ImageDraw.Draw(image)
+    for row_number, row in enumerate(rows):
+        top = row_number * row_height
+        for i, cell in enumerate(row):
+            # the corner above the row labels is left empty like matplotlib's
+            if row_number == 0 and i == 0 and col_labels is not None and row_labels is not None:
+                continue
+            draw.rectangle((lefts[i], top, lefts[i + 1], top + row_height), outline="black")
+            draw.text((lefts[i] + padding, top + padding), cell, fill="black", font=font)
+
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# the renderers that render_table's backend argument chooses between
+BACKENDS = {
+    "matplotlib": draw_table,
+    "pillow": draw_table_pillow,
+}
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Get the worker process pool, starting it if it isn't running."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=1)
+    return _pool
+
+
+def shutdown():
+    """Stop the worker process. It will be restarted by the next render."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+class ImageCache:
+    """
+    Rendered images by a hash of what was rendered.
+    The least recently used images are dropped once they take up more than max_bytes.
+
+    The images are kept as bytes rather than BytesIOs
+    because discord.File closes the buffer that it's given.
+
+    ATTRIBUTES
+    max_bytes: int
+        How many bytes of images to keep.
+    size: int
+        How many bytes of images are kept.
+    _images: OrderedDict[str, bytes]
+        The images by their key, least recently used first.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 2 ** 20):
+        """
+        ARGUMENTS
+        max_bytes:
+            How many bytes of images to keep.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images = OrderedDict()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Hash the contents and settings of an image. parts must be JSON serialisable."""
+        return hashlib.sha256(dumps(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get an image, marking it as recently used."""
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+        return image
+
+    def put(self, key: str, image: bytes):
+        """Keep an image, dropping the least recently used ones to make room.
+        Images bigger than max_bytes aren't kept."""
+        if key in self._images:
+            self.size -= len(self._images.pop(key))
+        if len(image) > self.max_bytes:
+            return
+        self._images[key] = image
+        self.size += len(image)
+        while self.size > self.max_bytes:
+            _, dropped = self._images.popitem(last=False)
+            self.size -= len(dropped)
+
+    def clear(self):
+        """Drop every image."""
+        self._images.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+
+# the rendered tables
+cache = ImageCache()
+# the renders in progress, so that identical requests share one
+_pending = {}
+
+
+def _table_key(cell_contents: List[List[str]], col_labels: Optional[List[str]],
+               row_labels: Optional[List[str]], dpi: int, backend: str) -> str:
+    return cache.key(cell_contents,
+                     None if col_labels is None else [str(label) for label in col_labels],
+                     None if row_labels is None else [str(label) for label in row_labels],
+                     dpi, backend)
+
+
+def create_table(cell_contents: Iterable[Iterable[Any]], col_labels: List[str] = None,
+                 row_labels: List[str] = None, dpi: int = 200,
+                 backend: str = "matplotlib") -> BytesIO:
+    """Draw a table on the calling thread, or get it from the cache. See render_table.
+    Use render_table in coroutines."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {list(BACKENDS)}")
+    cell_contents = [[str(cell) for cell in row] for row in cell_contents]
+    key = _table_key(cell_contents, col_labels, row_labels, dpi, backend)
+    image = cache.get(key)
+    if image is None:
+        image = BACKENDS[backend](cell_contents, col_labels, row_labels, dpi)
+        cache.put(key, image)
+    return BytesIO(image)
+
+
+async def render_table(cell_contents: Iterable[Iterable[Any]], col_labels: List[str] = None,
+                       row_labels: List[str] = None, dpi: int = 200,
+                       backend: str = "matplotlib") -> BytesIO:
+    """Draw a table in the worker process, or get it from the cache. See draw_table.
+
+    ARGUMENTS
+    backend:
+        The name of the renderer in BACKENDS.
+
+    RETURNS
+        The table as a PNG. Send it with discord.File(buffer, "table.png").
+
+    RAISES
+        ValueError: the backend doesn't exist."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {list(BACKENDS)}")
+    # send plain strings so that anything in the cells can be pickled and hashed
+    cell_contents = [[str(cell) for cell in row] for row in cell_contents]
+    key = _table_key(cell_contents, col_labels, row_labels, dpi, backend)
+    image = cache.get(key)
+    if image is not None:
+        return BytesIO(image)
+
+    # wait for the same table if it's already being rendered
+    pending = _pending.get(key)
+    if pending is None:
+        pending = _pending[key] = asyncio.ensure_future(get_event_loop().run_in_executor(
+            get_pool(), BACKENDS[backend], cell_contents, col_labels, row_labels, dpi))
+        pending.add_done_callback(lambda _: _pending.pop(key, None))
+    image = await asyncio.shield(pending)
+    cache.put(key, image)
+    return BytesIO(image)
@@ -0,0 +1,111 @@
+"""Tracks who is in the event voice channels during an event.
+
+The tracker is fed by on_voice_state_update so each join or leave is one update
+instead of polling the channels' members."""
+
+from typing import *
+from time import monotonic
+
+
+class VoiceSessionTracker:
+    """
+    A ledger of when each member joined and left the event channels.
+
+    ATTRIBUTES
+    channel_ids: Set[int]
+        The ids of the event voice channels.
+    started_at: Optional[float]
+        When the event started. None if no event is being tracked.
+    ledger: Dict[int, List[List[Any]]]
+        [name, joined at, left at] for each session of each member by their id.
+        left at is None while they're still in an event channel.
+    """
+
+    def __init__(self, channel_ids: Iterable[int]):
+        """
+        ARGUMENTS
+        channel_ids:
+            The ids of the event voice channels.
+        """
+        self.channel_ids = set(channel_ids)
+        self.started_at = None
+        self.ledger = {}
+
+    @property
+    def tracking(self) -> bool:
+        """Whether an event is being tracked."""
+        return self.started_at is not None
+
+    def start(self, present: Iterable[Tuple[int, str]] = (), now: float = None):
+        """Start tracking an event.
+
+        ARGUMENTS
+        present:
+            (id, name) of each member who is already in an event channel.
+        now:
+            The current time in seconds. Defaults to time.monotonic().
+
+        RAISES
+            ValueError: an event is already being tracked."""
+        if self.tracking:
+            raise ValueError("Already tracking an event")
+        now = monotonic() if now is None else now
+        self.started_at = now
+        self.ledger = {}
+        for member_id, name in present:
+            self.join(member_id, name, now)
+
+    def join(self, member_id: int, name: str, now: float = None):
+        """Open a session for a member. Ignored if they already have one open."""
+        if not self.tracking:
+            return
+        sessions = self.ledger.setdefault(member_id, [])
+        if not sessions or sessions[-1][2] is not None:
+            sessions.append([name, monotonic() if now is None else now, None])
+
+    def leave(self, member_id: int, now: float = None):
+        """Close the open session of a member if they have one."""
+        sessions = self.ledger.get(member_id)
+        if self.tracking and sessions and sessions[-1][2] is None:
+            sessions[-1][2] = monotonic() if now is None else now
+
+    def update(self, member_id: int, name: str,
+               before_id: Optional[int], after_id: Optional[int], now: float = None):
+        """Handle a voice state update.
+
+        ARGUMENTS
+        member_id:
+            The id of the member that moved.
+        name:
+            The name to record them under.
+        before_id:
+            The id of the channel they left. None if they weren't in one.
+        after_id:
+            The id of the channel they joined. None if they disconnected."""
+        was_in = before_id in self.channel_ids
+        is_in = after_id in self.channel_ids
+        # moving between event channels doesn't change anything
+        if was_in and not is_in:
+            self.leave(member_id, now)
+        elif is_in and not was_in:
+            self.join(member_id, name, now)
+
+    def stop(self, now: float = None) -> Dict[str, int]:
+        """Stop tracking and close any open sessions.
+
+        RETURNS
+            The minutes that each name was in the event channels, rounded down.
+            Sessions of members with the same name are added together."""
+        if not self.tracking:
+            return {}
+        now = monotonic() if now is None else now
+
+        seconds = {}
+        for sessions in self.ledger.values():
+            for name, joined_at, left_at in sessions:
+                left_at = now if left_at is None else left_at
+                seconds[name] = seconds.get(name, 0) + left_at - joined_at
+
+        self.started_at = None
+        self.ledger = {}
+        return {name: int(total // 60) for name, total in seconds.items()}
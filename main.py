@@ -4,7 +4,7 @@ from discord import *
 from discord.ext import commands
 from typing import *
 import os
-from Utils import common
+from Utils import common, AttendanceDB
 from datetime import datetime
 from traceback import format_exception, print_exc
 import sys
@@ -61,10 +61,6 @@ if not os.path.exists("./Text Files/token.txt"):
     input("There is no token in Text Files/\nPress any key to exit.")
     sys.exit(0)
 
-# ensure that the Images directory exists
-if not os.path.exists("./Images"):
-    os.mkdir(("./Images"))
-
 # load all of the Cogs. Credit to https://youtu.be/vQw8cFfZPx0?t=424
 for file in os.listdir("./Cogs"):
     # ensure it's a Python file and ignore modules that aren't Cogs
@@ -118,6 +114,8 @@ async def graceful_exit(restart=False):
     tasks = [t for t in loop.all_tasks() if t is not
              loop.current_task()]
     [task.cancel() for task in tasks]
+    # commit the deferred writes; the cogs only share the database, they don't close it
+    await AttendanceDB.close_shared_db()
     await bot.close()
     loop = get_event_loop()
     loop.stop()